@@ -1,5 +1,5 @@
 """
-Script to convert existing nigeria_data.py to nested structure with empty arrays for cities, wards, and postal codes
+Script to convert the bundled nigeria_data to nested structure with empty arrays for cities, wards, and postal codes
 Run this script to prepare the data structure for adding extended data
 """
 
@@ -34,6 +34,9 @@ def convert_to_nested_structure(data):
                 "capital": state_info.get("capital", ""),
                 "lgas": {}
             }
+            if "aliases" in state_info:
+                nested_data[zone_name]["states"][state_name]["aliases"] = state_info["aliases"]
+            lga_aliases = state_info.get("lga_aliases", {})
             
             # Convert LGA list to nested dict
             lga_list = state_info.get("lgas", [])
@@ -46,6 +49,8 @@ def convert_to_nested_structure(data):
                     "wards": [],
                     "postal_codes": []
                 }
+                if lga_name in lga_aliases:
+                    nested_data[zone_name]["states"][state_name]["lgas"][lga_name]["aliases"] = lga_aliases[lga_name]
     
     return nested_data
 
@@ -132,6 +137,6 @@ if __name__ == "__main__":
     print("\nYou can now:")
     print("1. Review the structure")
     print("2. Start adding cities, wards, and postal codes")
-    print("3. Replace django_ng_locations/fixtures/nigeria_data.py when ready")
+    print("3. Write it to the bundled data file with data_collection_helper.save_to_data_file() when ready")
     print("\nSee DATA_COLLECTION_GUIDE.md for detailed instructions.")
 
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('django_ng_locations', '0006_locationalias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LGA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='State',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('code', models.CharField(blank=True, max_length=10)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('street', models.CharField(max_length=200)),
+                ('lga', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='django_ng_locations.lga')),
+                ('ward', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='django_ng_locations.ward')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='City',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('lga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cities', to='core.lga')),
+            ],
+            options={
+                'unique_together': {('lga', 'name')},
+            },
+        ),
+        migrations.AddField(
+            model_name='lga',
+            name='state',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lgas', to='core.state'),
+        ),
+        migrations.CreateModel(
+            name='PostalCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=10)),
+                ('city', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.city')),
+                ('lga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.lga')),
+            ],
+            options={
+                'unique_together': {('code', 'lga')},
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='lga',
+            unique_together={('state', 'name')},
+        ),
+        migrations.CreateModel(
+            name='Ward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('lga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wards', to='core.lga')),
+            ],
+            options={
+                'unique_together': {('lga', 'name')},
+            },
+        ),
+    ]
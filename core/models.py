@@ -58,3 +58,13 @@ class PostalCode(models.Model):
 
     def __str__(self):
         return self.code
+
+
+class Address(models.Model):
+    """A project model referring to django_ng_locations rows"""
+    street = models.CharField(max_length=200)
+    lga = models.ForeignKey("django_ng_locations.LGA", on_delete=models.SET_NULL, null=True, blank=True)
+    ward = models.ForeignKey("django_ng_locations.Ward", on_delete=models.CASCADE, null=True, blank=True)
+
+    def __str__(self):
+        return self.street
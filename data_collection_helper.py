@@ -89,6 +89,15 @@ def convert_existing_data_to_nested(existing_data):
     return nested_data
 
 
+def save_to_data_file(data, filename=None):
+    """Save data to the bundled data file (nigeria_data.ndjson.gz) read by the package"""
+    from django_ng_locations.fixtures.nigeria_data import DATA_FILE, write_data
+
+    filename = filename or DATA_FILE
+    count = write_data(data, filename)
+    print(f"{count} records saved to {filename}")
+
+
 def save_to_python_file(data, filename="django_ng_locations/fixtures/nigeria_data.py"):
     """Save data to Python file"""
     with open(filename, 'w', encoding='utf-8') as f:
@@ -118,6 +127,6 @@ if __name__ == "__main__":
     print("2. Add cities to LGAs")
     print("3. Add wards to LGAs")
     print("4. Add postal codes to LGAs")
-    print("5. Save data to Python file")
+    print("5. Save data to the bundled data file or to Python file")
     print("\nSee the functions above for how to use this helper.")
 
@@ -1,5 +1,174 @@
 from django.contrib import admin
-from .models import Zone, State, LGA, City, Ward, PostalCode
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from .models import Zone, State, LGA, City, Ward, PostalCode, LocationAlias
+
+
+# Counts are annotated and related rows joined in get_queryset, so a
+# changelist page runs a fixed number of queries whatever its size.
+
+
+def child_count(model, parent_field: str):
+    """
+    Correlated subquery counting the ``model`` rows below each row
+
+    Unlike ``Count()`` over joins, several of these on one queryset do not
+    multiply each other's rows.
+    """
+    counts = (
+        model.objects.filter(**{parent_field: OuterRef("pk")})
+        .order_by()
+        .values(parent_field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs a full COUNT(*)
+
+    Unfiltered PostgreSQL tables use the planner's row estimate; everything
+    else is counted up to ``count_limit`` rows, so at most that many rows
+    are reachable through the page links.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self._estimate(queryset)
+            if estimate > self.count_limit:
+                return estimate
+        return queryset.order_by()[:self.count_limit].count()
+
+    @staticmethod
+    def _estimate(queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return 0
+        with connection.cursor() as cursor:
+            # reltuples is -1 for tables that were never analyzed
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row else 0
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables with 100k+ rows"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_help_text = "Names (and codes) starting with the search term"
+
+
+class HierarchyFilter(admin.SimpleListFilter):
+    """
+    Filter on one level of the zone -> state -> LGA hierarchy
+
+    Options are limited to the children of the parent chosen in the filter
+    above, and a level without a chosen parent that would list more than a
+    handful of options (LGAs) is hidden, so the sidebar never loads whole
+    tables. ``field_path`` is the level's relation from the filtered model.
+    """
+
+    model = None
+    parent_parameter = None
+    parent_field = None
+    # Picking an option resets the levels below
+    child_parameters = ()
+    # Show the options even when no parent is chosen
+    list_all = True
+    field_path = None
+
+    def lookups(self, request, model_admin):
+        queryset = self.model.objects.all()
+        parent = request.GET.get(self.parent_parameter) if self.parent_parameter else None
+        if parent:
+            if not parent.isdigit():
+                return ()
+            queryset = queryset.filter(**{f"{self.parent_field}_id": parent})
+        elif not self.list_all:
+            return ()
+        return queryset.order_by("name").values_list("id", "name")
+
+    def queryset(self, request, queryset):
+        if self.value():
+            if not self.value().isdigit():
+                raise IncorrectLookupParameters(f"Invalid {self.title}: {self.value()}")
+            return queryset.filter(**{f"{self.field_path}_id": self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(
+                remove=[self.parameter_name, *self.child_parameters]
+            ),
+            "display": _("All"),
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == str(lookup),
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: lookup}, self.child_parameters
+                ),
+                "display": title,
+            }
+
+
+class ZoneFilter(HierarchyFilter):
+    title = "zone"
+    parameter_name = "zone"
+    model = Zone
+    child_parameters = ("state", "lga")
+
+
+class StateFilter(HierarchyFilter):
+    title = "state"
+    parameter_name = "state"
+    model = State
+    parent_parameter = "zone"
+    parent_field = "zone"
+    child_parameters = ("lga",)
+
+
+class LGAFilter(HierarchyFilter):
+    title = "LGA"
+    parameter_name = "lga"
+    model = LGA
+    parent_parameter = "state"
+    parent_field = "state"
+    list_all = False
+
+
+def hierarchy_filters(lga_path, state_path=None, zone_path=None):
+    """
+    Zone, state and LGA filters for a model related to an LGA through
+    ``lga_path``; the state and zone are reached through the LGA unless the
+    model has (denormalized) relations of its own
+    """
+    state_path = state_path or f"{lga_path}__state"
+    paths = {
+        ZoneFilter: zone_path or f"{state_path}__zone",
+        StateFilter: state_path,
+        LGAFilter: lga_path,
+    }
+    return tuple(
+        type(base.__name__, (base,), {"field_path": path})
+        for base, path in paths.items()
+    )
 
 
 @admin.register(Zone)
@@ -8,9 +177,13 @@ class ZoneAdmin(admin.ModelAdmin):
     search_fields = ("name", "code")
     ordering = ("name",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(state_count=Count("states"))
+
     def state_count(self, obj):
-        return obj.states.count()
+        return obj.state_count
     state_count.short_description = "Number of States"
+    state_count.admin_order_field = "state_count"
 
 
 @admin.register(State)
@@ -21,9 +194,13 @@ class StateAdmin(admin.ModelAdmin):
     ordering = ("name",)
     autocomplete_fields = ["zone"]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("zone").annotate(lga_count=Count("lgas"))
+
     def lga_count(self, obj):
-        return obj.lgas.count()
+        return obj.lga_count
     lga_count.short_description = "Number of LGAs"
+    lga_count.admin_order_field = "lga_count"
 
 
 @admin.register(LGA)
@@ -34,54 +211,76 @@ class LGAAdmin(admin.ModelAdmin):
     ordering = ("state__name", "name")
     autocomplete_fields = ["state"]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("state__zone").annotate(
+            city_count=child_count(City, "lga"),
+            ward_count=child_count(Ward, "lga"),
+        )
+
     def zone_name(self, obj):
         return obj.state.zone.name
     zone_name.short_description = "Zone"
+    zone_name.admin_order_field = "state__zone__name"
 
     def city_count(self, obj):
-        return obj.cities.count()
+        return obj.city_count
     city_count.short_description = "Cities"
+    city_count.admin_order_field = "city_count"
 
     def ward_count(self, obj):
-        return obj.wards.count()
+        return obj.ward_count
     ward_count.short_description = "Wards"
+    ward_count.admin_order_field = "ward_count"
 
 
 @admin.register(City)
-class CityAdmin(admin.ModelAdmin):
+class CityAdmin(LargeTableAdmin):
     list_display = ("name", "lga", "state_name", "is_capital", "population")
-    list_filter = ("is_capital", "lga__state__zone", "lga__state")
-    search_fields = ("name", "lga__name", "lga__state__name")
+    list_filter = ("is_capital", *hierarchy_filters("lga", "state", "zone"))
+    search_fields = ("^name",)
     ordering = ("name",)
     autocomplete_fields = ["lga"]
+    list_select_related = ("lga__state",)
 
     def state_name(self, obj):
         return obj.lga.state.name
     state_name.short_description = "State"
+    state_name.admin_order_field = "lga__state__name"
 
 
 @admin.register(Ward)
-class WardAdmin(admin.ModelAdmin):
+class WardAdmin(LargeTableAdmin):
     list_display = ("name", "lga", "state_name", "code")
-    list_filter = ("lga__state__zone", "lga__state")
-    search_fields = ("name", "code", "lga__name", "lga__state__name")
-    ordering = ("lga__state__name", "lga__name", "name")
+    list_filter = hierarchy_filters("lga", "state", "zone")
+    search_fields = ("^name", "=code")
+    ordering = ("lga__name", "name")
     autocomplete_fields = ["lga"]
+    list_select_related = ("lga__state",)
 
     def state_name(self, obj):
         return obj.lga.state.name
     state_name.short_description = "State"
+    state_name.admin_order_field = "lga__state__name"
 
 
 @admin.register(PostalCode)
-class PostalCodeAdmin(admin.ModelAdmin):
+class PostalCodeAdmin(LargeTableAdmin):
     list_display = ("code", "area", "lga", "city", "state_name")
-    list_filter = ("lga__state__zone", "lga__state")
-    search_fields = ("code", "area", "lga__name", "city__name", "lga__state__name")
+    list_filter = hierarchy_filters("lga", "state", "zone")
+    search_fields = ("^code", "^area")
     ordering = ("code",)
     autocomplete_fields = ["lga", "city"]
+    list_select_related = ("lga__state", "city__lga__state")
 
     def state_name(self, obj):
         return obj.lga.state.name
     state_name.short_description = "State"
+    state_name.admin_order_field = "lga__state__name"
+
 
+@admin.register(LocationAlias)
+class LocationAliasAdmin(admin.ModelAdmin):
+    list_display = ("alias", "kind", "object_id", "normalized_alias")
+    list_filter = ("kind",)
+    search_fields = ("alias", "normalized_alias")
+    ordering = ("kind", "normalized_alias")
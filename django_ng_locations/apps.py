@@ -6,3 +6,5 @@ class DjangoNgLocationsConfig(AppConfig):
     name = "django_ng_locations"
     verbose_name = "Nigerian Locations"
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,439 @@
+"""
+Reproducible benchmarks of the loader, lookups, search and admin
+
+``run_benchmarks`` loads a synthetic dataset shaped like the real one (the
+bundled zones, states and LGAs plus generated cities, wards and postal codes)
+into a throwaway test database created from the default one, measures each
+part and destroys the database again; with ``in_place=True`` it uses the
+default database itself and rolls everything back. Dataset version bumps go
+to benchmark-only cache keys, so the shared caches are left as they were.
+``manage.py benchmark_ng_locations`` runs it and prints or saves the results;
+run it with settings whose default database is SQLite or PostgreSQL to
+compare backends.
+
+Timings are medians (and 95th percentiles) of repeated calls in
+microseconds, except load times, which are single wall-clock runs in
+seconds, and the fixture module phase, which measures importing the module,
+streaming its records and building ``NIGERIA_DATA`` from the synthetic
+records in a fresh interpreter, in milliseconds and MiB of peak RSS. Query counts are exact and make the best regression check, as they
+do not depend on the machine.
+"""
+import gzip
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from io import StringIO
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from . import utils
+from .conf import get_setting
+from .fixtures import nigeria_data
+from .geo import invalidate_geo_index
+from .index import get_index, invalidate_index
+from .models import Zone, State, LGA, City, Ward, PostalCode
+from .postal import get_postal_index, invalidate_postal_index
+from .search import get_search_index, invalidate_search_index
+
+PHASES = ("import", "load", "lookups", "search", "admin")
+
+# Synthetic rows, roughly the size of the full ward and postal code lists
+DEFAULT_SIZES = {"cities": 5_000, "wards": 9_000, "postal_codes": 50_000}
+
+# Locations the lookups are measured with; all exist in the bundled data
+SAMPLE = {"zone": "South West", "zone_code": "south_west", "state": "Lagos", "state_code": "LA", "lga": "Ikeja"}
+
+SEARCH_QUERIES = ("ikeja", "ibadan north", "ogbomoso", "kano", "ward 1", "zzz")
+
+
+# Run in a fresh interpreter, so nothing is imported or allocated already.
+# ru_maxrss is the peak RSS, in KiB (bytes on macOS); it only grows, so the
+# steps run from the cheapest to the most expensive.
+_IMPORT_SCRIPT = """
+import json, sys, time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def measure(func):
+    before, start = peak_mib(), time.perf_counter()
+    result = func()
+    elapsed = round((time.perf_counter() - start) * 1000, 1)
+    peak = peak_mib()
+    return result, {"ms": elapsed, "peak_rss_mib": None if peak is None else round(peak - before, 1)}
+
+path = sys.argv[1]
+module, results = measure(lambda: __import__("django_ng_locations.fixtures.nigeria_data", fromlist=["*"]))
+results = {"import": results, "lazy": "NIGERIA_DATA" not in vars(module)}
+count, results["stream"] = measure(lambda: sum(1 for _ in module.iter_records(path)))
+results["records"] = count
+_, results["build_data"] = measure(lambda: module.load_data(path))
+print(json.dumps(results))
+"""
+
+
+class _Rollback(Exception):
+    pass
+
+
+def synthetic_records(
+    cities: int = DEFAULT_SIZES["cities"],
+    wards: int = DEFAULT_SIZES["wards"],
+    postal_codes: int = DEFAULT_SIZES["postal_codes"],
+    seed: int = 0,
+) -> Iterator[dict]:
+    """
+    The bundled zones, states and LGAs followed by generated cities, wards
+    and postal codes spread unevenly over the LGAs; the same arguments
+    always give the same records
+    """
+    rng = random.Random(seed)
+    lgas = []
+    for record in nigeria_data.iter_records():
+        if record["type"] == "lga":
+            lgas.append((record["state"], record["name"]))
+        yield record
+
+    # Skewed like real data: a few LGAs hold many of the rows
+    weights = [rng.paretovariate(1.5) for _ in lgas]
+    for level, count, key in (("city", cities, "name"), ("ward", wards, "name"), ("postal_code", postal_codes, "code")):
+        numbers: Dict[tuple, int] = {}
+        for index, (state, lga) in enumerate(rng.choices(lgas, weights, k=count)):
+            numbers[state, lga] = number = numbers.get((state, lga), 0) + 1
+            if level == "postal_code":
+                yield {"type": level, "state": state, "lga": lga, "code": str(100000 + index)}
+            else:
+                label = "Town" if level == "city" else "Ward"
+                yield {"type": level, "state": state, "lga": lga, key: f"{lga} {label} {number}"}
+
+
+def _timings(func: Callable, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples), 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+    }
+
+
+def _queries(func: Callable) -> int:
+    with CaptureQueriesContext(connection) as captured:
+        func()
+    return len(captured.captured_queries)
+
+
+def _invalidate() -> None:
+    invalidate_index()
+    invalidate_search_index()
+    invalidate_geo_index()
+    invalidate_postal_index()
+
+
+def _evaluate(result):
+    # Querysets are lazy; the cost of a helper is paid when it is iterated
+    return list(result) if hasattr(result, "__iter__") and not isinstance(result, (str, dict)) else result
+
+
+@contextmanager
+def _test_database():
+    """Point the default connection at a new test database, destroyed afterwards"""
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def _benchmark_cache_keys():
+    """Keep the dataset version bumps of the benchmark loads off the shared cache keys"""
+    prefix = f"{get_setting('CACHE_KEY_PREFIX')}:benchmark"
+    with override_settings(NG_LOCATIONS_CACHE_KEY_PREFIX=prefix):
+        try:
+            yield
+        finally:
+            caches[get_setting("CACHE_ALIAS")].delete(f"{prefix}:version")
+
+
+def benchmark_import(records_path: str) -> dict:
+    """
+    Time and peak RSS of importing ``fixtures.nigeria_data``, streaming the
+    records of a gzipped copy of ``records_path`` and building the dataset
+    dict from them (what the first ``NIGERIA_DATA`` access does)
+    """
+    fd, data_path = tempfile.mkstemp(suffix=".ndjson.gz")
+    try:
+        with os.fdopen(fd, "wb") as raw, open(records_path, "rb") as f:
+            with gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as compressed:
+                shutil.copyfileobj(f, compressed)
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, (package_root, os.environ.get("PYTHONPATH"))))}
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SCRIPT, data_path], env=env, capture_output=True, text=True, check=True,
+        ).stdout
+    finally:
+        os.unlink(data_path)
+    return json.loads(output)
+
+
+def benchmark_load(records_path: str) -> dict:
+    """Wall time of a clean load, a no-op reload and an unchanged --sync"""
+    results = {}
+    runs = (("clean", {"clear": True}), ("reload", {}), ("sync_unchanged", {"sync": True}), ("sync_again", {"sync": True}))
+    for name, options in runs:
+        start = time.perf_counter()
+        call_command("load_ng_locations", source=records_path, stdout=StringIO(), **options)
+        results[f"{name}_s"] = round(time.perf_counter() - start, 3)
+    # The first --sync stores the hashes; the second shows the skip path
+    results.pop("sync_unchanged_s")
+    return results
+
+
+def _lookups() -> Dict[str, Callable]:
+    city = City.objects.filter(lga__name=SAMPLE["lga"]).values_list("name", flat=True).first()
+    postal_code = PostalCode.objects.values_list("code", flat=True).first()
+    zone, state, lga = SAMPLE["zone"], SAMPLE["state"], SAMPLE["lga"]
+    return {
+        "get_all_zones": lambda: utils.get_all_zones(),
+        "get_zone_by_name": lambda: utils.get_zone_by_name(zone),
+        "get_zone_by_code": lambda: utils.get_zone_by_code(SAMPLE["zone_code"]),
+        "get_states_by_zone": lambda: utils.get_states_by_zone(zone),
+        "get_state_by_name": lambda: utils.get_state_by_name(state),
+        "get_state_by_code": lambda: utils.get_state_by_code(SAMPLE["state_code"]),
+        "get_lgas_by_state": lambda: utils.get_lgas_by_state(state),
+        "get_lgas_by_zone": lambda: utils.get_lgas_by_zone(zone),
+        "get_lga_by_name": lambda: utils.get_lga_by_name(lga, state),
+        "get_cities_by_lga": lambda: utils.get_cities_by_lga(lga, state),
+        "get_cities_by_state": lambda: utils.get_cities_by_state(state),
+        "get_city_by_name": lambda: utils.get_city_by_name(city or lga, state),
+        "get_wards_by_lga": lambda: utils.get_wards_by_lga(lga, state),
+        "get_wards_by_state": lambda: utils.get_wards_by_state(state),
+        "get_postal_code": lambda: utils.get_postal_code(postal_code or ""),
+        "get_postal_codes_by_lga": lambda: utils.get_postal_codes_by_lga(lga, state),
+        "get_postal_codes_by_state": lambda: utils.get_postal_codes_by_state(state),
+        "get_postal_codes_by_prefix": lambda: utils.get_postal_codes_by_prefix((postal_code or "")[:4]),
+        "get_postal_codes_in_range": lambda: utils.get_postal_codes_in_range("100000", "100999"),
+    }
+
+
+def benchmark_lookups(iterations: int) -> dict:
+    """
+    Every ``utils`` lookup against the database ("cold") and with the warm
+    in-process indexes ("cached", ``NG_LOCATIONS_USE_INDEX`` and
+    ``NG_LOCATIONS_USE_POSTAL_INDEX``)
+    """
+    results = {}
+    for name, invalidate, build in (
+        ("index_build_us", invalidate_index, get_index),
+        ("postal_index_build_us", invalidate_postal_index, get_postal_index),
+    ):
+        start = time.perf_counter()
+        invalidate()
+        build()
+        results[name] = round((time.perf_counter() - start) * 1e6, 1)
+
+    for name, lookup in _lookups().items():
+        call = lambda: _evaluate(lookup())  # noqa: E731
+        entry = {}
+        for mode, use_index in (("cold", False), ("cached", True)):
+            with override_settings(NG_LOCATIONS_USE_INDEX=use_index, NG_LOCATIONS_USE_POSTAL_INDEX=use_index):
+                call()  # warm up
+                entry[mode] = {**_timings(call, iterations), "queries": _queries(call)}
+        results[name] = entry
+    return results
+
+
+def benchmark_search(iterations: int) -> dict:
+    """``search_locations`` with ``icontains`` scans and with the search index"""
+    results = {}
+    invalidate_search_index()
+    start = time.perf_counter()
+    get_search_index()
+    results["index_build_us"] = round((time.perf_counter() - start) * 1e6, 1)
+
+    for mode, use_index in (("scan", False), ("index", True)):
+        with override_settings(NG_LOCATIONS_USE_SEARCH_INDEX=use_index):
+            def call():
+                for query in SEARCH_QUERIES:
+                    for queryset in utils.search_locations(query, limit=10).values():
+                        list(queryset)
+            call()
+            timings = _timings(call, max(1, iterations // 10))
+            results[mode] = {
+                "per_query_median_us": round(timings["median_us"] / len(SEARCH_QUERIES), 1),
+                "queries": _queries(call) // len(SEARCH_QUERIES),
+            }
+    return results
+
+
+def benchmark_admin(iterations: int) -> dict:
+    """Queries and time of the first changelist page of every admin, unfiltered and per state"""
+    from django.contrib import admin
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+
+    user = get_user_model()(is_active=True, is_staff=True, is_superuser=True)
+    factory = RequestFactory()
+    state_id = State.objects.get(name=SAMPLE["state"]).id
+    results = {}
+    for model in (Zone, State, LGA, City, Ward, PostalCode):
+        model_admin = admin.site._registry.get(model)
+        if model_admin is None:
+            continue
+        entry = {}
+        filters = {"unfiltered": {}}
+        if model in (City, Ward, PostalCode):
+            filters["state"] = {"state": state_id}
+
+        for label, params in filters.items():
+            def view(params=params):
+                request = factory.get("/", params)
+                request.user = user
+                model_admin.changelist_view(request).render()
+            view()
+            entry[label] = {**_timings(view, max(1, iterations // 10)), "queries": _queries(view)}
+        results[model._meta.model_name] = entry
+    return results
+
+
+def run_benchmarks(
+    phases=PHASES,
+    iterations: int = 50,
+    sizes: Optional[Dict[str, int]] = None,
+    seed: int = 0,
+    log: Callable[[str], None] = lambda message: None,
+    in_place: bool = False,
+) -> dict:
+    """
+    Load the synthetic dataset into a test database, run ``phases`` and
+    destroy the database
+
+    With ``in_place`` the default database is used, in a transaction that is
+    rolled back. Returns the results per phase together with the environment
+    they were measured in.
+    """
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    results = {
+        "environment": {
+            "vendor": connection.vendor,
+            "database": str(connection.settings_dict["NAME"]),
+            "iterations": iterations,
+            "seed": seed,
+            **sizes,
+        },
+    }
+    fd, records_path = tempfile.mkstemp(suffix=".ndjson")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for record in synthetic_records(seed=seed, **sizes):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        if "import" in phases:
+            log("Benchmarking the fixture module...")
+            results["import"] = benchmark_import(records_path)
+        if not set(phases) - {"import"}:
+            return results
+
+        with ExitStack() as stack:
+            if not in_place:
+                log("Creating a test database...")
+                stack.enter_context(_test_database())
+                results["environment"]["database"] = str(connection.settings_dict["NAME"])
+            stack.enter_context(_benchmark_cache_keys())
+            try:
+                with transaction.atomic():
+                    log("Loading the synthetic dataset...")
+                    if "load" in phases:
+                        results["load"] = benchmark_load(records_path)
+                    else:
+                        call_command("load_ng_locations", source=records_path, clear=True, stdout=StringIO())
+                    results["environment"]["rows"] = {
+                        model._meta.model_name: model.objects.count()
+                        for model in (Zone, State, LGA, City, Ward, PostalCode)
+                    }
+                    _invalidate()
+                    for phase, bench in (
+                        ("lookups", benchmark_lookups), ("search", benchmark_search), ("admin", benchmark_admin),
+                    ):
+                        if phase in phases:
+                            log(f"Benchmarking {phase}...")
+                            results[phase] = bench(iterations)
+                    raise _Rollback
+            except _Rollback:
+                pass
+    finally:
+        os.unlink(records_path)
+        # Indexes built from the rolled-back rows must not outlive them
+        _invalidate()
+    return results
+
+
+def format_results(results: dict) -> List[str]:
+    """Human-readable lines for ``results``"""
+    env = results["environment"]
+    lines = [
+        f"Database: {env['vendor']} ({env['database']}), {env['iterations']} iterations, seed {env['seed']}",
+    ]
+    if "rows" in env:
+        lines.append("Rows: " + ", ".join(f"{count} {name}" for name, count in env["rows"].items()))
+    if "import" in results:
+        lines += ["", f"Fixture module, {results['import']['records']} records (ms / peak RSS MiB)"]
+        for step in ("import", "stream", "build_data"):
+            values = results["import"][step]
+            rss = "n/a" if values["peak_rss_mib"] is None else f"+{values['peak_rss_mib']:.1f}"
+            lines.append(f"  {step:<28}{values['ms']:>10.1f}{rss:>10}")
+    if "load" in results:
+        lines += ["", "load_ng_locations (s)"]
+        lines += [f"  {name[:-2]:<28}{value:>10.3f}" for name, value in results["load"].items()]
+    if "lookups" in results:
+        lookups = results["lookups"]
+        lines += [
+            "",
+            f"Lookups (median us / queries; index built in {lookups['index_build_us'] / 1000:.1f} ms, "
+            f"postal code index in {lookups['postal_index_build_us'] / 1000:.1f} ms)",
+        ]
+        lines.append(f"  {'':<28}{'cold':>10}{'q':>4}{'cached':>10}{'q':>4}")
+        for name, entry in lookups.items():
+            if name.endswith("_build_us"):
+                continue
+            cold, cached = entry["cold"], entry["cached"]
+            lines.append(
+                f"  {name:<28}{cold['median_us']:>10.1f}{cold['queries']:>4}"
+                f"{cached['median_us']:>10.1f}{cached['queries']:>4}"
+            )
+    if "search" in results:
+        search = results["search"]
+        lines += ["", f"search_locations (per query; index built in {search['index_build_us'] / 1000:.1f} ms)"]
+        for mode in ("scan", "index"):
+            lines.append(
+                f"  {mode:<28}{search[mode]['per_query_median_us']:>10.1f} us{search[mode]['queries']:>4} queries"
+            )
+    if "admin" in results:
+        lines += ["", "Admin changelists (median us / queries)"]
+        for name, entry in results["admin"].items():
+            for label, values in entry.items():
+                lines.append(f"  {name + ' ' + label:<28}{values['median_us']:>10.1f}{values['queries']:>4}")
+    return lines
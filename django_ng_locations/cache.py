@@ -0,0 +1,138 @@
+"""
+Cache-framework backed hierarchy slices
+
+Children of a location (the LGAs of a state, the wards of an LGA, ...) are
+stored as lists of plain dicts in the Django cache configured by
+``NG_LOCATIONS_CACHE_ALIAS``, so all worker processes share them. Every key
+carries the dataset version; bumping the version (``load_ng_locations`` does
+so after each load, model signals after each change) makes all workers move
+to fresh keys at once while the old entries expire on their own.
+"""
+import time
+from typing import List, Optional
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .conf import get_setting
+from .instrumentation import record_cache_access
+from .models import Zone, State, LGA, City, Ward, PostalCode
+
+# Slice name -> (model, parent field, fields)
+SLICES = {
+    "zones": (Zone, None, ("id", "name", "code")),
+    "states": (State, "zone_id", ("id", "name", "code", "capital", "latitude", "longitude")),
+    "lgas": (LGA, "state_id", ("id", "name", "code")),
+    "cities": (City, "lga_id", ("id", "name", "is_capital", "population", "latitude", "longitude")),
+    "wards": (Ward, "lga_id", ("id", "name", "code")),
+    "postal_codes": (PostalCode, "lga_id", ("id", "code", "area", "city_id")),
+}
+
+
+def _cache():
+    return caches[get_setting("CACHE_ALIAS")]
+
+
+def _key(*parts) -> str:
+    return ":".join([get_setting("CACHE_KEY_PREFIX"), *map(str, parts)])
+
+
+# Version of this process, used when the backend keeps no values (e.g.
+# DummyCache)
+_local_version = 0
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
+def get_dataset_version() -> int:
+    """
+    Current dataset version
+
+    Versions are millisecond timestamps, so a version lost to cache eviction
+    is replaced by a newer one and never collides with keys written before.
+    A missing version is seeded with ``cache.add()``, so concurrent workers
+    agree on one; if the backend keeps nothing, the version of this process
+    is used.
+    """
+    global _local_version
+    cache = _cache()
+    key = _key("version")
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _now(), timeout=None)
+        version = cache.get(key)
+        if version is None:
+            if not _local_version:
+                _local_version = _now()
+            return _local_version
+    return version
+
+
+def bump_dataset_version() -> int:
+    """Move every worker to a new dataset version, invalidating all slices"""
+    global _local_version
+    version = _local_version = max(get_dataset_version() + 1, _now())
+    _cache().set(_key("version"), version, timeout=None)
+    return version
+
+
+def on_commit_once(func, using: Optional[str] = None) -> None:
+    """
+    ``transaction.on_commit(func)``, unless ``func`` is already scheduled for
+    the current transaction
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.in_atomic_block and any(item[1] is func for item in connection.run_on_commit):
+        return
+    transaction.on_commit(func, using=using)
+
+
+def bump_dataset_version_on_commit(using: Optional[str] = None) -> None:
+    """Bump the dataset version once the current transaction commits"""
+    on_commit_once(bump_dataset_version, using)
+
+
+def get_children(kind: str, parent_id: Optional[int] = None) -> List[dict]:
+    """
+    Serialized children of a location, e.g. ``get_children("lgas", state.id)``
+
+    ``kind`` is one of ``SLICES``; zones have no parent. Results are ordered
+    by name (postal codes by code) and shared through the cache.
+    """
+    model, parent_field, fields = SLICES[kind]
+    if (parent_field is None) != (parent_id is None):
+        raise ValueError(f"{kind!r} slices {'take' if parent_field else 'do not take'} a parent id")
+
+    cache = _cache()
+    key = _key(get_dataset_version(), kind, parent_id if parent_id is not None else "all")
+    children = cache.get(key)
+    record_cache_access("slices", children is not None)
+    if children is None:
+        queryset = model.objects.all()
+        if parent_field:
+            queryset = queryset.filter(**{parent_field: parent_id})
+        children = list(queryset.values(*fields))
+        cache.set(key, children, timeout=get_setting("CACHE_TIMEOUT"))
+    return children
+
+
+def get_states_for_zone(zone_id: int) -> List[dict]:
+    return get_children("states", zone_id)
+
+
+def get_lgas_for_state(state_id: int) -> List[dict]:
+    return get_children("lgas", state_id)
+
+
+def get_cities_for_lga(lga_id: int) -> List[dict]:
+    return get_children("cities", lga_id)
+
+
+def get_wards_for_lga(lga_id: int) -> List[dict]:
+    return get_children("wards", lga_id)
+
+
+def get_postal_codes_for_lga(lga_id: int) -> List[dict]:
+    return get_children("postal_codes", lga_id)
@@ -0,0 +1,34 @@
+"""
+Settings for django_ng_locations
+
+Every setting is read from the project settings with an ``NG_LOCATIONS_``
+prefix, e.g. ``NG_LOCATIONS_USE_INDEX = True``.
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    # Answer zone/state/LGA lookups in utils from an in-process index
+    "USE_INDEX": False,
+    # Answer utils.search_locations from the in-process search index
+    "USE_SEARCH_INDEX": False,
+    # Answer utils.get_postal_code from the in-process postal code index
+    "USE_POSTAL_INDEX": False,
+    # Cache backend (an alias of CACHES) holding serialized hierarchy slices
+    "CACHE_ALIAS": "default",
+    # Seconds a slice is kept; None keeps it until the dataset version changes
+    "CACHE_TIMEOUT": 60 * 60 * 24,
+    "CACHE_KEY_PREFIX": "ng_locations",
+    # max-age (seconds) of the Cache-Control header sent by the JSON views
+    "API_MAX_AGE": 60 * 60,
+    # Compiled snapshot read by snapshot.get_snapshot()
+    "SNAPSHOT_PATH": None,
+    # Report lookup timings, query counts and cache hits (see instrumentation.py)
+    "INSTRUMENTATION": False,
+    # Dotted paths of instrumentation.Collector classes receiving the metrics
+    "COLLECTORS": [],
+}
+
+
+def get_setting(name: str):
+    """Get a package setting, falling back to its default"""
+    return getattr(settings, f"NG_LOCATIONS_{name}", DEFAULTS[name])
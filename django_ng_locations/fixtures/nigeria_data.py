@@ -8,489 +8,90 @@ This file contains complete data for:
 
 Note: Models for cities, wards, and postal codes are available in the package
 but data for these is not included. Users can add their own data for these models.
+
+The data ships as gzipped loader records, one JSON object per line, in
+``nigeria_data.ndjson.gz`` and nothing is read at import:
+
+- ``iter_records()`` streams every record, ``iter_zones()``, ``iter_states()``,
+  ``iter_lgas()``, ``iter_cities()``, ``iter_wards()`` and
+  ``iter_postal_codes()`` the records of one level
+- ``NIGERIA_DATA`` (or ``load_data()``) builds the dataset dict on first
+  access and keeps it; ``from ... import NIGERIA_DATA`` still works
+- ``write_data(data)`` regenerates the file from such a dict
+
+Alternative names are listed under a state's "aliases" and, per LGA, under
+its "lga_aliases"; the loader stores them as LocationAlias rows.
 """
+import gzip
+import json
+import os
+from typing import Iterator, Optional
+
+from ..records import build_data, iter_records as flatten
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "nigeria_data.ndjson.gz")
+
+
+def iter_records(path: str = DATA_FILE) -> Iterator[dict]:
+    """Stream the loader records of the bundled dataset (or of ``path``)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_level(level: str, **parents: Optional[str]) -> Iterator[dict]:
+    parents = {field: value for field, value in parents.items() if value is not None}
+    for record in iter_records():
+        if record["type"] == level and all(record[field] == value for field, value in parents.items()):
+            yield record
+
+
+def iter_zones() -> Iterator[dict]:
+    return _iter_level("zone")
+
+
+def iter_states(zone: Optional[str] = None) -> Iterator[dict]:
+    return _iter_level("state", zone=zone)
+
+
+def iter_lgas(state: Optional[str] = None) -> Iterator[dict]:
+    return _iter_level("lga", state=state)
+
+
+def iter_cities(state: Optional[str] = None, lga: Optional[str] = None) -> Iterator[dict]:
+    return _iter_level("city", state=state, lga=lga)
+
+
+def iter_wards(state: Optional[str] = None, lga: Optional[str] = None) -> Iterator[dict]:
+    return _iter_level("ward", state=state, lga=lga)
+
 
-NIGERIA_DATA = {
-    "North Central": {
-        "code": "north_central",
-        "states": {
-            "Benue": {
-                "code": "BE",
-                "capital": "Makurdi",
-                "lgas": [
-                    "Ado", "Agatu", "Apa", "Buruku", "Gboko", "Guma", "Gwer East",
-                    "Gwer West", "Katsina-Ala", "Konshisha", "Kwande", "Logo",
-                    "Makurdi", "Obi", "Ogbadibo", "Ohimini", "Okpokwu",
-                    "Oturkpo", "Tarka", "Ukum", "Ushongo", "Vandeikya"
-                ]
-            },
-            "Kogi": {
-                "code": "KO",
-                "capital": "Lokoja",
-                "lgas": [
-                    "Adavi", "Ajaokuta", "Ankpa", "Bassa", "Dekina", "Ibaji",
-                    "Idah", "Igalamela-Odolu", "Ijumu", "Kabba/Bunu",
-                    "Kogi", "Lokoja", "Mopa-Muro", "Ofu", "Ogori/Magongo",
-                    "Okehi", "Okene", "Omala", "Yagba East", "Yagba West"
-                ]
-            },
-            "Kwara": {
-                "code": "KW",
-                "capital": "Ilorin",
-                "lgas": [
-                    "Asa", "Baruten", "Edu", "Ekiti", "Ifelodun",
-                    "Ilorin East", "Ilorin South", "Ilorin West",
-                    "Irepodun", "Isin", "Kaiama", "Moro",
-                    "Offa", "Oke Ero", "Oyun", "Pategi"
-                ]
-            },
-            "Nasarawa": {
-                "code": "NA",
-                "capital": "Lafia",
-                "lgas": [
-                    "Akwanga", "Awe", "Doma", "Karu", "Keana", "Keffi",
-                    "Kokona", "Lafia", "Nasarawa", "Nasarawa Egon",
-                    "Obi", "Toto", "Wamba"
-                ]
-            },
-            "Niger": {
-                "code": "NI",
-                "capital": "Minna",
-                "lgas": [
-                    "Agaie", "Agwara", "Bida", "Borgu", "Bosso", "Chanchaga",
-                    "Edati", "Gbako", "Gurara", "Katcha", "Kontagora",
-                    "Lapai", "Lavun", "Magama", "Mariga", "Mashegu",
-                    "Mokwa", "Munya", "Paikoro", "Rafi", "Rijau",
-                    "Shiroro", "Suleja", "Tafa", "Wushishi"
-                ]
-            },
-            "Plateau": {
-                "code": "PL",
-                "capital": "Jos",
-                "lgas": [
-                    "Barkin Ladi", "Bassa", "Bokkos", "Jos East",
-                    "Jos North", "Jos South", "Kanam", "Kanke",
-                    "Langtang North", "Langtang South", "Mangu",
-                    "Mikang", "Pankshin", "Qua'an Pan", "Riyom",
-                    "Shendam", "Wase"
-                ]
-            },
-            "FCT": {
-                "code": "FC",
-                "capital": "Abuja",
-                "lgas": [
-                    "Abuja Municipal", "Bwari", "Gwagwalada",
-                    "Kuje", "Kwali", "Abaji"
-                ]
-            }
-        }
-    },
+def iter_postal_codes(state: Optional[str] = None, lga: Optional[str] = None) -> Iterator[dict]:
+    return _iter_level("postal_code", state=state, lga=lga)
 
-    "North East": {
-        "code": "north_east",
-        "states": {
-            "Adamawa": {
-                "code": "AD",
-                "capital": "Yola",
-                "lgas": [
-                    "Demsa", "Fufore", "Ganye", "Girei", "Gombi", "Guyuk",
-                    "Hong", "Jada", "Lamurde", "Madagali", "Maiha",
-                    "Mayo-Belwa", "Michika", "Mubi North", "Mubi South",
-                    "Numan", "Shelleng", "Song", "Toungo", "Yola North",
-                    "Yola South"
-                ]
-            },
-            "Bauchi": {
-                "code": "BA",
-                "capital": "Bauchi",
-                "lgas": [
-                    "Alkaleri", "Bauchi", "Bogoro", "Damban", "Darazo",
-                    "Dass", "Gamawa", "Ganjuwa", "Giade", "Itas/Gadau",
-                    "Jama'are", "Katagum", "Kirfi", "Misau", "Ningi",
-                    "Shira", "Tafawa Balewa", "Toro", "Warji", "Zaki"
-                ]
-            },
-            "Borno": {
-                "code": "BO",
-                "capital": "Maiduguri",
-                "lgas": [
-                    "Abadam", "Askira/Uba", "Bama", "Bayo", "Biu",
-                    "Chibok", "Damboa", "Dikwa", "Gubio", "Guzamala",
-                    "Gwoza", "Hawul", "Jere", "Kaga", "Kala/Balge",
-                    "Konduga", "Kukawa", "Kwaya Kusar", "Mafa",
-                    "Magumeri", "Maiduguri", "Marte", "Mobbar",
-                    "Monguno", "Ngala", "Nganzai", "Shani"
-                ]
-            },
-            "Gombe": {
-                "code": "GO",
-                "capital": "Gombe",
-                "lgas": [
-                    "Akko", "Balanga", "Billiri", "Dukku", "Funakaye",
-                    "Gombe", "Kaltungo", "Kwami", "Nafada",
-                    "Shongom", "Yamaltu/Deba"
-                ]
-            },
-            "Taraba": {
-                "code": "TA",
-                "capital": "Jalingo",
-                "lgas": [
-                    "Ardo Kola", "Bali", "Donga", "Gashaka", "Gassol",
-                    "Ibi", "Jalingo", "Karim Lamido", "Kurmi", "Lau",
-                    "Sardauna", "Takum", "Ussa", "Wukari", "Yorro", "Zing"
-                ]
-            },
-            "Yobe": {
-                "code": "YO",
-                "capital": "Damaturu",
-                "lgas": [
-                    "Bade", "Bursari", "Damaturu", "Fika", "Fune",
-                    "Geidam", "Gujba", "Gulani", "Jakusko", "Karasuwa",
-                    "Machina", "Nangere", "Nguru", "Potiskum",
-                    "Tarmuwa", "Yunusari", "Yusufari"
-                ]
-            }
-        }
-    },
 
-    "North West": {
-        "code": "north_west",
-        "states": {
-            "Jigawa": {
-                "code": "JI",
-                "capital": "Dutse",
-                "lgas": [
-                    "Auyo", "Babura", "Biriniwa", "Birnin Kudu", "Buji",
-                    "Dutse", "Gagarawa", "Garki", "Gumel", "Guri",
-                    "Gwaram", "Hadejia", "Jahun", "Kafin Hausa",
-                    "Kazaure", "Kiri Kasama", "Kiyawa", "Maigatari",
-                    "Malam Madori", "Miga", "Ringim", "Roni",
-                    "Sule Tankarkar", "Taura", "Yankwashi"
-                ]
-            },
-            "Kaduna": {
-                "code": "KD",
-                "capital": "Kaduna",
-                "lgas": [
-                    "Birnin Gwari", "Chikun", "Giwa", "Igabi", "Ikara",
-                    "Jaba", "Jema'a", "Kachia", "Kaduna North",
-                    "Kaduna South", "Kagarko", "Kajuru", "Kaura",
-                    "Kauru", "Kubau", "Kudan", "Lere", "Makarfi",
-                    "Sabon Gari", "Sanga", "Soba", "Zangon Kataf",
-                    "Zaria"
-                ]
-            },
-            "Kano": {
-                "code": "KN",
-                "capital": "Kano",
-                "lgas": [
-                    "Ajingi", "Albasu", "Bagwai", "Bebeji", "Bichi",
-                    "Bunkure", "Dala", "Dambatta", "Dawakin Kudu",
-                    "Dawakin Tofa", "Doguwa", "Fagge", "Gabasawa",
-                    "Garko", "Garun Mallam", "Gaya", "Gezawa",
-                    "Gwale", "Gwarzo", "Kabo", "Kano Municipal",
-                    "Karaye", "Kibiya", "Kiru", "Kumbotso",
-                    "Kunchi", "Kura", "Madobi", "Makoda", "Minjibir",
-                    "Nasarawa", "Rano", "Rimin Gado", "Rogo",
-                    "Shanono", "Sumaila", "Takai", "Tarauni",
-                    "Tofa", "Tsanyawa", "Tudun Wada", "Ungogo",
-                    "Warawa", "Wudil"
-                ]
-            },
-            "Katsina": {
-                "code": "KT",
-                "capital": "Katsina",
-                "lgas": [
-                    "Bakori", "Batagarawa", "Batsari", "Baure", "Bindawa",
-                    "Charanchi", "Dandume", "Danja", "Dan Musa",
-                    "Daura", "Dutsi", "Dutsin-Ma", "Faskari", "Funtua",
-                    "Ingawa", "Jibia", "Kafur", "Kaita", "Kankara",
-                    "Kankia", "Katsina", "Kurfi", "Kusada", "Mai'Adua",
-                    "Malumfashi", "Mani", "Mashi", "Matazu",
-                    "Musawa", "Rimi", "Sabuwa", "Safana", "Sandamu",
-                    "Zango"
-                ]
-            },
-            "Kebbi": {
-                "code": "KE",
-                "capital": "Birnin Kebbi",
-                "lgas": [
-                    "Aleiro", "Arewa Dandi", "Argungu", "Augie",
-                    "Bagudo", "Birnin Kebbi", "Bunza", "Dandi",
-                    "Fakai", "Gwandu", "Jega", "Kalgo", "Koko/Besse",
-                    "Maiyama", "Ngaski", "Sakaba", "Shanga",
-                    "Suru", "Wasagu/Danko", "Yauri", "Zuru"
-                ]
-            },
-            "Sokoto": {
-                "code": "SO",
-                "capital": "Sokoto",
-                "lgas": [
-                    "Binji", "Bodinga", "Dange Shuni", "Gada",
-                    "Goronyo", "Gudu", "Gwadabawa", "Illela",
-                    "Isa", "Kebbe", "Kware", "Rabah",
-                    "Sabon Birni", "Shagari", "Silame",
-                    "Sokoto North", "Sokoto South", "Tambuwal",
-                    "Tangaza", "Tureta", "Wamako", "Wurno", "Yabo"
-                ]
-            },
-            "Zamfara": {
-                "code": "ZA",
-                "capital": "Gusau",
-                "lgas": [
-                    "Anka", "Bakura", "Birnin Magaji/Kiyaw",
-                    "Bukkuyum", "Bungudu", "Gummi", "Gusau",
-                    "Kaura Namoda", "Maradun", "Maru",
-                    "Shinkafi", "Talata Mafara", "Zurmi"
-                ]
-            }
-        }
-    },
+def load_data(path: str = DATA_FILE) -> dict:
+    """Build a fresh ``NIGERIA_DATA``-style dict from the data file"""
+    return build_data(iter_records(path))
 
-    "South East": {
-        "code": "south_east",
-        "states": {
-            "Abia": {
-                "code": "AB",
-                "capital": "Umuahia",
-                "lgas": [
-                    "Aba North", "Aba South", "Arochukwu", "Bende",
-                    "Ikwuano", "Isiala Ngwa North", "Isiala Ngwa South",
-                    "Isuikwuato", "Obi Ngwa", "Ohafia", "Osisioma",
-                    "Ugwunagbo", "Ukwa East", "Ukwa West",
-                    "Umuahia North", "Umuahia South", "Umu Nneochi"
-                ]
-            },
-            "Anambra": {
-                "code": "AN",
-                "capital": "Awka",
-                "lgas": [
-                    "Aguata", "Anambra East", "Anambra West", "Anaocha",
-                    "Awka North", "Awka South", "Ayamelum", "Dunukofia",
-                    "Ekwusigo", "Idemili North", "Idemili South",
-                    "Ihiala", "Njikoka", "Nnewi North", "Nnewi South",
-                    "Ogbaru", "Onitsha North", "Onitsha South",
-                    "Orumba North", "Orumba South", "Oyi"
-                ]
-            },
-            "Ebonyi": {
-                "code": "EB",
-                "capital": "Abakaliki",
-                "lgas": [
-                    "Abakaliki", "Afikpo North", "Afikpo South",
-                    "Ebonyi", "Ezza North", "Ezza South", "Ikwo",
-                    "Ishielu", "Ivo", "Izzi", "Ohaozara",
-                    "Ohaukwu", "Onicha"
-                ]
-            },
-            "Enugu": {
-                "code": "EN",
-                "capital": "Enugu",
-                "lgas": [
-                    "Aninri", "Awgu", "Enugu East", "Enugu North",
-                    "Enugu South", "Ezeagu", "Igbo Etiti",
-                    "Igbo Eze North", "Igbo Eze South", "Isi Uzo",
-                    "Nkanu East", "Nkanu West", "Nsukka",
-                    "Oji River", "Udenu", "Udi", "Uzo Uwani"
-                ]
-            },
-            "Imo": {
-                "code": "IM",
-                "capital": "Owerri",
-                "lgas": [
-                    "Aboh Mbaise", "Ahiazu Mbaise", "Ehime Mbano",
-                    "Ezinihitte Mbaise", "Ideato North", "Ideato South",
-                    "Ihitte/Uboma", "Ikeduru", "Isiala Mbano",
-                    "Isu", "Mbaitoli", "Ngor Okpala",
-                    "Njaba", "Nkwerre", "Nwangele",
-                    "Obowo", "Oguta", "Ohaji/Egbema",
-                    "Okigwe", "Onuimo", "Orlu", "Orsu", "Oru East",
-                    "Oru West", "Owerri Municipal",
-                    "Owerri North", "Owerri West"
-                ]
-            }
-        }
-    },
 
-    "South South": {
-        "code": "south_south",
-        "states": {
-            "Akwa Ibom": {
-                "code": "AK",
-                "capital": "Uyo",
-                "lgas": [
-                    "Abak", "Eastern Obolo", "Eket", "Esit Eket",
-                    "Essien Udim", "Etim Ekpo", "Etinan", "Ibeno",
-                    "Ibesikpo Asutan", "Ibiono-Ibom", "Ika",
-                    "Ikono", "Ikot Abasi", "Ikot Ekpene",
-                    "Ini", "Itu", "Mbo", "Mkpat-Enin",
-                    "Nsit-Atai", "Nsit-Ibom", "Nsit-Ubium",
-                    "Obot Akara", "Okobo", "Onna",
-                    "Oron", "Oruk Anam", "Udung-Uko",
-                    "Ukanafun", "Uruan", "Urue-Offong/Oruko",
-                    "Uyo"
-                ]
-            },
-            "Bayelsa": {
-                "code": "BY",
-                "capital": "Yenagoa",
-                "lgas": [
-                    "Brass", "Ekeremor", "Kolokuma/Opokuma",
-                    "Nembe", "Ogbia", "Sagbama",
-                    "Southern Ijaw", "Yenagoa"
-                ]
-            },
-            "Cross River": {
-                "code": "CR",
-                "capital": "Calabar",
-                "lgas": [
-                    "Abi", "Akamkpa", "Akpabuyo", "Bakassi",
-                    "Bekwarra", "Biase", "Boki", "Calabar Municipal",
-                    "Calabar South", "Etung", "Ikom",
-                    "Obanliku", "Obubra", "Obudu",
-                    "Odukpani", "Ogoja", "Yakurr", "Yala"
-                ]
-            },
-            "Delta": {
-                "code": "DE",
-                "capital": "Asaba",
-                "lgas": [
-                    "Aniocha North", "Aniocha South", "Bomadi",
-                    "Burutu", "Ethiope East", "Ethiope West",
-                    "Ika North East", "Ika South", "Isoko North",
-                    "Isoko South", "Ndokwa East", "Ndokwa West",
-                    "Okpe", "Oshimili North", "Oshimili South",
-                    "Patani", "Sapele", "Udu", "Ughelli North",
-                    "Ughelli South", "Ukwuani", "Uvwie",
-                    "Warri North", "Warri South", "Warri South West"
-                ]
-            },
-            "Edo": {
-                "code": "ED",
-                "capital": "Benin City",
-                "lgas": [
-                    "Akoko-Edo", "Egor", "Esan Central",
-                    "Esan North-East", "Esan South-East",
-                    "Esan West", "Etsako Central",
-                    "Etsako East", "Etsako West",
-                    "Igueben", "Ikpoba-Okha",
-                    "Oredo", "Orhionmwon",
-                    "Ovia North-East", "Ovia South-West",
-                    "Owan East", "Owan West", "Uhunmwonde"
-                ]
-            },
-            "Rivers": {
-                "code": "RI",
-                "capital": "Port Harcourt",
-                "lgas": [
-                    "Abua/Odual", "Ahoada East", "Ahoada West",
-                    "Akuku-Toru", "Andoni", "Asari-Toru",
-                    "Bonny", "Degema", "Eleme", "Emohua",
-                    "Etche", "Gokana", "Ikwerre",
-                    "Khana", "Obio/Akpor", "Ogba/Egbema/Ndoni",
-                    "Ogu/Bolo", "Okrika", "Omuma",
-                    "Opobo/Nkoro", "Oyigbo", "Port Harcourt",
-                    "Tai"
-                ]
-            }
-        }
-    },
+def write_data(data: dict, path: str = DATA_FILE) -> int:
+    """Write a ``NIGERIA_DATA``-style dict to ``path``; returns the number of records"""
+    count = 0
+    # No name or mtime in the header: identical data gives an identical file
+    with open(path, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as compressed:
+        for record in flatten(data):
+            compressed.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            compressed.write(b"\n")
+            count += 1
+    return count
 
-    "South West": {
-        "code": "south_west",
-        "states": {
-            "Ekiti": {
-                "code": "EK",
-                "capital": "Ado Ekiti",
-                "lgas": [
-                    "Ado Ekiti", "Efon", "Ekiti East", "Ekiti South-West",
-                    "Ekiti West", "Emure", "Gbonyin", "Ido Osi",
-                    "Ijero", "Ikere", "Ikole", "Ilejemeje",
-                    "Irepodun/Ifelodun", "Ise/Orun",
-                    "Moba", "Oye"
-                ]
-            },
-            "Lagos": {
-                "code": "LA",
-                "capital": "Ikeja",
-                "lgas": [
-                    "Agege", "Ajeromi-Ifelodun", "Alimosho",
-                    "Amuwo-Odofin", "Apapa", "Badagry",
-                    "Epe", "Eti-Osa", "Ibeju-Lekki",
-                    "Ifako-Ijaye", "Ikeja", "Ikorodu",
-                    "Kosofe", "Lagos Island", "Lagos Mainland",
-                    "Mushin", "Ojo", "Oshodi-Isolo",
-                    "Shomolu", "Surulere"
-                ]
-            },
-            "Ogun": {
-                "code": "OG",
-                "capital": "Abeokuta",
-                "lgas": [
-                    "Abeokuta North", "Abeokuta South",
-                    "Ado-Odo/Ota", "Egbado North", "Egbado South",
-                    "Ewekoro", "Ifo", "Ijebu East", "Ijebu North",
-                    "Ijebu North East", "Ijebu Ode",
-                    "Ikenne", "Imeko Afon", "Ipokia",
-                    "Obafemi Owode", "Odeda",
-                    "Odogbolu", "Remo North",
-                    "Shagamu"
-                ]
-            },
-            "Ondo": {
-                "code": "ON",
-                "capital": "Akure",
-                "lgas": [
-                    "Akoko North-East", "Akoko North-West",
-                    "Akoko South-East", "Akoko South-West",
-                    "Akure North", "Akure South",
-                    "Ese Odo", "Idanre", "Ifedore",
-                    "Ilaje", "Ile Oluji/Okeigbo",
-                    "Irele", "Odigbo",
-                    "Okitipupa", "Ondo East", "Ondo West",
-                    "Ose", "Owo"
-                ]
-            },
-            "Osun": {
-                "code": "OS",
-                "capital": "Osogbo",
-                "lgas": [
-                    "Aiyedade", "Aiyedire", "Atakunmosa East",
-                    "Atakunmosa West", "Boluwaduro", "Boripe",
-                    "Ede North", "Ede South", "Egbedore",
-                    "Ejigbo", "Ifedayo", "Ifelodun",
-                    "Ife Central", "Ife East",
-                    "Ife North", "Ife South",
-                    "Ila", "Ilesa East", "Ilesa West",
-                    "Irepodun", "Irewole",
-                    "Isokan", "Iwo", "Obokun",
-                    "Odo Otin", "Ola Oluwa",
-                    "Olorunda", "Oriade",
-                    "Orolu", "Osogbo"
-                ]
-            },
-            "Oyo": {
-                "code": "OY",
-                "capital": "Ibadan",
-                "lgas": [
-                    "Afijio", "Akinyele", "Atiba",
-                    "Atisbo", "Egbeda", "Ibadan North",
-                    "Ibadan North-East", "Ibadan North-West",
-                    "Ibadan South-East", "Ibadan South-West",
-                    "Ibarapa Central", "Ibarapa East",
-                    "Ibarapa North", "Ido",
-                    "Irepo", "Iseyin", "Itesiwaju",
-                    "Iwajowa", "Kajola", "Lagelu",
-                    "Ogbomosho North", "Ogbomosho South",
-                    "Ogo Oluwa", "Olorunsogo",
-                    "Oluyole", "Ona Ara",
-                    "Orelope", "Ori Ire",
-                    "Oyo East", "Oyo West",
-                    "Saki East", "Saki West",
-                    "Surulere"
-                ]
-            }
-        }
-    }
-}
 
+def __getattr__(name: str):
+    if name == "NIGERIA_DATA":
+        # Materialized on first access only, then kept like a module global
+        global NIGERIA_DATA
+        NIGERIA_DATA = load_data()
+        return NIGERIA_DATA
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,402 @@
+"""
+Reverse geocoding against the coordinates of cities and states
+
+Cities and states with a latitude and longitude are bucketed once per
+process into a grid of fixed-size lat/lon cells. A nearest-neighbour query
+scans rings of cells around the query point and stops as soon as no
+unvisited cell can hold anything closer, so a lookup touches a handful of
+cells instead of every row. No spatial database extension is needed.
+
+The index is dropped whenever a ``City`` or ``State`` changes (see
+``signals.py``) and after ``load_ng_locations``.
+
+``nearest_cities_batch`` and ``states_for_points`` tag large arrays of
+points at once with NumPy (optional, ``pip install django-ng-locations[numpy]``).
+"""
+import heapq
+import math
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .index import StateEntry
+from .instrumentation import record_cache_access
+from .models import City, State
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Grid cell size in degrees (about 28 km)
+DEFAULT_CELL_SIZE = 0.25
+
+# Size of the point x reference matrix computed at once by the batch API
+# (2**22 float64 values, 32 MB)
+BATCH_CHUNK_ELEMENTS = 2 ** 22
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _check_point(lat: float, lon: float) -> None:
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Invalid coordinates: {lat}, {lon}")
+
+
+class CityPoint(NamedTuple):
+    # In model field order, as to_model() requires
+    id: int
+    lga_id: int
+    name: str
+    state_id: int
+    # Denormalized, so str() of the model needs no query
+    full_name: str
+    latitude: float
+    longitude: float
+
+    def to_model(self) -> City:
+        """A City with these fields loaded; other fields load on access"""
+        return City.from_db(DEFAULT_DB_ALIAS, self._fields, self)
+
+
+class NearbyCity(NamedTuple):
+    city: CityPoint
+    distance_km: float
+
+
+class GeoIndex:
+    """
+    Immutable grid index over city and state coordinates.
+
+    Cities answer ``nearest`` and ``within``; states (whose coordinates are
+    usually their capital) only help ``state_for_point`` where no city of
+    theirs has coordinates.
+    """
+
+    def __init__(
+        self,
+        cities: Iterable[CityPoint],
+        states: Iterable[StateEntry],
+        cell_size: float = DEFAULT_CELL_SIZE,
+    ):
+        self.cell_size = cell_size
+        self._arrays = None
+        self.states: Dict[int, StateEntry] = {state.id: state for state in states}
+        self._cells: Dict[Tuple[int, int], List[CityPoint]] = {}
+        self._state_cells: Dict[Tuple[int, int], List[StateEntry]] = {}
+        for city in cities:
+            self._cells.setdefault(self._cell(city.latitude, city.longitude), []).append(city)
+        for state in self.states.values():
+            if state.latitude is not None and state.longitude is not None:
+                self._state_cells.setdefault(self._cell(state.latitude, state.longitude), []).append(state)
+
+        cells = [*self._cells, *self._state_cells]
+        self._bounds = (
+            (min(i for i, _ in cells), max(i for i, _ in cells),
+             min(j for _, j in cells), max(j for _, j in cells))
+            if cells else None
+        )
+        # Largest |latitude| covered, for the longitude distance bound
+        self._max_abs_lat = max(
+            (max(abs(i * cell_size), abs((i + 1) * cell_size)) for i, _ in cells), default=0.0
+        )
+
+    def __len__(self) -> int:
+        return sum(len(cities) for cities in self._cells.values())
+
+    def arrays(self) -> "GeoArrays":
+        """Coordinate arrays of the indexed cities and states, for the batch API"""
+        if self._arrays is None:
+            self._arrays = GeoArrays(
+                [city for cities in self._cells.values() for city in cities],
+                [state for states in self._state_cells.values() for state in states],
+            )
+        return self._arrays
+
+    @classmethod
+    def build(cls, using: str = DEFAULT_DB_ALIAS, cell_size: float = DEFAULT_CELL_SIZE) -> "GeoIndex":
+        """Read city and state coordinates from the database (two queries)"""
+        cities = (
+            City.objects.using(using)
+            .filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list("id", "lga_id", "name", "lga__state_id", "full_name", "latitude", "longitude")
+        )
+        return cls(
+            [CityPoint(*row) for row in cities],
+            [StateEntry(*row) for row in State.objects.using(using).values_list(*StateEntry._fields)],
+            cell_size=cell_size,
+        )
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def _ring(self, center: Tuple[int, int], radius: int):
+        """Cells at Chebyshev distance ``radius`` from ``center``"""
+        ci, cj = center
+        if radius == 0:
+            yield center
+            return
+        for j in range(cj - radius, cj + radius + 1):
+            yield ci - radius, j
+            yield ci + radius, j
+        for i in range(ci - radius + 1, ci + radius):
+            yield i, cj - radius
+            yield i, cj + radius
+
+    def _ring_distance(self, lat: float, rings: int) -> float:
+        """
+        Lower bound of the distance from a point to anything ``rings`` or
+        more cells away from its own cell
+
+        Such points differ by at least ``(rings - 1) * cell_size`` degrees in
+        latitude or longitude; by the haversine formula a longitude gap
+        ``dl`` between latitudes within +-phi is at least
+        ``2 asin(cos(phi) sin(dl / 2))`` of arc.
+        """
+        gap = math.radians(max(0, rings - 1) * self.cell_size)
+        cos_phi = math.cos(math.radians(max(self._max_abs_lat, abs(lat))))
+        lon_arc = 2 * math.asin(min(1.0, cos_phi * math.sin(min(gap, math.pi) / 2)))
+        return EARTH_RADIUS_KM * min(gap, lon_arc)
+
+    def _max_ring(self, center: Tuple[int, int]) -> int:
+        if self._bounds is None:
+            return -1
+        imin, imax, jmin, jmax = self._bounds
+        ci, cj = center
+        return max(abs(ci - imin), abs(ci - imax), abs(cj - jmin), abs(cj - jmax))
+
+    def _nearest(self, cells, lat: float, lon: float, k: int) -> List[Tuple[float, NamedTuple]]:
+        """The ``k`` closest points of a grid, as sorted (distance, point) pairs"""
+        center = self._cell(lat, lon)
+        heap: List[Tuple[float, int, NamedTuple]] = []  # max-heap on distance
+        radius, last = 0, self._max_ring(center)
+        while radius <= last:
+            for cell in self._ring(center, radius):
+                for point in cells.get(cell, ()):
+                    distance = haversine(lat, lon, point.latitude, point.longitude)
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-distance, point.id, point))
+                    elif distance < -heap[0][0]:
+                        heapq.heapreplace(heap, (-distance, point.id, point))
+            radius += 1
+            if len(heap) == k and self._ring_distance(lat, radius) >= -heap[0][0]:
+                break
+        return sorted((-d, point) for d, _, point in heap)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[NearbyCity]:
+        """The ``k`` cities closest to a point, nearest first"""
+        _check_point(lat, lon)
+        if k < 1:
+            return []
+        return [NearbyCity(city, distance) for distance, city in self._nearest(self._cells, lat, lon, k)]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[NearbyCity]:
+        """Cities within ``radius_km`` of a point, nearest first"""
+        _check_point(lat, lon)
+        if radius_km < 0 or self._bounds is None:
+            return []
+        arc = radius_km / EARTH_RADIUS_KM
+        dlat = math.degrees(arc)
+        cos_phi = math.cos(math.radians(min(90.0, abs(lat) + dlat)))
+        # Inverse of the bound in _ring_distance
+        if arc >= math.pi or cos_phi <= math.sin(arc / 2):
+            dlon = 180.0
+        else:
+            dlon = math.degrees(2 * math.asin(math.sin(arc / 2) / cos_phi))
+        imin, imax, jmin, jmax = self._bounds
+        lo_i, lo_j = self._cell(lat - dlat, lon - dlon)
+        hi_i, hi_j = self._cell(lat + dlat, lon + dlon)
+
+        found = []
+        for i in range(max(lo_i, imin), min(hi_i, imax) + 1):
+            for j in range(max(lo_j, jmin), min(hi_j, jmax) + 1):
+                for city in self._cells.get((i, j), ()):
+                    distance = haversine(lat, lon, city.latitude, city.longitude)
+                    if distance <= radius_km:
+                        found.append(NearbyCity(city, distance))
+        found.sort(key=lambda match: (match.distance_km, match.city.id))
+        return found
+
+    def state_for_point(self, lat: float, lon: float) -> Optional[StateEntry]:
+        """
+        The state of the closest city or state reference point
+
+        Without boundary polygons this is an approximation, good away from
+        state borders and better the more cities have coordinates.
+        """
+        _check_point(lat, lon)
+        candidates = [
+            (distance, city.state_id) for distance, city in self._nearest(self._cells, lat, lon, 1)
+        ] + [
+            (distance, state.id) for distance, state in self._nearest(self._state_cells, lat, lon, 1)
+        ]
+        if not candidates:
+            return None
+        return self.states.get(min(candidates)[1])
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "The batch geo API requires NumPy: pip install django-ng-locations[numpy]"
+        ) from None
+    return numpy
+
+
+def _unit_vectors(np, lat, lon):
+    """Points on the unit sphere; nearest by great circle is largest dot product"""
+    phi, lam = np.radians(lat), np.radians(lon)
+    cos_phi = np.cos(phi)
+    return np.stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)], axis=-1)
+
+
+def _haversine_array(np, lat1, lon1, lat2, lon2):
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoArrays:
+    """City and state coordinates as NumPy arrays"""
+
+    def __init__(self, cities: List[CityPoint], states: List[StateEntry]):
+        np = _numpy()
+        self.city_ids = np.array([c.id for c in cities], dtype=np.int64)
+        self.city_lga_ids = np.array([c.lga_id for c in cities], dtype=np.int64)
+        self.city_state_ids = np.array([c.state_id for c in cities], dtype=np.int64)
+        self.city_lat = np.array([c.latitude for c in cities], dtype=np.float64)
+        self.city_lon = np.array([c.longitude for c in cities], dtype=np.float64)
+        self.city_xyz = _unit_vectors(np, self.city_lat, self.city_lon)
+        self.state_ids = np.array([s.id for s in states], dtype=np.int64)
+        self.state_lat = np.array([s.latitude for s in states], dtype=np.float64)
+        self.state_lon = np.array([s.longitude for s in states], dtype=np.float64)
+        self.state_xyz = _unit_vectors(np, self.state_lat, self.state_lon)
+
+
+def _points(np, points):
+    """Validate an (n, 2) array-like of (latitude, longitude) pairs"""
+    points = np.asarray(points, dtype=np.float64)
+    if points.size == 0:
+        points = points.reshape(0, 2)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must be an (n, 2) array of (latitude, longitude) pairs")
+    lat, lon = points[:, 0], points[:, 1]
+    if not (np.all(np.abs(lat) <= 90) and np.all(np.abs(lon) <= 180)):
+        raise ValueError("points contain invalid or missing coordinates")
+    return lat, lon
+
+
+def _nearest_rows(np, lat, lon, ref_xyz, ref_lat, ref_lon, chunk_size):
+    """Row index and distance (km) of the closest reference for every point"""
+    rows = np.full(len(lat), -1, dtype=np.int64)
+    distances = np.full(len(lat), np.inf)
+    if not len(ref_xyz):
+        return rows, distances
+    step = chunk_size or max(1, BATCH_CHUNK_ELEMENTS // len(ref_xyz))
+    for start in range(0, len(lat), step):
+        end = start + step
+        xyz = _unit_vectors(np, lat[start:end], lon[start:end])
+        # One matrix product per chunk; exact distances only for the winners
+        best = np.argmax(xyz @ ref_xyz.T, axis=1)
+        rows[start:end] = best
+        distances[start:end] = _haversine_array(np, lat[start:end], lon[start:end], ref_lat[best], ref_lon[best])
+    return rows, distances
+
+
+class NearestCities(NamedTuple):
+    city_ids: "numpy.ndarray"
+    lga_ids: "numpy.ndarray"
+    state_ids: "numpy.ndarray"
+    distances_km: "numpy.ndarray"
+
+
+def nearest_cities_batch(points, chunk_size: Optional[int] = None) -> NearestCities:
+    """
+    The closest city to each of many points
+
+    ``points`` is an (n, 2) NumPy array or a sequence of (latitude, longitude)
+    pairs. Returns arrays aligned with ``points``; ids are -1 and distances
+    infinite when no city has coordinates. Points are processed
+    ``chunk_size`` at a time, by default as many as keep the distance matrix
+    near 32 MB.
+    """
+    np = _numpy()
+    lat, lon = _points(np, points)
+    arrays = get_geo_index().arrays()
+    rows, distances = _nearest_rows(np, lat, lon, arrays.city_xyz, arrays.city_lat, arrays.city_lon, chunk_size)
+    if not len(arrays.city_ids):
+        missing = np.full(len(lat), -1, dtype=np.int64)
+        return NearestCities(missing, missing.copy(), missing.copy(), distances)
+    return NearestCities(
+        arrays.city_ids[rows], arrays.city_lga_ids[rows], arrays.city_state_ids[rows], distances
+    )
+
+
+def states_for_points(points, chunk_size: Optional[int] = None):
+    """Vectorized ``state_for_point``: an array of state ids, -1 where unknown"""
+    np = _numpy()
+    lat, lon = _points(np, points)
+    arrays = get_geo_index().arrays()
+    city_rows, city_distances = _nearest_rows(
+        np, lat, lon, arrays.city_xyz, arrays.city_lat, arrays.city_lon, chunk_size
+    )
+    state_rows, state_distances = _nearest_rows(
+        np, lat, lon, arrays.state_xyz, arrays.state_lat, arrays.state_lon, chunk_size
+    )
+    result = np.full(len(lat), -1, dtype=np.int64)
+    if len(arrays.city_ids):
+        result = np.where(city_rows >= 0, arrays.city_state_ids[np.maximum(city_rows, 0)], result)
+    if len(arrays.state_ids):
+        closer = (state_rows >= 0) & (state_distances < city_distances)
+        result = np.where(closer, arrays.state_ids[np.maximum(state_rows, 0)], result)
+    return result
+
+
+_index: Optional[GeoIndex] = None
+_lock = threading.Lock()
+
+
+def get_geo_index() -> GeoIndex:
+    """The process-wide geo index, built on first use"""
+    global _index
+    index = _index
+    record_cache_access("geo_index", index is not None)
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = GeoIndex.build()
+            index = _index
+    return index
+
+
+def invalidate_geo_index(**kwargs) -> None:
+    """Drop the process-wide geo index; also usable as a signal receiver"""
+    global _index
+    _index = None
+
+
+def nearest_cities(lat: float, lon: float, k: int = 1) -> List[NearbyCity]:
+    """The ``k`` cities closest to a point, with their distance in km"""
+    return get_geo_index().nearest(lat, lon, k)
+
+
+def cities_within(lat: float, lon: float, radius_km: float) -> List[NearbyCity]:
+    """Cities within ``radius_km`` of a point, nearest first"""
+    return get_geo_index().within(lat, lon, radius_km)
+
+
+def state_for_point(lat: float, lon: float) -> Optional[State]:
+    """The state a point most likely lies in (see ``GeoIndex.state_for_point``)"""
+    state = get_geo_index().state_for_point(lat, lon)
+    return state.to_model() if state is not None else None
@@ -0,0 +1,215 @@
+"""
+In-process index of the zone -> state -> LGA hierarchy
+
+Zones, states and LGAs are static reference data, so they can be read once
+per process into an immutable index keyed by casefolded name and code (and
+by their aliases, see ``LocationAlias``). The
+index is built lazily on first use and dropped whenever one of the models
+changes (see ``signals.py``); ``load_ng_locations`` drops it after a load.
+"""
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .instrumentation import record_cache_access
+from .models import Zone, State, LGA, LocationAlias
+
+# Alias kinds held by the index
+ALIAS_KINDS = (LocationAlias.KIND_ZONE, LocationAlias.KIND_STATE, LocationAlias.KIND_LGA)
+
+
+def casefold_key(value: str) -> str:
+    """
+    Key of a name or code for case-insensitive matching; unlike
+    ``text.fold`` it keeps accents and punctuation
+    """
+    return value.casefold()
+
+
+class ZoneEntry(NamedTuple):
+    id: int
+    name: str
+    code: str
+
+    def to_model(self) -> Zone:
+        return Zone.from_db(DEFAULT_DB_ALIAS, self._fields, self)
+
+
+class StateEntry(NamedTuple):
+    id: int
+    zone_id: int
+    name: str
+    code: str
+    capital: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+
+    def to_model(self) -> State:
+        return State.from_db(DEFAULT_DB_ALIAS, self._fields, self)
+
+
+class LGAEntry(NamedTuple):
+    id: int
+    state_id: int
+    name: str
+    code: str
+    # Denormalized, so str() of the model needs no query
+    full_name: str
+
+    def to_model(self) -> LGA:
+        return LGA.from_db(DEFAULT_DB_ALIAS, self._fields, self)
+
+
+class HierarchyIndex:
+    """
+    Immutable snapshot of zones, states and LGAs.
+
+    Lookups are dict accesses; instances returned by ``to_model()`` are
+    fresh model objects, so callers may modify them freely. Names that match
+    no canonical name are looked up among the ``aliases``, given as
+    ``(kind, object_id, normalized_alias)`` rows.
+    """
+
+    def __init__(
+        self,
+        zones: List[ZoneEntry],
+        states: List[StateEntry],
+        lgas: List[LGAEntry],
+        aliases: Iterable[Tuple[str, int, str]] = (),
+    ):
+        by_name = lambda entries: sorted(entries, key=lambda e: e.name)  # noqa: E731
+
+        self.zones: Mapping[int, ZoneEntry] = MappingProxyType({z.id: z for z in zones})
+        self.states: Mapping[int, StateEntry] = MappingProxyType({s.id: s for s in states})
+        self.lgas: Mapping[int, LGAEntry] = MappingProxyType({lga.id: lga for lga in lgas})
+
+        self._zone_by_name = self._keyed(zones, "name")
+        self._zone_by_code = self._keyed(zones, "code")
+        self._state_by_name = self._keyed(states, "name")
+        self._state_by_code = self._keyed(states, "code")
+
+        states_by_zone: Dict[int, list] = {}
+        for state in by_name(states):
+            states_by_zone.setdefault(state.zone_id, []).append(state)
+        self._states_by_zone = MappingProxyType({k: tuple(v) for k, v in states_by_zone.items()})
+
+        lgas_by_state: Dict[int, list] = {}
+        lgas_by_name: Dict[str, list] = {}
+        for lga in by_name(lgas):
+            lgas_by_state.setdefault(lga.state_id, []).append(lga)
+            lgas_by_name.setdefault(casefold_key(lga.name), []).append(lga)
+        self._lgas_by_state = MappingProxyType({k: tuple(v) for k, v in lgas_by_state.items()})
+        self._lgas_by_name = MappingProxyType({k: tuple(v) for k, v in lgas_by_name.items()})
+
+        targets = {LocationAlias.KIND_ZONE: self.zones, LocationAlias.KIND_STATE: self.states}
+        zone_aliases: Dict[str, ZoneEntry] = {}
+        state_aliases: Dict[str, StateEntry] = {}
+        lga_aliases: Dict[str, list] = {}
+        for kind, object_id, normalized in aliases:
+            if kind == LocationAlias.KIND_LGA:
+                if object_id in self.lgas:
+                    lga_aliases.setdefault(normalized, []).append(self.lgas[object_id])
+            elif kind in targets and object_id in targets[kind]:
+                keyed = zone_aliases if kind == LocationAlias.KIND_ZONE else state_aliases
+                keyed.setdefault(normalized, targets[kind][object_id])
+        self._zone_by_alias = MappingProxyType(zone_aliases)
+        self._state_by_alias = MappingProxyType(state_aliases)
+        self._lgas_by_alias = MappingProxyType({k: tuple(by_name(v)) for k, v in lga_aliases.items()})
+
+    @staticmethod
+    def _keyed(entries, field: str) -> Mapping[str, NamedTuple]:
+        keyed = {}
+        for entry in entries:
+            value = getattr(entry, field)
+            if value:
+                # Blank and duplicate codes are left to the database to resolve
+                keyed.setdefault(casefold_key(value), entry)
+        return MappingProxyType(keyed)
+
+    @classmethod
+    def build(cls, using: str = DEFAULT_DB_ALIAS) -> "HierarchyIndex":
+        """Read the hierarchy and its aliases from the database (four queries)"""
+        return cls(
+            [ZoneEntry(*row) for row in Zone.objects.using(using).values_list(*ZoneEntry._fields)],
+            [StateEntry(*row) for row in State.objects.using(using).values_list(*StateEntry._fields)],
+            [LGAEntry(*row) for row in LGA.objects.using(using).values_list(*LGAEntry._fields)],
+            list(cls._aliases(using)),
+        )
+
+    @classmethod
+    async def abuild(cls, using: str = DEFAULT_DB_ALIAS) -> "HierarchyIndex":
+        """Async variant of ``build``"""
+        return cls(
+            [ZoneEntry(*row) async for row in Zone.objects.using(using).values_list(*ZoneEntry._fields)],
+            [StateEntry(*row) async for row in State.objects.using(using).values_list(*StateEntry._fields)],
+            [LGAEntry(*row) async for row in LGA.objects.using(using).values_list(*LGAEntry._fields)],
+            [row async for row in cls._aliases(using)],
+        )
+
+    @staticmethod
+    def _aliases(using: str):
+        return LocationAlias.objects.using(using).filter(kind__in=ALIAS_KINDS).values_list(
+            "kind", "object_id", "normalized_alias"
+        )
+
+    def zone_by_name(self, name: str) -> Optional[ZoneEntry]:
+        return self._zone_by_name.get(casefold_key(name)) or self._zone_by_alias.get(LocationAlias.normalize(name))
+
+    def zone_by_code(self, code: str) -> Optional[ZoneEntry]:
+        return self._zone_by_code.get(casefold_key(code))
+
+    def state_by_name(self, name: str) -> Optional[StateEntry]:
+        return self._state_by_name.get(casefold_key(name)) or self._state_by_alias.get(LocationAlias.normalize(name))
+
+    def state_by_code(self, code: str) -> Optional[StateEntry]:
+        return self._state_by_code.get(casefold_key(code))
+
+    def states_in_zone(self, zone_id: int) -> Tuple[StateEntry, ...]:
+        return self._states_by_zone.get(zone_id, ())
+
+    def lgas_in_state(self, state_id: int) -> Tuple[LGAEntry, ...]:
+        return self._lgas_by_state.get(state_id, ())
+
+    def lgas_named(self, name: str, state_name: Optional[str] = None) -> Tuple[LGAEntry, ...]:
+        """All LGAs with the given name or alias, optionally restricted to a state"""
+        lgas = self._lgas_by_name.get(casefold_key(name)) or self._lgas_by_alias.get(LocationAlias.normalize(name), ())
+        if state_name:
+            state = self.state_by_name(state_name)
+            lgas = tuple(lga for lga in lgas if state and lga.state_id == state.id)
+        return lgas
+
+
+_index: Optional[HierarchyIndex] = None
+_lock = threading.Lock()
+
+
+def get_index() -> HierarchyIndex:
+    """The process-wide index, built on first use"""
+    global _index
+    index = _index
+    record_cache_access("index", index is not None)
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = HierarchyIndex.build()
+            index = _index
+    return index
+
+
+async def aget_index() -> HierarchyIndex:
+    """Async variant of ``get_index``"""
+    global _index
+    index = _index
+    record_cache_access("index", index is not None)
+    if index is None:
+        # Concurrent first calls may each build an index; the last one is kept
+        index = _index = await HierarchyIndex.abuild()
+    return index
+
+
+def invalidate_index(**kwargs) -> None:
+    """Drop the process-wide index; also usable as a signal receiver"""
+    global _index
+    _index = None
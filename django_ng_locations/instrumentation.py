@@ -0,0 +1,309 @@
+"""
+Timers, query counts and cache hit/miss counters
+
+Instrumentation is off by default. With ``NG_LOCATIONS_INSTRUMENTATION = True``:
+
+- every public function in ``utils`` (sync and async) reports its duration
+  and the number of queries it ran. Querysets are lazy: those returned by
+  the sync helpers are counted where they are evaluated, not in the
+  helper's ``lookup.queries``, which is usually 0 for them
+- the hierarchy, search, geo and postal code indexes and the shared cache
+  slices report hits and misses
+- ``load_ng_locations`` reports the duration and queries of each loader phase
+
+Measurements are sent as Django signals (``lookup_finished``,
+``cache_accessed``, ``load_phase_finished``) and to every collector: the
+classes listed in ``NG_LOCATIONS_COLLECTORS`` plus those added with
+``add_collector``. A collector adapts the metrics to StatsD, Prometheus and
+so on. ``collect()`` records into an ``InMemoryCollector`` for tests:
+
+    with collect() as metrics:
+        get_state_by_name("Lagos")
+    metrics.count("lookup.calls", function="get_state_by_name")  # 1
+
+While disabled an instrumented function costs one flag check, and no query
+wrapper is installed.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.core.signals import setting_changed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal, receiver
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+
+# Sent after each outermost instrumented utils call. sender: the function
+# name; kwargs: function, duration (seconds), queries (run before it
+# returned; not those of a queryset it returns), error (the exception raised
+# or None)
+lookup_finished = Signal()
+
+# Sent on each index or cache access. sender: the cache name ("index",
+# "search_index", "geo_index", "postal_index", "slices" or "tree"); kwargs:
+# cache, hit
+cache_accessed = Signal()
+
+# Sent after each loader phase. sender: the phase name; kwargs: phase,
+# duration, queries, tags (e.g. {"level": "ward"})
+load_phase_finished = Signal()
+
+
+class Collector:
+    """
+    Receiver of metrics; subclass it to export them
+
+    ``name`` is a dotted metric name such as ``lookup.duration`` and
+    ``tags`` label it, e.g. ``{"function": "get_state_by_name"}``. Metrics:
+
+    - ``lookup.calls``, ``lookup.errors``, ``lookup.queries`` (counters) and
+      ``lookup.duration`` (timing), tagged with ``function``;
+      ``lookup.queries`` excludes the queries of returned querysets, which
+      run when the caller evaluates them
+    - ``cache.hits`` and ``cache.misses``, tagged with ``cache``
+    - ``load.queries`` and ``load.duration``, tagged with ``phase`` and,
+      for writes, ``level``
+    """
+
+    def increment(self, name: str, value: int = 1, tags: Optional[Dict[str, str]] = None) -> None:
+        pass
+
+    def timing(self, name: str, seconds: float, tags: Optional[Dict[str, str]] = None) -> None:
+        pass
+
+
+class InMemoryCollector(Collector):
+    """Collector keeping every metric in memory, for tests and debugging"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, tuple], int] = defaultdict(int)
+        self.timings: Dict[Tuple[str, tuple], List[float]] = defaultdict(list)
+
+    def increment(self, name: str, value: int = 1, tags: Optional[Dict[str, str]] = None) -> None:
+        with self._lock:
+            self.counters[name, tuple(sorted((tags or {}).items()))] += value
+
+    def timing(self, name: str, seconds: float, tags: Optional[Dict[str, str]] = None) -> None:
+        with self._lock:
+            self.timings[name, tuple(sorted((tags or {}).items()))].append(seconds)
+
+    @staticmethod
+    def _matches(key: Tuple[str, tuple], name: str, tags: Dict[str, str]) -> bool:
+        return key[0] == name and tags.items() <= dict(key[1]).items()
+
+    def count(self, name: str, **tags: str) -> int:
+        """Sum of the counter ``name`` over all tag sets including ``tags``"""
+        return sum(value for key, value in self.counters.items() if self._matches(key, name, tags))
+
+    def durations(self, name: str, **tags: str) -> List[float]:
+        """Every timing of ``name`` recorded with tags including ``tags``"""
+        return [
+            seconds
+            for key, values in self.timings.items() if self._matches(key, name, tags)
+            for seconds in values
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+
+_enabled = False
+# Number of active collect() blocks, which enable instrumentation regardless
+# of the setting
+_forced = 0
+_added: List[Collector] = []
+_configured: Optional[List[Collector]] = None
+_lock = threading.Lock()
+
+# Measurements in progress in the current context; asgiref copies the
+# context into the threads running async ORM queries, so those are counted
+_active: ContextVar[tuple] = ContextVar("ng_locations_measurements", default=())
+_in_lookup: ContextVar[bool] = ContextVar("ng_locations_in_lookup", default=False)
+
+_NOOP = nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _collectors() -> List[Collector]:
+    global _configured
+    if _configured is None:
+        with _lock:
+            if _configured is None:
+                _configured = [import_string(path)() for path in get_setting("COLLECTORS")]
+    return _configured + _added
+
+
+def add_collector(collector: Collector) -> None:
+    """Send metrics to ``collector`` from now on"""
+    _added.append(collector)
+
+
+def remove_collector(collector: Collector) -> None:
+    _added.remove(collector)
+
+
+def _count_query(execute, sql, params, many, context):
+    for measurement in _active.get():
+        measurement.queries += 1
+    return execute(sql, params, many, context)
+
+
+def _install(connection, **kwargs) -> None:
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def _refresh() -> None:
+    """Apply the setting (or an active collect() block) to the module state"""
+    global _enabled
+    _enabled = bool(get_setting("INSTRUMENTATION")) or _forced > 0
+    if _enabled:
+        # Connections opened from now on (in any thread) get the query
+        # counter; so do the open ones of this thread
+        connection_created.connect(_install, dispatch_uid="ng_locations_count_queries")
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+    else:
+        connection_created.disconnect(dispatch_uid="ng_locations_count_queries")
+        for connection in connections.all(initialized_only=True):
+            if _count_query in connection.execute_wrappers:
+                connection.execute_wrappers.remove(_count_query)
+
+
+@receiver(setting_changed, dispatch_uid="ng_locations_instrumentation_settings")
+def _setting_changed(setting, **kwargs) -> None:
+    global _configured
+    if setting == "NG_LOCATIONS_COLLECTORS":
+        _configured = None
+    if setting == "NG_LOCATIONS_INSTRUMENTATION":
+        _refresh()
+
+
+class _Measurement:
+    """Timer and query counter of one lookup or loader phase"""
+
+    __slots__ = ("kind", "name", "tags", "queries", "start", "_tokens")
+
+    def __init__(self, kind: str, name: str, tags: Dict[str, str]):
+        self.kind = kind
+        self.name = name
+        self.tags = tags
+        self.queries = 0
+
+    def __enter__(self) -> "_Measurement":
+        self._tokens = (
+            _active.set(_active.get() + (self,)),
+            _in_lookup.set(True) if self.kind == "lookup" else None,
+        )
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self.start
+        active, in_lookup = self._tokens
+        _active.reset(active)
+        if in_lookup is not None:
+            _in_lookup.reset(in_lookup)
+        if self.kind == "lookup":
+            _lookup_finished(self.name, duration, self.queries, exc)
+        else:
+            _load_phase_finished(self.name, duration, self.queries, self.tags)
+
+
+def _lookup_finished(function: str, duration: float, queries: int, error: Optional[BaseException]) -> None:
+    tags = {"function": function}
+    for collector in _collectors():
+        collector.increment("lookup.calls", 1, tags)
+        if error is not None:
+            collector.increment("lookup.errors", 1, tags)
+        collector.increment("lookup.queries", queries, tags)
+        collector.timing("lookup.duration", duration, tags)
+    if lookup_finished.receivers:
+        lookup_finished.send(sender=function, function=function, duration=duration, queries=queries, error=error)
+
+
+def _load_phase_finished(phase: str, duration: float, queries: int, tags: Dict[str, str]) -> None:
+    metric_tags = {"phase": phase, **tags}
+    for collector in _collectors():
+        collector.increment("load.queries", queries, metric_tags)
+        collector.timing("load.duration", duration, metric_tags)
+    if load_phase_finished.receivers:
+        load_phase_finished.send(sender=phase, phase=phase, duration=duration, queries=queries, tags=tags)
+
+
+def instrumented(func):
+    """
+    Decorator reporting each call of a lookup function (sync or async)
+
+    Calls made from within another instrumented call are part of the outer
+    one and not reported separately.
+    """
+    name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not _enabled or _in_lookup.get():
+                return await func(*args, **kwargs)
+            with _Measurement("lookup", name, {}):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled or _in_lookup.get():
+            return func(*args, **kwargs)
+        with _Measurement("lookup", name, {}):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def load_phase(phase: str, **tags: str):
+    """Context manager reporting a loader phase (a no-op while disabled)"""
+    if not _enabled:
+        return _NOOP
+    return _Measurement("load", phase, tags)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count a hit or miss of ``cache``"""
+    if not _enabled:
+        return
+    tags = {"cache": cache}
+    for collector in _collectors():
+        collector.increment("cache.hits" if hit else "cache.misses", 1, tags)
+    if cache_accessed.receivers:
+        cache_accessed.send(sender=cache, cache=cache, hit=hit)
+
+
+@contextmanager
+def collect() -> Iterator[InMemoryCollector]:
+    """Enable instrumentation for the block and record into a fresh collector"""
+    global _forced
+    collector = InMemoryCollector()
+    add_collector(collector)
+    _forced += 1
+    _refresh()
+    try:
+        yield collector
+    finally:
+        _forced -= 1
+        remove_collector(collector)
+        _refresh()
+
+
+_refresh()
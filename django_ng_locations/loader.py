@@ -0,0 +1,875 @@
+"""
+Bulk loading engine for django_ng_locations
+
+Location data is fed to the loader as a stream of flat records, one per row,
+e.g. ``{"type": "lga", "state": "Lagos", "name": "Ikeja"}``. Records are
+buffered per level and diffed against the existing rows in memory, then
+written with batched ``bulk_create``/``bulk_update`` calls. Parents are
+resolved through in-memory name -> id maps, so no per-row queries are issued.
+
+On PostgreSQL, ``CopyLoader`` streams cities, wards and postal codes with
+``COPY`` instead and merges them with ``INSERT ... ON CONFLICT``.
+"""
+import hashlib
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .instrumentation import load_phase
+from .models import Zone, State, LGA, City, Ward, PostalCode, LocationAlias, SubtreeDigest
+from .records import iter_records  # noqa: F401 (re-exported)
+from .text import fold
+
+LEVELS = ("zone", "state", "lga", "city", "ward", "postal_code")
+
+LEVEL_MODELS = dict(zip(LEVELS, (Zone, State, LGA, City, Ward, PostalCode)))
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Fields that may be written for each level (besides the parent foreign key
+# and the fields making up the natural key).
+LEVEL_FIELDS = {
+    "zone": ("code",),
+    "state": ("code", "capital", "latitude", "longitude"),
+    "lga": ("code",),
+    "city": ("is_capital", "population", "latitude", "longitude"),
+    "ward": ("code",),
+    "postal_code": ("area",),
+}
+
+# Denormalized columns of cities, wards and postal codes, derived from their
+# LGA's state (and the full_name of LGAs)
+DENORMALIZED_FIELDS = ("state_id", "zone_id", "full_name")
+
+# Levels whose records may carry ``aliases``
+ALIAS_LEVELS = ("zone", "state", "lga", "city", "ward")
+
+# Unique columns (the ON CONFLICT target) of the levels CopyLoader writes
+# with COPY. Zones, states and LGAs are small and keep the bulk path, which
+# maintains the parent maps their children are resolved against.
+COPY_KEYS = {
+    "city": ("lga_id", "name"),
+    "ward": ("lga_id", "name"),
+    "postal_code": ("code",),
+}
+
+# Fields every record of a level must carry: its natural key and its parent
+REQUIRED_FIELDS = {
+    "zone": ("name", "code"),
+    "state": ("name", "zone"),
+    "lga": ("name", "state"),
+    "city": ("name", "state", "lga"),
+    "ward": ("name", "state", "lga"),
+    "postal_code": ("code", "state", "lga"),
+}
+
+
+class LoadError(Exception):
+    """Raised when a record cannot be loaded, e.g. its parent is unknown"""
+
+
+def read_source(path: str) -> Iterator[dict]:
+    """
+    Stream loader records from a ``.ndjson`` or ``.json`` file
+
+    See ``iter_ndjson_records`` and ``iter_json_records`` for the formats.
+    """
+    if path.endswith((".ndjson", ".jsonl")):
+        return iter_ndjson_records(path)
+    if path.endswith(".json"):
+        return iter_json_records(path)
+    raise LoadError(f"Unsupported source file {path!r}: expected .ndjson, .jsonl or .json")
+
+
+def iter_ndjson_records(path: str) -> Iterator[dict]:
+    """
+    Stream records from a newline-delimited JSON file, one record per line,
+    e.g. ``{"type": "ward", "state": "Lagos", "lga": "Ikeja", "name": "Alausa"}``
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise LoadError(f"{path}:{lineno}: invalid JSON: {e}") from None
+
+
+def iter_json_records(path: str, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+    """
+    Stream records from a JSON file
+
+    A top-level array of records is decoded incrementally, one element at a
+    time, so memory use does not depend on the file size. A top-level object
+    is taken to be a whole ``NIGERIA_DATA``-style dataset; it has to be parsed
+    in one go and is then flattened with ``iter_records``.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = f.read(chunk_size).lstrip()
+        if buf.startswith("{"):
+            yield from iter_records(json.loads(buf + f.read()))
+            return
+        if not buf.startswith("["):
+            raise LoadError(f"{path}: expected a JSON array of records or a dataset object")
+
+        pos, eof = 1, False
+        while True:
+            # Skip whitespace and separators, refilling the buffer as needed
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    raise LoadError(f"{path}: unexpected end of file")
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except ValueError as e:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise LoadError(f"{path}: invalid JSON: {e}") from None
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield record
+            pos = end
+
+
+def record_key(record: dict) -> tuple:
+    """Natural key of a record within its level"""
+    level = record.get("type")
+    if level not in REQUIRED_FIELDS:
+        raise LoadError(f"Unknown record type: {level!r}")
+    missing = [field for field in REQUIRED_FIELDS[level] if not record.get(field)]
+    if missing:
+        raise LoadError(f"{level} record is missing {', '.join(missing)}: {record!r}")
+
+    if level in ("zone", "state"):
+        return (record["name"],)
+    if level == "lga":
+        return (record["state"], record["name"])
+    if level in ("city", "ward"):
+        return (record["state"], record["lga"], record["name"])
+    return (record["code"],)
+
+
+class BulkLoader:
+    """
+    Load location records with batched, set-based writes.
+
+    Records are buffered per level and flushed every ``batch_size`` records;
+    flushing a level always flushes the levels above it first, so children
+    can be resolved against their parents. Within a load the last record for
+    a given natural key wins.
+
+    Usage::
+
+        loader = BulkLoader(batch_size=500)
+        loader.load(iter_records(NIGERIA_DATA))
+        loader.created["lga"]  # number of LGAs inserted
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, using: str = DEFAULT_DB_ALIAS):
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        self.batch_size = batch_size
+        self.using = using
+        self.created = dict.fromkeys(LEVELS, 0)
+        self.updated = dict.fromkeys(LEVELS, 0)
+        self._buffers: Dict[str, Dict[tuple, dict]] = {level: {} for level in LEVELS}
+        # Existing rows of the small parent tables, keyed by natural key
+        self._zones: Optional[Dict[tuple, dict]] = None
+        self._states: Optional[Dict[tuple, dict]] = None
+        self._lgas: Optional[Dict[tuple, dict]] = None
+
+    def load(self, records: Iterable[dict]) -> "BulkLoader":
+        """Add every record and flush all pending batches"""
+        for record in records:
+            self.add(record)
+        self.flush()
+        return self
+
+    def add(self, record: dict) -> None:
+        """Buffer a single record, flushing its level when the batch is full"""
+        key = record_key(record)
+        buffer = self._buffers[record["type"]]
+        buffer[key] = record
+        if len(buffer) >= self.batch_size:
+            self.flush(record["type"])
+
+    def flush(self, level: Optional[str] = None) -> None:
+        """Write buffered records of ``level`` and every level above it"""
+        last = LEVELS.index(level) if level else len(LEVELS) - 1
+        for current in LEVELS[: last + 1]:
+            buffer = self._buffers[current]
+            if buffer:
+                self._buffers[current] = {}
+                with load_phase("write", level=current):
+                    getattr(self, f"_flush_{current}")(list(buffer.values()))
+
+    # Parent maps
+
+    @property
+    def zones(self) -> Dict[tuple, dict]:
+        if self._zones is None:
+            self._zones = {
+                (row["name"],): row
+                for row in Zone.objects.using(self.using).values("id", "name", "code")
+            }
+        return self._zones
+
+    @property
+    def states(self) -> Dict[tuple, dict]:
+        if self._states is None:
+            self._states = {
+                (row["name"],): row
+                for row in State.objects.using(self.using).values(
+                    "id", "zone_id", "name", *LEVEL_FIELDS["state"]
+                )
+            }
+        return self._states
+
+    @property
+    def lgas(self) -> Dict[tuple, dict]:
+        if self._lgas is None:
+            state_names = {row["id"]: name for (name,), row in self.states.items()}
+            self._lgas = {
+                (state_names[row["state_id"]], row["name"]): row
+                for row in LGA.objects.using(self.using).values(
+                    "id", "state_id", "name", "full_name", *LEVEL_FIELDS["lga"]
+                )
+            }
+        return self._lgas
+
+    def _parent_id(self, parents: Dict[tuple, dict], key: tuple, record: dict) -> int:
+        try:
+            return parents[key]["id"]
+        except KeyError:
+            raise LoadError(
+                f"Cannot load {record['type']} {record_key(record)!r}: "
+                f"unknown parent {key!r}"
+            ) from None
+
+    # Level writers
+
+    def _flush_zone(self, records: List[dict]) -> None:
+        rows = {record_key(r): {"name": r["name"], **self._values("zone", r)} for r in records}
+        self._write("zone", Zone, rows, self.zones, aliases=self._aliases(records))
+
+    def _flush_state(self, records: List[dict]) -> None:
+        rows = {}
+        moved = {}
+        for r in records:
+            zone_id = self._parent_id(self.zones, (r["zone"],), r)
+            rows[record_key(r)] = {"zone_id": zone_id, "name": r["name"], **self._values("state", r)}
+            current = self.states.get(record_key(r))
+            if current is not None and current["zone_id"] != zone_id:
+                moved[current["id"]] = zone_id
+        self._write("state", State, rows, self.states, ("zone_id",), self._aliases(records))
+        # Keep the denormalized zone of rows below a state that changed zones
+        for state_id, zone_id in moved.items():
+            for model in (City, Ward, PostalCode):
+                model.objects.using(self.using).filter(state_id=state_id).update(zone_id=zone_id)
+
+    def _flush_lga(self, records: List[dict]) -> None:
+        rows = {}
+        for r in records:
+            state_id = self._parent_id(self.states, (r["state"],), r)
+            rows[record_key(r)] = {
+                "state_id": state_id,
+                "name": r["name"],
+                "full_name": LGA.format_full_name(r["name"], r["state"]),
+                **self._values("lga", r),
+            }
+        self._write("lga", LGA, rows, self.lgas, ("full_name",), self._aliases(records))
+
+    def _flush_city(self, records: List[dict]) -> None:
+        self._flush_lga_children("city", City, records)
+
+    def _flush_ward(self, records: List[dict]) -> None:
+        self._flush_lga_children("ward", Ward, records)
+
+    def _flush_lga_children(self, level: str, model, records: List[dict]) -> None:
+        rows = {}
+        aliases = {}
+        for r in records:
+            lga_id = self._parent_id(self.lgas, (r["state"], r["lga"]), r)
+            if model is Ward:
+                full_name = Ward.format_full_name(r["name"], r["lga"], r["state"])
+            else:
+                full_name = City.format_full_name(r["name"], r["state"])
+            rows[(lga_id, r["name"])] = {
+                "lga_id": lga_id,
+                "name": r["name"],
+                **self._denormalized(r["state"]),
+                "full_name": full_name,
+                **self._values(level, r),
+            }
+            if r.get("aliases"):
+                aliases[(lga_id, r["name"])] = r["aliases"]
+
+        existing = self._existing(level, rows)
+        self._write(level, model, rows, existing, DENORMALIZED_FIELDS, aliases)
+
+    def _denormalized(self, state_name: str) -> dict:
+        """The denormalized parent ids of rows below ``state_name``"""
+        state = self.states[(state_name,)]
+        return {"state_id": state["id"], "zone_id": state["zone_id"]}
+
+    def _flush_postal_code(self, records: List[dict]) -> None:
+        rows = {}
+        city_keys = set()
+        for r in records:
+            lga_id = self._parent_id(self.lgas, (r["state"], r["lga"]), r)
+            row = {
+                "code": r["code"],
+                "lga_id": lga_id,
+                **self._denormalized(r["state"]),
+                **self._values("postal_code", r),
+            }
+            if r.get("city"):
+                city_keys.add((lga_id, r["city"]))
+            rows[record_key(r)] = row
+
+        cities = {}
+        if city_keys:
+            cities = {
+                (lga_id, name): {"id": pk}
+                for pk, lga_id, name in City.objects.using(self.using)
+                .filter(
+                    lga_id__in={key[0] for key in city_keys},
+                    name__in={key[1] for key in city_keys},
+                )
+                .values_list("id", "lga_id", "name")
+            }
+        for r in records:
+            if r.get("city"):
+                row = rows[record_key(r)]
+                row["city_id"] = self._parent_id(cities, (row["lga_id"], r["city"]), r)
+            elif "city" in r:
+                rows[record_key(r)]["city_id"] = None
+
+        existing = self._existing("postal_code", rows)
+        for r in records:
+            row = rows[record_key(r)]
+            # A record without "area" keeps the stored one
+            area = row["area"] if "area" in row else existing.get((r["code"],), {}).get("area", "")
+            row["full_name"] = PostalCode.format_full_name(r["code"], area, r["lga"])
+        self._write("postal_code", PostalCode, rows, existing, ("lga_id", "city_id", *DENORMALIZED_FIELDS))
+
+    def _existing(self, level: str, rows: Dict[tuple, dict]) -> Dict[tuple, dict]:
+        """Stored rows of a city, ward or postal code level with the keys of ``rows``"""
+        model = LEVEL_MODELS[level]
+        if level == "postal_code":
+            return {
+                (row["code"],): row
+                for row in model.objects.using(self.using)
+                .filter(code__in=[key[0] for key in rows])
+                .values("id", "code", "lga_id", "city_id", *DENORMALIZED_FIELDS, *LEVEL_FIELDS[level])
+            }
+        return {
+            (row["lga_id"], row["name"]): row
+            for row in model.objects.using(self.using)
+            .filter(lga_id__in={key[0] for key in rows}, name__in={key[1] for key in rows})
+            .values("id", "lga_id", "name", *DENORMALIZED_FIELDS, *LEVEL_FIELDS[level])
+        }
+
+    @staticmethod
+    def _aliases(records: List[dict]) -> Dict[tuple, list]:
+        return {record_key(r): r["aliases"] for r in records if r.get("aliases")}
+
+    @staticmethod
+    def _values(level: str, record: dict) -> dict:
+        """Writable field values present in ``record``"""
+        return {field: record[field] for field in LEVEL_FIELDS[level] if field in record}
+
+    def _write(
+        self,
+        level: str,
+        model,
+        rows: Dict[tuple, dict],
+        existing: Dict[tuple, dict],
+        parent_fields: tuple = (),
+        aliases: Optional[Dict[tuple, list]] = None,
+    ) -> None:
+        """
+        Diff ``rows`` against ``existing`` and write the difference, then
+        the ``aliases`` given for rows (see ``_write_aliases``)
+
+        ``existing`` is updated in place with the written rows, which keeps
+        the cached parent maps current.
+        """
+        to_create, to_update, update_fields = [], [], set()
+        for key, values in rows.items():
+            current = existing.get(key)
+            if current is None:
+                to_create.append((key, model(**values)))
+                continue
+            changed = {
+                field for field in (*parent_fields, *LEVEL_FIELDS[level])
+                if field in values and values[field] != current[field]
+            }
+            if changed:
+                current.update(values)
+                update_fields |= changed
+                to_update.append(current)
+
+        if to_create:
+            model.objects.using(self.using).bulk_create(
+                [obj for _, obj in to_create], batch_size=self.batch_size
+            )
+            self.created[level] += len(to_create)
+            if not connections[self.using].features.can_return_rows_from_bulk_insert:
+                self._refetch_ids(model, to_create)
+            fields = (*parent_fields, *LEVEL_FIELDS[level])
+            for key, obj in to_create:
+                existing[key] = {
+                    "id": obj.pk,
+                    **{field: getattr(obj, field) for field in fields},
+                    **rows[key],
+                }
+
+        if to_update:
+            fields = sorted(update_fields)
+            objs = [
+                model(id=row["id"], **{field: row[field] for field in fields})
+                for row in to_update
+            ]
+            model.objects.using(self.using).bulk_update(objs, fields, batch_size=self.batch_size)
+            self.updated[level] += len(to_update)
+
+        if level in ALIAS_LEVELS:
+            self._write_aliases(level, rows, existing, aliases or {})
+
+    def _write_aliases(self, level: str, rows: Dict[tuple, dict], existing: Dict[tuple, dict], aliases) -> None:
+        """
+        Insert the given aliases of ``rows``, plus the folded form of names
+        with punctuation or accents ("Kabba/Bunu" is found as "kabba bunu").
+        Aliases already stored are left alone; none are ever removed here.
+        """
+        objs = []
+        for key, values in rows.items():
+            names = list(aliases.get(key, ()))
+            if fold(values["name"]) != values["name"].casefold():
+                names.append(values["name"])
+            for alias in names:
+                objs.append(LocationAlias(
+                    kind=level,
+                    object_id=existing[key]["id"],
+                    alias=alias,
+                    normalized_alias=LocationAlias.normalize(alias),
+                ))
+        if objs:
+            LocationAlias.objects.using(self.using).bulk_create(
+                objs, batch_size=self.batch_size, ignore_conflicts=True
+            )
+
+    def _refetch_ids(self, model, created: List[tuple]) -> None:
+        """Fill in primary keys on backends where bulk_create cannot return them"""
+        if model is Zone or model is State:
+            ids = dict(
+                model.objects.using(self.using)
+                .filter(name__in=[obj.name for _, obj in created])
+                .values_list("name", "id")
+            )
+            for _, obj in created:
+                obj.pk = ids[obj.name]
+        elif model is LGA:
+            ids = {
+                (state_id, name): pk
+                for pk, state_id, name in model.objects.using(self.using)
+                .filter(state_id__in={obj.state_id for _, obj in created})
+                .values_list("id", "state_id", "name")
+            }
+            for _, obj in created:
+                obj.pk = ids[(obj.state_id, obj.name)]
+        # Cities, wards and postal codes are never used as cached parents
+
+
+def subtree_digest(payload) -> str:
+    """Stable content hash of a JSON-serializable structure"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SyncLoader(BulkLoader):
+    """
+    Mirror a complete dataset into the database, touching only what changed.
+
+    A content hash is computed for every state and LGA subtree and compared
+    with the hash stored by the previous sync (``SubtreeDigest``). Subtrees
+    whose hash is unchanged are skipped without reading their rows; for the
+    others the differing rows are inserted, updated or deleted. States, LGAs,
+    cities, wards and postal codes that are not in the dataset are deleted.
+
+    Unlike ``BulkLoader`` the whole dataset is grouped in memory first, as
+    hashes can only be computed over complete subtrees. Rows are deleted
+    through Django's collector, so the ``on_delete`` of foreign keys from other
+    apps is applied and the model signals are sent. The stored hashes
+    describe the data last synced, so rows edited by other means are not
+    noticed until their subtree changes; a ``--clear`` reload resets them.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, using: str = DEFAULT_DB_ALIAS):
+        super().__init__(batch_size=batch_size, using=using)
+        self.deleted = dict.fromkeys(LEVELS, 0)
+        self.unchanged_states = 0
+
+    def load(self, records: Iterable[dict]) -> "SyncLoader":
+        with load_phase("group"):
+            zones, states, lgas, children = self._group(records)
+        with load_phase("diff"):
+            digests, changed_states, changed_lgas, stored = self._diff(states, lgas, children)
+        with load_phase("delete"):
+            self._delete_missing(zones, states, lgas, children, changed_states, changed_lgas)
+            prune_aliases(self.using)
+
+        # Upsert the changed subtrees through the bulk loader
+        for record in zones.values():
+            self.add(record)
+        for (state_name,), record in states.items():
+            if state_name in changed_states:
+                self.add(record)
+                for lga in lgas.get(state_name, {}).values():
+                    self.add(lga)
+        for key in changed_lgas:
+            for level in ("city", "ward", "postal_code"):
+                for record in children.get(key, {}).get(level, {}).values():
+                    self.add(record)
+        self.flush()
+
+        # Store the new hashes of changed subtrees and drop stale ones
+        with load_phase("digests"):
+            changed_keys = {key for key, digest in digests.items() if stored.get(key) != digest}
+            stale_keys = changed_keys | (set(stored) - set(digests))
+            digest_objects = SubtreeDigest.objects.using(self.using)
+            for scope in (SubtreeDigest.SCOPE_STATE, SubtreeDigest.SCOPE_LGA):
+                keys = [key for s, key in stale_keys if s == scope]
+                for chunk in _chunks(keys, self.batch_size):
+                    digest_objects.filter(scope=scope, key__in=chunk).delete()
+            digest_objects.bulk_create(
+                [SubtreeDigest(scope=scope, key=key, digest=digests[(scope, key)])
+                 for scope, key in changed_keys],
+                batch_size=self.batch_size,
+            )
+        return self
+
+    def _diff(self, states, lgas, children):
+        """Hash every subtree bottom-up and compare with the last sync"""
+        stored = {
+            (scope, key): digest
+            for scope, key, digest in SubtreeDigest.objects.using(self.using)
+            .values_list("scope", "key", "digest")
+        }
+        digests = {}
+        changed_states, changed_lgas = set(), set()
+        for (state_name,), state in states.items():
+            lga_digests = {}
+            for key, lga in lgas.get(state_name, {}).items():
+                kids = children.get(key, {})
+                lga_digests[key] = subtree_digest([
+                    lga,
+                    [kids[level][k] for level in ("city", "ward", "postal_code")
+                     for k in sorted(kids.get(level, {}))],
+                ])
+                digests[(SubtreeDigest.SCOPE_LGA, self._lga_key(key))] = lga_digests[key]
+            digest = subtree_digest([state, sorted([key[1], d] for key, d in lga_digests.items())])
+            digests[(SubtreeDigest.SCOPE_STATE, state_name)] = digest
+
+            if stored.get((SubtreeDigest.SCOPE_STATE, state_name)) == digest:
+                self.unchanged_states += 1
+                continue
+            changed_states.add(state_name)
+            changed_lgas.update(
+                key for key, d in lga_digests.items()
+                if stored.get((SubtreeDigest.SCOPE_LGA, self._lga_key(key))) != d
+            )
+        return digests, changed_states, changed_lgas, stored
+
+    @staticmethod
+    def _lga_key(key: tuple) -> str:
+        return json.dumps(list(key), ensure_ascii=False)
+
+    @staticmethod
+    def _group(records: Iterable[dict]):
+        """Group records by level and parent, checking the dataset is complete"""
+        zones, states, lgas, children = {}, {}, {}, {}
+        for record in records:
+            key = record_key(record)
+            level = record["type"]
+            if level == "zone":
+                zones[key] = record
+            elif level == "state":
+                states[key] = record
+            elif level == "lga":
+                lgas.setdefault(record["state"], {})[key] = record
+            else:
+                children.setdefault((record["state"], record["lga"]), {}).setdefault(level, {})[key] = record
+
+        for (state_name,), state in states.items():
+            if (state["zone"],) not in zones:
+                raise LoadError(f"State {state_name!r} refers to zone {state['zone']!r}, which is not in the dataset")
+        for state_name in lgas:
+            if (state_name,) not in states:
+                raise LoadError(f"LGAs refer to state {state_name!r}, which is not in the dataset")
+        for key in children:
+            if key not in lgas.get(key[0], {}):
+                raise LoadError(f"Records refer to LGA {key!r}, which is not in the dataset")
+        return zones, states, lgas, children
+
+    def _delete_missing(self, zones, states, lgas, children, changed_states, changed_lgas) -> None:
+        """Delete rows of changed subtrees that are no longer in the dataset"""
+        self._delete(State.objects.using(self.using).exclude(name__in=[k[0] for k in states]))
+
+        existing_lgas = {}
+        stale_lga_ids = []
+        for pk, state_name, name in (
+            LGA.objects.using(self.using)
+            .filter(state__name__in=changed_states)
+            .values_list("id", "state__name", "name")
+        ):
+            if (state_name, name) in lgas.get(state_name, {}):
+                existing_lgas[pk] = (state_name, name)
+            else:
+                stale_lga_ids.append(pk)
+        self._delete_ids(LGA, stale_lga_ids)
+
+        lga_ids = [pk for pk, key in existing_lgas.items() if key in changed_lgas]
+        for level, field in (("city", "name"), ("ward", "name"), ("postal_code", "code")):
+            model = LEVEL_MODELS[level]
+            stale_ids = []
+            for chunk in _chunks(lga_ids, self.batch_size):
+                for pk, lga_id, value in (
+                    model.objects.using(self.using)
+                    .filter(lga_id__in=chunk)
+                    .values_list("id", "lga_id", field)
+                ):
+                    key = existing_lgas[lga_id]
+                    wanted = children.get(key, {}).get(level, {})
+                    if ((value,) if level == "postal_code" else (*key, value)) not in wanted:
+                        stale_ids.append(pk)
+            self._delete_ids(model, stale_ids)
+
+        self._delete(Zone.objects.using(self.using).exclude(name__in=[k[0] for k in zones]))
+
+        # Deleted rows may still be cached in the parent maps
+        self._zones = self._states = self._lgas = None
+
+    def _delete_ids(self, model, ids: List[int]) -> None:
+        for chunk in _chunks(ids, self.batch_size):
+            self._delete(model.objects.using(self.using).filter(id__in=chunk))
+
+    def _delete(self, queryset) -> None:
+        for level, count in _delete_rows(queryset).items():
+            self.deleted[level] += count
+
+
+class CopyLoader(BulkLoader):
+    """
+    Bulk loader streaming cities, wards and postal codes through PostgreSQL's
+    ``COPY``.
+
+    Each batch is copied (``COPY ... FROM STDIN``) into a temporary staging
+    table and merged into its table with one ``INSERT ... SELECT ... ON
+    CONFLICT DO UPDATE``, which only rewrites rows whose values differ and
+    reports how many rows it inserted and updated. Existing rows are neither
+    read nor diffed in Python. ``load`` runs in a transaction; the staging
+    tables are dropped when it commits.
+
+    Needs PostgreSQL with psycopg (3) or psycopg2; check ``supports()`` and
+    use ``BulkLoader`` on other backends. A batch costs a few statements
+    whatever its size, so use a larger ``batch_size`` (e.g. 50000) than with
+    ``BulkLoader``.
+    """
+
+    @staticmethod
+    def supports(using: str = DEFAULT_DB_ALIAS) -> bool:
+        return connections[using].vendor == "postgresql"
+
+    def load(self, records: Iterable[dict]) -> "CopyLoader":
+        if not self.supports(self.using):
+            raise LoadError(f"COPY loading needs PostgreSQL, not {connections[self.using].vendor}")
+        with transaction.atomic(using=self.using):
+            return super().load(records)
+
+    def _existing(self, level: str, rows: Dict[tuple, dict]) -> Dict[tuple, dict]:
+        # The merge needs no stored rows, except the area of postal code
+        # records without one (for their full_name)
+        if level == "postal_code":
+            return super()._existing(level, {key: row for key, row in rows.items() if "area" not in row})
+        return {}
+
+    def _write(
+        self,
+        level: str,
+        model,
+        rows: Dict[tuple, dict],
+        existing: Dict[tuple, dict],
+        parent_fields: tuple = (),
+        aliases: Optional[Dict[tuple, list]] = None,
+    ) -> None:
+        if level not in COPY_KEYS:
+            super()._write(level, model, rows, existing, parent_fields, aliases)
+            return
+
+        keys = COPY_KEYS[level]
+        columns = tuple(dict.fromkeys((*keys, *parent_fields, *LEVEL_FIELDS[level])))
+        defaults = {column: model._meta.get_field(column).get_default() for column in columns}
+        # Fields missing from a record keep their stored value, so rows are
+        # merged in groups of the fields they carry (usually a single group)
+        groups: Dict[frozenset, List[dict]] = {}
+        for values in rows.values():
+            groups.setdefault(frozenset(values), []).append(values)
+
+        with connections[self.using].cursor() as cursor:
+            for present, group in groups.items():
+                with load_phase("copy", level=level):
+                    staging = self._stage(cursor, model, columns, (
+                        [values.get(column, defaults[column]) for column in columns] for values in group
+                    ))
+                with load_phase("merge", level=level):
+                    created, updated = self._merge(
+                        cursor, model, staging, columns, keys,
+                        [column for column in columns if column in present and column not in keys],
+                    )
+                self.created[level] += created
+                self.updated[level] += updated
+
+        if level in ALIAS_LEVELS:
+            aliases = aliases or {}
+            # Only rows with aliases to insert need their ids
+            rows = {
+                key: values for key, values in rows.items()
+                if aliases.get(key) or fold(values["name"]) != values["name"].casefold()
+            }
+            if rows:
+                self._write_aliases(level, rows, super()._existing(level, rows), aliases)
+
+    def _stage(self, cursor, model, columns: tuple, rows: Iterable[list]) -> str:
+        """Copy ``rows`` into the (emptied) staging table of ``model``"""
+        quote = connections[self.using].ops.quote_name
+        staging = quote(f"{model._meta.db_table}_staging")
+        column_list = ", ".join(quote(column) for column in columns)
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {quote(model._meta.db_table)} WITH NO DATA"
+        )
+        cursor.execute(f"TRUNCATE {staging}")
+        copy_rows(cursor, f"COPY {staging} ({column_list}) FROM STDIN", rows)
+        return staging
+
+    def _merge(self, cursor, model, staging: str, columns: tuple, keys: tuple, update_columns: list) -> Tuple[int, int]:
+        """Upsert the staged rows; returns the numbers of rows inserted and updated"""
+        quote = connections[self.using].ops.quote_name
+        table = quote(model._meta.db_table)
+        column_list = ", ".join(quote(column) for column in columns)
+        if update_columns:
+            assignments = ", ".join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in update_columns)
+            stored = ", ".join(f"{table}.{quote(column)}" for column in update_columns)
+            incoming = ", ".join(f"EXCLUDED.{quote(column)}" for column in update_columns)
+            action = f"DO UPDATE SET {assignments} WHERE ({stored}) IS DISTINCT FROM ({incoming})"
+        else:
+            action = "DO NOTHING"
+        # xmax is 0 for rows inserted by the statement; unchanged rows are
+        # not returned at all
+        cursor.execute(
+            f"WITH merged AS ("
+            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({', '.join(quote(key) for key in keys)}) {action} "
+            f"RETURNING (xmax = 0) AS inserted"
+            f") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+        )
+        created, updated = cursor.fetchone()
+        return created, updated
+
+
+class SyncCopyLoader(CopyLoader, SyncLoader):
+    """``SyncLoader`` writing the changed subtrees with ``COPY``"""
+
+
+# Escapes of COPY's text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_rows(cursor, sql: str, rows: Iterable[list]) -> None:
+    """
+    Stream ``rows`` (lists of column values) through a ``COPY ... FROM STDIN``
+    statement on a Django cursor, with psycopg (3) or psycopg2
+    """
+    raw = cursor.cursor
+    if hasattr(raw, "copy"):
+        with raw.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+        return
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_text(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    raw.copy_expert(sql, buffer)
+
+
+def prune_aliases(using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Delete aliases of rows that no longer exist (one query per level)
+
+    Aliases refer to their row by kind and id rather than a foreign key, so
+    deletes do not cascade to them.
+    """
+    deleted = 0
+    for level in ALIAS_LEVELS:
+        model = LEVEL_MODELS[level]
+        deleted += LocationAlias.objects.using(using).filter(kind=level).exclude(
+            object_id__in=model.objects.using(using).values("id")
+        ).delete()[0]
+    return deleted
+
+
+def clear_locations(using: str = DEFAULT_DB_ALIAS) -> Dict[str, int]:
+    """
+    Delete every location, alias and subtree digest, postal codes first
+
+    Returns the number of rows deleted per level. The ``on_delete`` of
+    foreign keys from other apps to these models is applied, as with
+    ``QuerySet.delete()``.
+    """
+    deleted = dict.fromkeys(LEVELS, 0)
+    for level in reversed(LEVELS):
+        for deleted_level, count in _delete_rows(LEVEL_MODELS[level].objects.using(using)).items():
+            deleted[deleted_level] += count
+    LocationAlias.objects.using(using).delete()
+    SubtreeDigest.objects.using(using).delete()
+    return deleted
+
+
+def _delete_rows(queryset) -> Dict[str, int]:
+    """
+    Delete the rows of ``queryset`` with ``QuerySet.delete()``; returns the
+    number of rows deleted per level, cascades included
+
+    Django's collector applies the ``on_delete`` of every foreign key to the
+    rows, including those of models in other apps, and sends the model
+    signals, whose cache invalidations run once per transaction.
+    """
+    _, counts = queryset.delete()
+    return {level: counts.get(model._meta.label, 0) for level, model in LEVEL_MODELS.items()}
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,65 @@
+"""
+Management command to benchmark the loader, lookups, search and admin
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django_ng_locations.benchmarks import DEFAULT_SIZES, PHASES, format_results, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark load_ng_locations, the utils lookups, search_locations and the admin "
+        "changelists on a synthetic dataset in a throwaway test database created from the "
+        "default one (run with --settings to compare SQLite and PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--phase",
+            action="append",
+            choices=PHASES,
+            dest="phases",
+            help="Run only this phase; may be repeated (default: all)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Calls per timed lookup (default: 50; search and admin use a tenth)",
+        )
+        for name, default in DEFAULT_SIZES.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                default=default,
+                help=f"Synthetic {name.replace('_', ' ')} to generate (default: {default})",
+            )
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic dataset")
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help=(
+                "Benchmark in the default database itself, in a transaction that is rolled back, "
+                "instead of a test database"
+            ),
+        )
+        parser.add_argument("--json", dest="output", help="Also write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be a positive integer")
+
+        results = run_benchmarks(
+            phases=options["phases"] or PHASES,
+            iterations=options["iterations"],
+            sizes={name: options[name] for name in DEFAULT_SIZES},
+            seed=options["seed"],
+            log=self.stderr.write,
+            in_place=options["in_place"],
+        )
+        self.stdout.write("\n".join(format_results(results)))
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"\nResults written to {options['output']}"))
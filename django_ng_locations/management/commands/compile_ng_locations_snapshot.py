@@ -0,0 +1,43 @@
+"""
+Management command to compile the location tables into a binary snapshot
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django_ng_locations.conf import get_setting
+from django_ng_locations.snapshot import LEVELS, SnapshotError, compile_snapshot, invalidate_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile zones, states, LGAs, cities, wards and postal codes into a "
+        "memory-mappable snapshot file readable without a database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            help="Output file (default: NG_LOCATIONS_SNAPSHOT_PATH)",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to read the locations from",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or get_setting("SNAPSHOT_PATH")
+        if not path:
+            raise CommandError("Give an output path or set NG_LOCATIONS_SNAPSHOT_PATH")
+
+        try:
+            counts = compile_snapshot(path, using=options["database"])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        invalidate_snapshot()
+
+        rows = ", ".join(f"{counts[level]} {level.replace('_', ' ')} rows" for level in LEVELS)
+        size = os.path.getsize(path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path} ({size / 1024:.1f} KiB): {rows}"))
@@ -0,0 +1,52 @@
+"""
+Management command to export the location tree as precompressed JSON files
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django_ng_locations.tree import DEFAULT_DEPTH, MAX_DEPTH, build_tree_payload
+
+# File suffix of each content coding
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the zone -> state -> LGA tree as JSON plus .gz and (with the "
+        "brotli package) .br variants, ready to be served as static files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output JSON file, e.g. static/ng_locations_tree.json")
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=DEFAULT_DEPTH,
+            help=f"Levels to include: 1 zones, 2 states, 3 LGAs, 4 cities and wards (default: {DEFAULT_DEPTH})",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to read the locations from",
+        )
+
+    def handle(self, *args, **options):
+        if not 1 <= options["depth"] <= MAX_DEPTH:
+            raise CommandError(f"--depth must be between 1 and {MAX_DEPTH}")
+
+        payload = build_tree_payload(options["depth"], using=options["database"])
+        path = options["path"]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        files = [(path, payload.body)]
+        files += [(path + SUFFIXES[encoding], data) for encoding, data in payload.encoded.items()]
+        for file_path, data in files:
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self.stdout.write(f"  {file_path} ({len(data) / 1024:.1f} KiB)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported the depth {payload.depth} tree (ETag {payload.etag_for('')})"
+        ))
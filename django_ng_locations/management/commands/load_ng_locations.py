@@ -1,14 +1,55 @@
 """
 Management command to load Nigerian location data into the database
 """
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from django_ng_locations.models import Zone, State, LGA, City, Ward, PostalCode
-from django_ng_locations.fixtures.nigeria_data import NIGERIA_DATA
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+from django_ng_locations.cache import bump_dataset_version
+from django_ng_locations.fixtures import nigeria_data
+from django_ng_locations.geo import invalidate_geo_index
+from django_ng_locations.index import invalidate_index
+from django_ng_locations.instrumentation import load_phase
+from django_ng_locations.loader import (
+    DEFAULT_BATCH_SIZE,
+    LEVELS,
+    BulkLoader,
+    CopyLoader,
+    LoadError,
+    SyncCopyLoader,
+    SyncLoader,
+    clear_locations,
+    iter_records,
+    read_source,
+)
+from django_ng_locations.models import Zone, State, LGA, City, Ward, PostalCode, SubtreeDigest
+from django_ng_locations.postal import invalidate_postal_index
+from django_ng_locations.search import invalidate_search_index
+
+LEVEL_LABELS = {
+    "zone": "zones",
+    "state": "states",
+    "lga": "LGAs",
+    "city": "cities",
+    "ward": "wards",
+    "postal_code": "postal codes",
+}
+
+# Loader class by engine and --sync
+LOADERS = {
+    ("bulk", False): BulkLoader,
+    ("bulk", True): SyncLoader,
+    ("copy", False): CopyLoader,
+    ("copy", True): SyncCopyLoader,
+}
 
 
 class Command(BaseCommand):
-    help = "Load Nigerian geographic data (zones, states, LGAs) into the database"
+    help = (
+        "Load Nigerian geographic data (zones, states, LGAs and, with the nested "
+        "fixture format, cities, wards and postal codes) into the database"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -16,73 +57,120 @@ class Command(BaseCommand):
             action="store_true",
             help="Clear existing data before loading",
         )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help=(
+                "Mirror the data into the database: only states and LGAs whose content "
+                "hash changed since the last sync are touched, and rows missing from the "
+                "data are deleted"
+            ),
+        )
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument(
+            "--data",
+            help=(
+                "Dotted path to a NIGERIA_DATA-style dict in the flat or nested format "
+                "(default: the bundled dataset, streamed from its data file)"
+            ),
+        )
+        source.add_argument(
+            "--source",
+            help=(
+                "Stream records from a .ndjson/.jsonl file (one record per line) "
+                "or a .json file (an array of records or a NIGERIA_DATA-style object)"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of rows written per bulk query (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--engine",
+            choices=("bulk", "copy"),
+            default="bulk",
+            help=(
+                "How cities, wards and postal codes are written: batched inserts and updates "
+                "(bulk, the default) or, on PostgreSQL, COPY into staging tables merged with "
+                "INSERT ... ON CONFLICT (copy, experimental; other backends fall back to bulk)"
+            ),
+        )
 
     def handle(self, *args, **options):
-        if options["clear"]:
-            self.stdout.write(self.style.WARNING("Clearing existing data..."))
-            PostalCode.objects.all().delete()
-            Ward.objects.all().delete()
-            City.objects.all().delete()
-            LGA.objects.all().delete()
-            State.objects.all().delete()
-            Zone.objects.all().delete()
-            self.stdout.write(self.style.SUCCESS("Existing data cleared."))
-
-        self.stdout.write("Loading Nigerian location data...")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive integer")
 
-        with transaction.atomic():
-            zones_created = 0
-            states_created = 0
-            lgas_created = 0
+        if options["source"]:
+            if not os.path.exists(options["source"]):
+                raise CommandError(f"Source file not found: {options['source']}")
+            try:
+                records = read_source(options["source"])
+            except LoadError as e:
+                raise CommandError(str(e))
+        elif options["data"]:
+            try:
+                records = iter_records(import_string(options["data"]))
+            except ImportError as e:
+                raise CommandError(f"Cannot import location data: {e}")
+        else:
+            records = nigeria_data.iter_records()
 
-            for zone_name, zone_data in NIGERIA_DATA.items():
-                # Create or get zone
-                zone, created = Zone.objects.get_or_create(
-                    name=zone_name,
-                    defaults={"code": zone_data["code"]}
-                )
-                if created:
-                    zones_created += 1
-                    self.stdout.write(f"  Created zone: {zone_name}")
-
-                # Create states
-                for state_name, state_data in zone_data["states"].items():
-                    state, created = State.objects.get_or_create(
-                        name=state_name,
-                        defaults={
-                            "zone": zone,
-                            "code": state_data.get("code", ""),
-                            "capital": state_data.get("capital", ""),
-                        }
-                    )
-                    if created:
-                        states_created += 1
-                        self.stdout.write(f"    Created state: {state_name}")
-                    elif state.zone != zone:
-                        # Update zone if it changed
-                        state.zone = zone
-                        state.save()
+        engine = options["engine"]
+        if engine == "copy" and not CopyLoader.supports():
+            self.stdout.write(self.style.WARNING(
+                f"The copy engine needs PostgreSQL; using batched inserts on {connection.vendor}."
+            ))
+            engine = "bulk"
+        loader = LOADERS[engine, options["sync"]](batch_size=options["batch_size"])
+        mode = "sync" if options["sync"] else "bulk"
+        try:
+            # A failed load rolls back the clear as well
+            with transaction.atomic():
+                if options["clear"]:
+                    self.stdout.write(self.style.WARNING("Clearing existing data..."))
+                    with load_phase("clear"):
+                        clear_locations()
+                    self.stdout.write(self.style.SUCCESS("Existing data cleared."))
 
-                    # Create LGAs
-                    for lga_name in state_data["lgas"]:
-                        lga, created = LGA.objects.get_or_create(
-                            state=state,
-                            name=lga_name,
-                            defaults={"code": ""}
-                        )
-                        if created:
-                            lgas_created += 1
+                self.stdout.write("Loading Nigerian location data...")
+                with load_phase("load", mode=mode, engine=engine):
+                    if not options["sync"]:
+                        # Rows may change outside of what the stored hashes describe
+                        SubtreeDigest.objects.all().delete()
+                    loader.load(records)
+        except LoadError as e:
+            raise CommandError(str(e))
+        # Bulk writes send no model signals
+        with load_phase("invalidate"):
+            invalidate_index()
+            invalidate_search_index()
+            invalidate_geo_index()
+            invalidate_postal_index()
+            bump_dataset_version()
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"\nSuccessfully loaded Nigerian location data:\n"
-                f"  - {zones_created} zones created\n"
-                f"  - {states_created} states created\n"
-                f"  - {lgas_created} LGAs created\n"
-                f"\nTotal in database:\n"
-                f"  - {Zone.objects.count()} zones\n"
-                f"  - {State.objects.count()} states\n"
-                f"  - {LGA.objects.count()} LGAs"
-            )
-        )
+        self.stdout.write(self.style.SUCCESS(self.summary(loader)))
 
+    def summary(self, loader):
+        models = (Zone, State, LGA, City, Ward, PostalCode)
+        deleted = getattr(loader, "deleted", dict.fromkeys(LEVELS, 0))
+        lines = ["", "Successfully loaded Nigerian location data:"]
+        for level in LEVELS:
+            if (
+                loader.created[level] or loader.updated[level] or deleted[level]
+                or level in ("zone", "state", "lga")
+            ):
+                line = (
+                    f"  - {loader.created[level]} {LEVEL_LABELS[level]} created, "
+                    f"{loader.updated[level]} updated"
+                )
+                if isinstance(loader, SyncLoader):
+                    line += f", {deleted[level]} deleted"
+                lines.append(line)
+        if isinstance(loader, SyncLoader):
+            lines.append(f"  - {loader.unchanged_states} states unchanged")
+        lines += ["", "Total in database:"]
+        for level, model in zip(LEVELS, models):
+            lines.append(f"  - {model.objects.count()} {LEVEL_LABELS[level]}")
+        return "\n".join(lines)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ng_locations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubtreeDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('state', 'State'), ('lga', 'LGA')], max_length=10)),
+                ('key', models.CharField(max_length=255)),
+                ('digest', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Subtree Digest',
+                'verbose_name_plural': 'Subtree Digests',
+                'unique_together': {('scope', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ng_locations', '0002_subtreedigest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='ng_city_upper_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lga',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='ng_lga_upper_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postalcode',
+            index=models.Index(fields=['lga', 'code'], name='ng_postalcode_lga_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='ng_state_upper_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(django.db.models.functions.text.Upper('code'), name='ng_state_upper_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(fields=['zone', 'name'], name='ng_state_zone_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ward',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='ng_ward_upper_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='zone',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='ng_zone_upper_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='zone',
+            index=models.Index(django.db.models.functions.text.Upper('code'), name='ng_zone_upper_code_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Admin changelists search the big tables with istartswith/iexact, which
+# PostgreSQL compiles to UPPER(col::text) LIKE/= UPPER(%s). Only an index on
+# that expression with text_pattern_ops serves LIKE prefixes under non-C
+# collations, and Index(opclasses=...) cannot express it portably, so the
+# indexes are created for PostgreSQL only.
+PATTERN_INDEXES = [
+    ("city", "name", "ng_city_upper_name_like"),
+    ("ward", "name", "ng_ward_upper_name_like"),
+    ("ward", "code", "ng_ward_upper_code_like"),
+    ("postalcode", "code", "ng_postalcode_upper_code_like"),
+    ("postalcode", "area", "ng_postalcode_upper_area_like"),
+]
+
+
+def create_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    for model_name, column, index_name in PATTERN_INDEXES:
+        table = apps.get_model("django_ng_locations", model_name)._meta.db_table
+        schema_editor.execute(
+            f"CREATE INDEX {quote(index_name)} ON {quote(table)} "
+            f"(UPPER({quote(column)}::text) text_pattern_ops)"
+        )
+
+
+def drop_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, _, index_name in PATTERN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(index_name)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ng_locations', '0003_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_pattern_indexes, drop_pattern_indexes),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Concat
+
+
+def backfill(apps, schema_editor):
+    """Fill in state, zone and full_name; the formats mirror the models' format_full_name"""
+    using = schema_editor.connection.alias
+    State = apps.get_model("django_ng_locations", "State")
+    LGA = apps.get_model("django_ng_locations", "LGA")
+    City = apps.get_model("django_ng_locations", "City")
+    Ward = apps.get_model("django_ng_locations", "Ward")
+    PostalCode = apps.get_model("django_ng_locations", "PostalCode")
+
+    states = {state.id: state for state in State.objects.using(using)}
+    for state in states.values():
+        LGA.objects.using(using).filter(state_id=state.id).update(
+            full_name=Concat("name", Value(f", {state.name}"))
+        )
+    for lga in LGA.objects.using(using).only("id", "state_id", "name"):
+        state = states[lga.state_id]
+        parents = {"state_id": state.id, "zone_id": state.zone_id}
+        City.objects.using(using).filter(lga_id=lga.id).update(
+            full_name=Concat("name", Value(f", {state.name}")), **parents
+        )
+        Ward.objects.using(using).filter(lga_id=lga.id).update(
+            full_name=Concat("name", Value(f" ({lga.name}, {state.name})")), **parents
+        )
+        PostalCode.objects.using(using).filter(lga_id=lga.id).update(
+            full_name=Concat(
+                "code",
+                Value(" - "),
+                Case(When(area="", then=Value(lga.name)), default=F("area")),
+                output_field=models.CharField(),
+            ),
+            **parents,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ng_locations', '0004_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='city',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='city',
+            name='state',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cities', to='django_ng_locations.state'),
+        ),
+        migrations.AddField(
+            model_name='city',
+            name='zone',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cities', to='django_ng_locations.zone'),
+        ),
+        migrations.AddField(
+            model_name='lga',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='postalcode',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='postalcode',
+            name='state',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='postal_codes', to='django_ng_locations.state'),
+        ),
+        migrations.AddField(
+            model_name='postalcode',
+            name='zone',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='postal_codes', to='django_ng_locations.zone'),
+        ),
+        migrations.AddField(
+            model_name='ward',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='ward',
+            name='state',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='wards', to='django_ng_locations.state'),
+        ),
+        migrations.AddField(
+            model_name='ward',
+            name='zone',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='wards', to='django_ng_locations.zone'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ng_locations', '0005_denormalized_hierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('zone', 'Zone'), ('state', 'State'), ('lga', 'LGA'), ('city', 'City'), ('ward', 'Ward')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('alias', models.CharField(max_length=200)),
+                ('normalized_alias', models.CharField(editable=False, max_length=200)),
+            ],
+            options={
+                'verbose_name': 'Location Alias',
+                'verbose_name_plural': 'Location Aliases',
+                'ordering': ['kind', 'alias'],
+                'unique_together': {('kind', 'normalized_alias', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ng_locations', '0006_locationalias'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='locationalias',
+            name='object_id',
+            field=models.PositiveBigIntegerField(),
+        ),
+    ]
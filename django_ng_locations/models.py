@@ -1,4 +1,8 @@
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Concat, Upper
+
+from .text import fold
 
 
 class Zone(models.Model):
@@ -10,6 +14,11 @@ class Zone(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Case-insensitive lookups, see utils._iexact
+            models.Index(Upper("name"), name="ng_zone_upper_name_idx"),
+            models.Index(Upper("code"), name="ng_zone_upper_code_idx"),
+        ]
         verbose_name = "Geopolitical Zone"
         verbose_name_plural = "Geopolitical Zones"
 
@@ -30,12 +39,27 @@ class State(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(Upper("name"), name="ng_state_upper_name_idx"),
+            models.Index(Upper("code"), name="ng_state_upper_code_idx"),
+            # States of a zone, ordered by name
+            models.Index(fields=["zone", "name"], name="ng_state_zone_name_idx"),
+        ]
         verbose_name = "State"
         verbose_name_plural = "States"
 
     def __str__(self):
         return self.name
 
+    def refresh_descendants(self, using=DEFAULT_DB_ALIAS):
+        """Rewrite the denormalized fields of everything below this state"""
+        LGA.objects.using(using).filter(state=self).update(
+            full_name=Concat("name", Value(LGA.format_full_name("", self.name)))
+        )
+        for lga in LGA.objects.using(using).filter(state=self):
+            lga.state = self
+            lga.refresh_descendants(using)
+
 
 class LGA(models.Model):
     """
@@ -44,15 +68,48 @@ class LGA(models.Model):
     state = models.ForeignKey(State, on_delete=models.CASCADE, related_name="lgas")
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=50, blank=True)
+    # Denormalized "<name>, <state>", maintained on save (see signals) and by the loader
+    full_name = models.CharField(max_length=255, blank=True, editable=False)
 
     class Meta:
         unique_together = ("state", "name")
         ordering = ["name"]
+        indexes = [
+            models.Index(Upper("name"), name="ng_lga_upper_name_idx"),
+        ]
         verbose_name = "Local Government Area"
         verbose_name_plural = "Local Government Areas"
 
     def __str__(self):
-        return f"{self.name}, {self.state.name}"
+        return self.full_name or self.format_full_name(self.name, self.state.name)
+
+    @staticmethod
+    def format_full_name(name, state_name):
+        return f"{name}, {state_name}"
+
+    def denormalize(self):
+        """Recompute the denormalized fields from the parent state"""
+        self.full_name = self.format_full_name(self.name, self.state.name)
+
+    def refresh_descendants(self, using=DEFAULT_DB_ALIAS):
+        """Rewrite the denormalized fields of this LGA's cities, wards and postal codes"""
+        state = self.state
+        parents = {"state_id": state.id, "zone_id": state.zone_id}
+        City.objects.using(using).filter(lga=self).update(
+            full_name=Concat("name", Value(City.format_full_name("", state.name))), **parents
+        )
+        Ward.objects.using(using).filter(lga=self).update(
+            full_name=Concat("name", Value(Ward.format_full_name("", self.name, state.name))), **parents
+        )
+        PostalCode.objects.using(using).filter(lga=self).update(
+            full_name=Concat(
+                "code",
+                Value(" - "),
+                Case(When(area="", then=Value(self.name)), default=F("area")),
+                output_field=models.CharField(),
+            ),
+            **parents,
+        )
 
 
 class City(models.Model):
@@ -61,6 +118,14 @@ class City(models.Model):
     """
     lga = models.ForeignKey(LGA, on_delete=models.CASCADE, related_name="cities")
     name = models.CharField(max_length=150)
+    # Denormalized from the LGA, maintained on save (see signals) and by the loader
+    state = models.ForeignKey(
+        State, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name="cities"
+    )
+    zone = models.ForeignKey(
+        Zone, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name="cities"
+    )
+    full_name = models.CharField(max_length=255, blank=True, editable=False)
     is_capital = models.BooleanField(default=False)
     population = models.IntegerField(null=True, blank=True)
     latitude = models.FloatField(null=True, blank=True)
@@ -69,11 +134,24 @@ class City(models.Model):
     class Meta:
         unique_together = ("lga", "name")
         ordering = ["name"]
+        indexes = [
+            models.Index(Upper("name"), name="ng_city_upper_name_idx"),
+        ]
         verbose_name = "City"
         verbose_name_plural = "Cities"
 
     def __str__(self):
-        return f"{self.name}, {self.lga.state.name}"
+        return self.full_name or self.format_full_name(self.name, self.lga.state.name)
+
+    @staticmethod
+    def format_full_name(name, state_name):
+        return f"{name}, {state_name}"
+
+    def denormalize(self):
+        """Recompute the denormalized fields from the parent LGA"""
+        state = self.lga.state
+        self.state_id, self.zone_id = state.id, state.zone_id
+        self.full_name = self.format_full_name(self.name, state.name)
 
 
 class Ward(models.Model):
@@ -82,16 +160,37 @@ class Ward(models.Model):
     """
     lga = models.ForeignKey(LGA, on_delete=models.CASCADE, related_name="wards")
     name = models.CharField(max_length=150)
+    # Denormalized from the LGA, maintained on save (see signals) and by the loader
+    state = models.ForeignKey(
+        State, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name="wards"
+    )
+    zone = models.ForeignKey(
+        Zone, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name="wards"
+    )
+    full_name = models.CharField(max_length=255, blank=True, editable=False)
     code = models.CharField(max_length=50, blank=True)
 
     class Meta:
         unique_together = ("lga", "name")
         ordering = ["name"]
+        indexes = [
+            models.Index(Upper("name"), name="ng_ward_upper_name_idx"),
+        ]
         verbose_name = "Ward"
         verbose_name_plural = "Wards"
 
     def __str__(self):
-        return f"{self.name} ({self.lga})"
+        return self.full_name or self.format_full_name(self.name, self.lga.name, self.lga.state.name)
+
+    @staticmethod
+    def format_full_name(name, lga_name, state_name):
+        return f"{name} ({lga_name}, {state_name})"
+
+    def denormalize(self):
+        """Recompute the denormalized fields from the parent LGA"""
+        state = self.lga.state
+        self.state_id, self.zone_id = state.id, state.zone_id
+        self.full_name = self.format_full_name(self.name, self.lga.name, state.name)
 
 
 class PostalCode(models.Model):
@@ -104,12 +203,103 @@ class PostalCode(models.Model):
         City, on_delete=models.SET_NULL, null=True, blank=True, related_name="postal_codes"
     )
     area = models.CharField(max_length=200, blank=True)
+    # Denormalized from the LGA, maintained on save (see signals) and by the loader
+    state = models.ForeignKey(
+        State, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name="postal_codes"
+    )
+    zone = models.ForeignKey(
+        Zone, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name="postal_codes"
+    )
+    full_name = models.CharField(max_length=255, blank=True, editable=False)
 
     class Meta:
         ordering = ["code"]
+        indexes = [
+            # Postal codes of an LGA, ordered by code
+            models.Index(fields=["lga", "code"], name="ng_postalcode_lga_code_idx"),
+        ]
         verbose_name = "Postal Code"
         verbose_name_plural = "Postal Codes"
 
     def __str__(self):
-        return f"{self.code} - {self.area if self.area else self.lga.name}"
+        return self.full_name or self.format_full_name(self.code, self.area, self.lga.name)
+
+    @staticmethod
+    def format_full_name(code, area, lga_name):
+        return f"{code} - {area if area else lga_name}"
+
+    def denormalize(self):
+        """Recompute the denormalized fields from the parent LGA"""
+        state = self.lga.state
+        self.state_id, self.zone_id = state.id, state.zone_id
+        self.full_name = self.format_full_name(self.code, self.area, self.lga.name)
+
+
+class LocationAlias(models.Model):
+    """
+    Alternative name of a zone, state, LGA, city or ward, e.g. "AMAC" for
+    Abuja Municipal or "Ogbomoso North" for Ogbomosho North
+    """
+    KIND_ZONE = "zone"
+    KIND_STATE = "state"
+    KIND_LGA = "lga"
+    KIND_CITY = "city"
+    KIND_WARD = "ward"
+    KIND_CHOICES = [
+        (KIND_ZONE, "Zone"),
+        (KIND_STATE, "State"),
+        (KIND_LGA, "LGA"),
+        (KIND_CITY, "City"),
+        (KIND_WARD, "Ward"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    alias = models.CharField(max_length=200)
+    # Folded alias the lookups match against, maintained on save (see
+    # signals) and by the loader
+    normalized_alias = models.CharField(max_length=200, editable=False)
+
+    class Meta:
+        # Also the index of the lookups by (kind, normalized_alias)
+        unique_together = ("kind", "normalized_alias", "object_id")
+        ordering = ["kind", "alias"]
+        verbose_name = "Location Alias"
+        verbose_name_plural = "Location Aliases"
+
+    def __str__(self):
+        return f"{self.alias} ({self.kind} {self.object_id})"
+
+    @staticmethod
+    def normalize(alias):
+        """Accent-, case- and punctuation-insensitive form of an alias"""
+        return fold(alias)
 
+    def denormalize(self):
+        self.normalized_alias = self.normalize(self.alias)
+
+
+class SubtreeDigest(models.Model):
+    """
+    Content hash of a state or LGA subtree as last loaded by
+    ``load_ng_locations --sync``, used to skip subtrees that did not change
+    """
+    SCOPE_STATE = "state"
+    SCOPE_LGA = "lga"
+    SCOPE_CHOICES = [
+        (SCOPE_STATE, "State"),
+        (SCOPE_LGA, "LGA"),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=255)
+    digest = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("scope", "key")
+        verbose_name = "Subtree Digest"
+        verbose_name_plural = "Subtree Digests"
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
@@ -0,0 +1,178 @@
+"""
+In-process index of postal codes
+
+NIPOST codes are six digits whose leading digits encode the region and the
+state, so codes sharing a prefix are neighbours in sort order. The index
+keeps every code in one sorted list next to a parallel list of entries;
+membership, prefix and range queries are binary searches (``bisect``) over
+that list and never touch the database:
+
+    index = get_postal_index()
+    index.get("100001")                  # PostalCodeEntry(...) or None
+    index.with_prefix("1002")            # every code starting with 1002
+    index.in_range("100001", "100999")
+    found, missing = index.validate_many(codes)
+
+Like the hierarchy index it is built on first use (one query) and dropped
+whenever a location changes (see ``signals.py``) and after
+``load_ng_locations``.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .instrumentation import record_cache_access
+from .models import PostalCode
+
+
+def normalize_code(code: str) -> str:
+    """A postal code without whitespace, e.g. " 100 001" -> "100001" """
+    return "".join(code.split()).upper()
+
+
+def prefix_bounds(prefix: str) -> Tuple[str, Optional[str]]:
+    """
+    Half-open ``[low, high)`` range of the codes starting with ``prefix``
+
+    ``high`` is None for an empty prefix, which matches every code.
+    """
+    if not prefix:
+        return prefix, None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class PostalCodeEntry(NamedTuple):
+    id: int
+    code: str
+    lga_id: int
+    city_id: Optional[int]
+    area: str
+    state_id: Optional[int]
+    zone_id: Optional[int]
+    full_name: str
+
+    def to_model(self) -> PostalCode:
+        return PostalCode.from_db(DEFAULT_DB_ALIAS, self._fields, self)
+
+
+class PostalCodeIndex:
+    """
+    Immutable, sorted snapshot of the postal codes
+
+    Codes are compared as strings; for codes of equal length (all NIPOST
+    codes have six digits) this is numeric order. Lookups normalize their
+    input with ``normalize_code``.
+    """
+
+    def __init__(self, entries: Iterable[PostalCodeEntry]):
+        self._entries: List[PostalCodeEntry] = sorted(entries, key=lambda entry: entry.code)
+        self._codes: List[str] = [entry.code for entry in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, code: str) -> bool:
+        return self.get(code) is not None
+
+    @classmethod
+    def build(cls, using: str = DEFAULT_DB_ALIAS) -> "PostalCodeIndex":
+        """Read every postal code from the database (one query)"""
+        return cls(
+            PostalCodeEntry(*row)
+            for row in PostalCode.objects.using(using).values_list(*PostalCodeEntry._fields)
+        )
+
+    @classmethod
+    async def abuild(cls, using: str = DEFAULT_DB_ALIAS) -> "PostalCodeIndex":
+        """Async variant of ``build``"""
+        return cls([
+            PostalCodeEntry(*row)
+            async for row in PostalCode.objects.using(using).values_list(*PostalCodeEntry._fields)
+        ])
+
+    def get(self, code: str) -> Optional[PostalCodeEntry]:
+        """The entry of ``code``, or None if there is no such postal code"""
+        code = normalize_code(code)
+        position = bisect_left(self._codes, code)
+        if position < len(self._codes) and self._codes[position] == code:
+            return self._entries[position]
+        return None
+
+    def with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[PostalCodeEntry]:
+        """Entries whose code starts with ``prefix``, in code order"""
+        low, high = prefix_bounds(normalize_code(prefix))
+        start = bisect_left(self._codes, low)
+        end = bisect_left(self._codes, high) if high is not None else len(self._codes)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._entries[start:end]
+
+    def in_range(self, start: str, end: str, limit: Optional[int] = None) -> List[PostalCodeEntry]:
+        """Entries with ``start <= code <= end``, in code order"""
+        first = bisect_left(self._codes, normalize_code(start))
+        last = bisect_right(self._codes, normalize_code(end))
+        if limit is not None:
+            last = min(last, first + limit)
+        return self._entries[first:last]
+
+    def validate_many(self, codes: Iterable[str]) -> Tuple[Dict[str, PostalCodeEntry], List[str]]:
+        """
+        Check a batch of codes
+
+        Returns the entries of the known codes, keyed by the code as given,
+        and the unknown codes in input order.
+        """
+        found: Dict[str, PostalCodeEntry] = {}
+        missing: List[str] = []
+        for code in codes:
+            entry = self.get(code)
+            if entry is not None:
+                found[code] = entry
+            else:
+                missing.append(code)
+        return found, missing
+
+
+_index: Optional[PostalCodeIndex] = None
+_lock = threading.Lock()
+
+
+def get_postal_index() -> PostalCodeIndex:
+    """The process-wide postal code index, built on first use"""
+    global _index
+    index = _index
+    record_cache_access("postal_index", index is not None)
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = PostalCodeIndex.build()
+            index = _index
+    return index
+
+
+async def aget_postal_index() -> PostalCodeIndex:
+    """Async variant of ``get_postal_index``"""
+    global _index
+    index = _index
+    record_cache_access("postal_index", index is not None)
+    if index is None:
+        index = _index = await PostalCodeIndex.abuild()
+    return index
+
+
+def invalidate_postal_index(**kwargs) -> None:
+    """Drop the process-wide postal code index; also usable as a signal receiver"""
+    global _index
+    _index = None
+
+
+def validate_postal_code(code: str) -> Optional[PostalCodeEntry]:
+    """The entry (with its LGA, state and zone ids) of ``code``, or None"""
+    return get_postal_index().get(code)
+
+
+def validate_postal_codes(codes: Iterable[str]) -> Tuple[Dict[str, PostalCodeEntry], List[str]]:
+    """Entries of the known ``codes`` and the list of unknown ones"""
+    return get_postal_index().validate_many(codes)
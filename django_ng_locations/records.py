@@ -0,0 +1,112 @@
+"""
+Conversion between ``NIGERIA_DATA``-style dicts and flat loader records
+
+Kept free of model imports, like ``text``, so the bundled fixture and the
+data collection scripts can use it without a configured Django project.
+"""
+from typing import Iterable, Iterator
+
+# Record fields that are not stored on the record's entry in a dataset dict
+PARENT_FIELDS = ("type", "zone", "state", "lga")
+
+# Dataset key and natural key field of each level below LGAs
+CHILD_LEVELS = {"city": ("cities", "name"), "ward": ("wards", "name"), "postal_code": ("postal_codes", "code")}
+
+
+def iter_records(data: dict) -> Iterator[dict]:
+    """
+    Flatten a ``NIGERIA_DATA``-style dict into loader records
+
+    Both fixture formats are understood: the flat one, where ``lgas`` is a
+    list of names, and the nested one produced by
+    ``convert_to_nested_structure.py``, where ``lgas`` maps each name to its
+    ``cities``, ``wards`` and ``postal_codes``. Entries of those lists may be
+    plain names/codes or dicts carrying extra fields, e.g.
+    ``{"name": "Ikeja", "is_capital": True}`` or
+    ``{"code": "100001", "area": "Ikeja GRA", "city": "Ikeja"}``.
+
+    Alternative names travel as an ``aliases`` list on states, LGAs, cities
+    and wards; a flat state may list its LGAs' aliases under ``lga_aliases``,
+    keyed by LGA name.
+    """
+    for zone_name, zone_data in data.items():
+        yield {"type": "zone", "name": zone_name, "code": zone_data["code"]}
+
+        for state_name, state_data in zone_data["states"].items():
+            yield {
+                "type": "state",
+                "zone": zone_name,
+                "name": state_name,
+                "code": state_data.get("code", ""),
+                "capital": state_data.get("capital", ""),
+                **_extra(state_data, ("latitude", "longitude", "aliases")),
+            }
+
+            lgas = state_data["lgas"]
+            if not isinstance(lgas, dict):
+                lgas = dict.fromkeys(lgas, {})
+            lga_aliases = state_data.get("lga_aliases", {})
+
+            for lga_name, lga_data in lgas.items():
+                if lga_name in lga_aliases:
+                    lga_data = {"aliases": lga_aliases[lga_name], **lga_data}
+                yield {"type": "lga", "state": state_name, "name": lga_name, **_extra(lga_data, ("code", "aliases"))}
+                parent = {"state": state_name, "lga": lga_name}
+
+                for city in lga_data.get("cities", ()):
+                    yield {"type": "city", **parent, **_entry(city, "name")}
+                for ward in lga_data.get("wards", ()):
+                    yield {"type": "ward", **parent, **_entry(ward, "name")}
+                for postal_code in lga_data.get("postal_codes", ()):
+                    yield {"type": "postal_code", **parent, **_entry(postal_code, "code")}
+
+
+def _extra(data: dict, fields: tuple) -> dict:
+    return {field: data[field] for field in fields if field in data}
+
+
+def _entry(value, key: str) -> dict:
+    """Normalize a nested list entry, which is either a string or a dict"""
+    if isinstance(value, dict):
+        return {field: v for field, v in value.items() if field not in ("type", "state", "lga")}
+    return {key: value}
+
+
+def build_data(records: Iterable[dict]) -> dict:
+    """
+    Rebuild a ``NIGERIA_DATA``-style dict from records, the inverse of
+    ``iter_records``
+
+    The flat format is used unless a record below the states needs the
+    nested one: an LGA with fields besides its aliases, or any city, ward or
+    postal code.
+    """
+    records = list(records)
+    nested = any(
+        r["type"] in CHILD_LEVELS or (r["type"] == "lga" and set(r) - {"type", "state", "name", "aliases"})
+        for r in records
+    )
+    data, states, lgas = {}, {}, {}
+    for r in records:
+        level = r["type"]
+        fields = {field: value for field, value in r.items() if field not in (*PARENT_FIELDS, "name")}
+        if level == "zone":
+            data[r["name"]] = {**fields, "states": {}}
+        elif level == "state":
+            state = states[r["name"]] = {**fields, "lgas": {} if nested else []}
+            data[r["zone"]]["states"][r["name"]] = state
+        elif level == "lga":
+            state = states[r["state"]]
+            if nested:
+                lga = lgas[r["state"], r["name"]] = {**fields, "cities": [], "wards": [], "postal_codes": []}
+                state["lgas"][r["name"]] = lga
+            else:
+                state["lgas"].append(r["name"])
+                if "aliases" in fields:
+                    state.setdefault("lga_aliases", {})[r["name"]] = fields["aliases"]
+        else:
+            key, field = CHILD_LEVELS[level]
+            entry = {name: value for name, value in r.items() if name not in PARENT_FIELDS}
+            lgas[r["state"], r["lga"]][key].append(entry[field] if entry.keys() == {field} else entry)
+    return data
+
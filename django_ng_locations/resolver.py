@@ -0,0 +1,342 @@
+"""
+Batch resolution of free-text (state, LGA, city) fragments to location ids
+
+User-typed addresses rarely match the canonical names: "lagos island",
+"Ibadan N/West", "Kabba Bunu LGA", "AMAC". ``AddressResolver`` reads the
+states, LGAs and cities and their stored aliases (``LocationAlias``) once
+into an in-memory alias index and resolves millions of rows without touching
+the database:
+
+    resolver = AddressResolver.build()
+    for result in resolver.resolve_many(rows, processes=4):
+        ...
+
+Every result carries a confidence between 0 and 1. Repeated inputs are
+memoized, and ``resolve_many`` can fan chunks out to worker processes. This
+module imports the models lazily, so workers can load it before Django is set
+up.
+"""
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .text import edit_distance, fold, typo_limit
+
+# Abbreviations expanded word by word before matching
+ABBREVIATIONS = {
+    "n": "north",
+    "s": "south",
+    "e": "east",
+    "w": "west",
+    "c": "central",
+    "nw": "north west",
+    "ne": "north east",
+    "sw": "south west",
+    "se": "south east",
+    "mun": "municipal",
+    "mkt": "market",
+}
+
+# Trailing words that carry no information ("Ikeja LGA", "Oyo State")
+FILLER_SUFFIXES = (
+    "local government area",
+    "local government",
+    "area council",
+    "l g a",
+    "lga",
+    "state",
+)
+
+# Scores of the ways a fragment can match
+EXACT_SCORE = 1.0
+ALIAS_SCORE = 0.9
+FUZZY_SCORES = {1: 0.8, 2: 0.65}
+
+# Cache size of memoized inputs per resolver
+MEMO_SIZE = 100_000
+
+# Chunks queued per worker process ahead of the results being consumed
+PREFETCH = 2
+
+
+def normalize(text: str) -> str:
+    """Folded text with abbreviations expanded and filler suffixes removed"""
+    words = []
+    for word in fold(text).split():
+        words.extend(ABBREVIATIONS.get(word, word).split())
+    normalized = " ".join(words)
+    for suffix in FILLER_SUFFIXES:
+        if normalized.endswith(" " + suffix):
+            normalized = normalized[:-len(suffix) - 1]
+            break
+    return normalized
+
+
+def _acronym(normalized: str) -> Optional[str]:
+    words = normalized.split()
+    return "".join(word[0] for word in words) if len(words) >= 3 else None
+
+
+class Resolution(NamedTuple):
+    state_id: Optional[int]
+    lga_id: Optional[int]
+    city_id: Optional[int]
+    # Mean score of the fragments given, 0 for fragments that did not resolve
+    confidence: float
+
+
+class _Level:
+    """Alias map and fuzzy-matching pool of one level"""
+
+    def __init__(self):
+        self.aliases: Dict[str, Dict[int, float]] = {}
+        self.names: Dict[int, str] = {}
+
+    def add(self, pk: int, name: str, *extra: str) -> None:
+        normalized = normalize(name)
+        self.names[pk] = normalized
+        self._alias(normalized, pk, EXACT_SCORE)
+        compact = normalized.replace(" ", "")
+        for alias in (compact, _acronym(normalized), *map(normalize, extra)):
+            if alias:
+                self._alias(alias, pk, ALIAS_SCORE)
+
+    def _alias(self, alias: str, pk: int, score: float) -> None:
+        ids = self.aliases.setdefault(alias, {})
+        ids[pk] = max(score, ids.get(pk, 0.0))
+
+    def match(self, text: str, scope: Optional[Set[int]] = None) -> Tuple[Tuple[int, ...], float]:
+        """Best-scoring ids for ``text`` (within ``scope``) and their score"""
+        key = normalize(text)
+        if not key:
+            return (), 0.0
+        scored = {}
+        for alias in (key, key.replace(" ", "")):
+            for pk, score in self.aliases.get(alias, {}).items():
+                if scope is None or pk in scope:
+                    scored[pk] = max(score, scored.get(pk, 0.0))
+        if not scored:
+            scored = self._fuzzy(key, scope)
+        if not scored:
+            return (), 0.0
+        best = max(scored.values())
+        return tuple(sorted(pk for pk, score in scored.items() if score == best)), best
+
+    def _fuzzy(self, key: str, scope: Optional[Set[int]]) -> Dict[int, float]:
+        limit = typo_limit(key)
+        if not limit:
+            return {}
+        candidates = scope if scope is not None else self.names
+        scored = {}
+        for pk in candidates:
+            name = self.names.get(pk)
+            # Unscoped pools are large; a typo in the first letter is rare
+            if name is None or (scope is None and name[:1] != key[:1]):
+                continue
+            distance = edit_distance(key, name, limit)
+            if distance <= limit:
+                scored[pk] = FUZZY_SCORES.get(distance, min(FUZZY_SCORES.values()))
+        return scored
+
+
+class AddressResolver:
+    """
+    In-memory resolver of (state, LGA, city) fragments
+
+    ``states`` are ``(id, name, code)`` rows, ``lgas``
+    ``(id, state_id, name)``, ``cities`` ``(id, lga_id, name)`` and
+    ``aliases`` ``(kind, id, alias)`` with a ``LocationAlias`` kind.
+    """
+
+    def __init__(
+        self,
+        states: Iterable[Sequence],
+        lgas: Iterable[Sequence],
+        cities: Iterable[Sequence] = (),
+        aliases: Iterable[Sequence] = (),
+        memo_size: int = MEMO_SIZE,
+    ):
+        self._states = _Level()
+        self._lgas = _Level()
+        self._cities = _Level()
+        self.lga_state: Dict[int, int] = {}
+        self.city_lga: Dict[int, int] = {}
+        self._state_lgas: Dict[int, Set[int]] = {}
+        self._lga_cities: Dict[int, Set[int]] = {}
+        self._state_cities: Dict[int, Set[int]] = {}
+        self.memo_size = memo_size
+
+        for pk, name, code in states:
+            self._states.add(pk, name, *([code] if code else []))
+        for pk, state_id, name in lgas:
+            self._lgas.add(pk, name)
+            self.lga_state[pk] = state_id
+            self._state_lgas.setdefault(state_id, set()).add(pk)
+        for pk, lga_id, name in cities:
+            self._cities.add(pk, name)
+            self.city_lga[pk] = lga_id
+            self._lga_cities.setdefault(lga_id, set()).add(pk)
+            self._state_cities.setdefault(self.lga_state.get(lga_id), set()).add(pk)
+
+        levels = {"state": self._states, "lga": self._lgas, "city": self._cities}
+        for kind, pk, alias in aliases:
+            level = levels.get(kind)
+            if level is not None and pk in level.names:
+                level._alias(normalize(alias), pk, ALIAS_SCORE)
+
+        self._memoize()
+
+    def _memoize(self) -> None:
+        self._resolve_normalized = lru_cache(maxsize=self.memo_size)(self._resolve)
+
+    def __getstate__(self):
+        # The memo is per process and not picklable
+        state = self.__dict__.copy()
+        del state["_resolve_normalized"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._memoize()
+
+    @classmethod
+    def build(cls, using: str = DEFAULT_DB_ALIAS, cities: bool = True, **kwargs) -> "AddressResolver":
+        """
+        Read states, LGAs, (unless ``cities`` is false) cities and their
+        aliases (four queries)
+        """
+        from .models import State, LGA, City, LocationAlias
+
+        kinds = [LocationAlias.KIND_STATE, LocationAlias.KIND_LGA] + ([LocationAlias.KIND_CITY] if cities else [])
+        return cls(
+            State.objects.using(using).values_list("id", "name", "code"),
+            LGA.objects.using(using).values_list("id", "state_id", "name"),
+            City.objects.using(using).values_list("id", "lga_id", "name") if cities else (),
+            LocationAlias.objects.using(using).filter(kind__in=kinds).values_list("kind", "object_id", "alias"),
+            **kwargs,
+        )
+
+    def resolve(
+        self,
+        state: Optional[str] = None,
+        lga: Optional[str] = None,
+        city: Optional[str] = None,
+    ) -> Resolution:
+        """Resolve one address; identical inputs are answered from a memo"""
+        return self._resolve_normalized(
+            (state or "").strip(), (lga or "").strip(), (city or "").strip()
+        )
+
+    def _resolve(self, state: str, lga: str, city: str) -> Resolution:
+        given = [bool(state), bool(lga), bool(city)]
+        state_ids, state_score = self._states.match(state) if state else ((), 0.0)
+        state_id = state_ids[0] if len(state_ids) == 1 else None
+
+        lga_id, lga_score = None, 0.0
+        lga_ids: Tuple[int, ...] = ()
+        if lga:
+            scope = self._state_lgas.get(state_id, set()) if state_id else None
+            lga_ids, lga_score = self._lgas.match(lga, scope)
+            if len(lga_ids) == 1:
+                lga_id = lga_ids[0]
+
+        city_id, city_score = None, 0.0
+        if city:
+            if lga_id:
+                scope = self._lga_cities.get(lga_id, set())
+            elif lga_ids:
+                # Ambiguous LGA name: let the city decide between them
+                scope = set().union(*(self._lga_cities.get(pk, set()) for pk in lga_ids))
+            elif state_id:
+                scope = self._state_cities.get(state_id, set())
+            else:
+                scope = None
+            city_ids, city_score = self._cities.match(city, scope)
+            if len(city_ids) == 1:
+                city_id = city_ids[0]
+                if lga_id is None and lga_ids:
+                    lga_id = self.city_lga[city_id]
+            elif lga_id is None and lga_ids and city_ids:
+                # Several cities; keep the LGA only if they all agree
+                owners = {self.city_lga[pk] for pk in city_ids}
+                if len(owners) == 1:
+                    lga_id = owners.pop()
+
+        # Fill in parents from the most specific level found
+        if lga_id is None and city_id is not None:
+            lga_id = self.city_lga[city_id]
+        if lga_id is not None:
+            if state_id is not None and self.lga_state[lga_id] != state_id:
+                # The fragments contradict each other; trust neither fully
+                state_score, lga_score = state_score / 2, lga_score / 2
+            state_id = self.lga_state[lga_id]
+
+        scores = [
+            score if resolved else 0.0
+            for score, resolved, provided in (
+                (state_score, state_id is not None, given[0]),
+                (lga_score, lga_id is not None, given[1]),
+                (city_score, city_id is not None, given[2]),
+            )
+            if provided
+        ]
+        confidence = round(sum(scores) / len(scores), 3) if scores else 0.0
+        return Resolution(state_id, lga_id, city_id, confidence)
+
+    def resolve_chunk(self, rows: Iterable[Sequence[Optional[str]]]) -> List[Resolution]:
+        return [self.resolve(*row) for row in rows]
+
+    def resolve_many(
+        self,
+        rows: Iterable[Sequence[Optional[str]]],
+        processes: Optional[int] = None,
+        chunk_size: int = 10_000,
+    ) -> Iterator[Resolution]:
+        """
+        Resolve an iterable of ``(state, lga, city)`` rows, yielding results
+        in input order
+
+        With ``processes`` > 1 chunks of ``chunk_size`` rows are resolved by
+        a pool of worker processes, each holding a copy of the index and its
+        own memo. At most ``PREFETCH`` chunks per process are read ahead of
+        the results consumed, so ``rows`` may be an unbounded stream.
+        """
+        rows = iter(rows)
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        if not processes or processes < 2:
+            for chunk in chunks:
+                yield from self.resolve_chunk(chunk)
+            return
+        with Pool(processes, initializer=_init_worker, initargs=(self,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_resolve_in_worker, (chunk,)))
+                if len(pending) >= processes * PREFETCH:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
+
+_worker_resolver: Optional[AddressResolver] = None
+
+
+def _init_worker(resolver: AddressResolver) -> None:
+    global _worker_resolver
+    _worker_resolver = resolver
+
+
+def _resolve_in_worker(chunk: List[Sequence[Optional[str]]]) -> List[Resolution]:
+    return _worker_resolver.resolve_chunk(chunk)
+
+
+def resolve_addresses(
+    rows: Iterable[Sequence[Optional[str]]],
+    processes: Optional[int] = None,
+    chunk_size: int = 10_000,
+) -> Iterator[Resolution]:
+    """Resolve ``(state, lga, city)`` rows against a freshly built resolver"""
+    return AddressResolver.build().resolve_many(rows, processes=processes, chunk_size=chunk_size)
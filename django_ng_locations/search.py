@@ -0,0 +1,325 @@
+"""
+In-memory search index for location names
+
+The index is built once per process from the location tables and supports
+ranked prefix matching on whole names and on every word of a name, typo
+tolerance (edit distance) and accent/punctuation folding, so "ogbomoso n"
+finds "Ogbomosho North" and "ado odo" finds "Ado-Odo/Ota". Aliases (see
+``LocationAlias``) are indexed alongside the names, so "amac" finds Abuja
+Municipal.
+
+Results are ranked by match quality (exact name, name prefix, word prefix,
+fuzzy), then by location level (states before LGAs before towns) and name
+length. Fuzzy matches are only looked for when nothing else matches.
+"""
+import threading
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .instrumentation import record_cache_access
+from .models import Zone, State, LGA, City, Ward, LocationAlias
+from .text import edit_distance, fold, typo_limit
+
+KINDS = ("zones", "states", "lgas", "cities", "wards")
+
+# Search kind of each LocationAlias kind
+ALIAS_KINDS = dict(zip((choice for choice, _ in LocationAlias.KIND_CHOICES), KINDS))
+
+# Match quality, lower is better
+EXACT, PREFIX, WORD_PREFIX, FUZZY = range(4)
+
+# Number of similar words checked per fuzzy query
+FUZZY_CANDIDATES = 100
+
+
+def _trigrams(token: str) -> set:
+    padded = f"  {token}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchResult(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    label: str
+    score: Tuple[int, ...]
+
+
+class SearchIndex:
+    """
+    Immutable search index over zones, states, LGAs, cities and wards.
+
+    ``entries`` is a sequence of ``(kind, id, name, label)`` tuples, where
+    ``label`` is the display name including parents, e.g. "Ikeja, Lagos".
+    ``aliases`` are ``(kind, id, alias)`` tuples; an alias matches like a
+    name but is reported as the entry it belongs to.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, int, str, str]],
+        aliases: Iterable[Tuple[str, int, str]] = (),
+    ):
+        self._entries: List[Tuple[str, int, str, str]] = []
+        self._folded: List[str] = []
+        names: Dict[str, List[Tuple[str, int]]] = {kind: [] for kind in KINDS}
+        suffixes: Dict[str, List[Tuple[str, int]]] = {kind: [] for kind in KINDS}
+        vocabulary: Dict[str, List[int]] = {}
+
+        positions: Dict[Tuple[str, int], int] = {}
+        for kind, pk, name, label in entries:
+            positions[kind, pk] = len(self._entries)
+            self._entries.append((kind, pk, name, label))
+            self._folded.append(fold(name))
+        for kind, pk, alias in aliases:
+            position, folded = positions.get((kind, pk)), fold(alias)
+            # Folded forms of the name itself (see loader) are already indexed
+            if position is not None and folded != self._folded[position]:
+                self._entries.append(self._entries[position])
+                self._folded.append(folded)
+        self._size = len(positions)
+
+        for position, (kind, pk, name, label) in enumerate(self._entries):
+            folded = self._folded[position]
+            names[kind].append((folded, position))
+            tokens = folded.split(" ")
+            for i in range(1, len(tokens)):
+                suffixes[kind].append((" ".join(tokens[i:]), position))
+            for token in set(tokens):
+                vocabulary.setdefault(token, []).append(position)
+
+        # Sorted (key, position) arrays per kind for prefix range scans
+        self._names = {kind: self._sorted(pairs) for kind, pairs in names.items()}
+        self._suffixes = {kind: self._sorted(pairs) for kind, pairs in suffixes.items()}
+
+        self._tokens = sorted(vocabulary)
+        self._token_entries = [tuple(vocabulary[token]) for token in self._tokens]
+        trigrams: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(self._tokens):
+            for trigram in _trigrams(token):
+                trigrams.setdefault(trigram, []).append(token_id)
+        self._trigrams = {trigram: tuple(ids) for trigram, ids in trigrams.items()}
+
+    @staticmethod
+    def _sorted(pairs: List[Tuple[str, int]]) -> Tuple[List[str], List[int]]:
+        pairs.sort()
+        return [key for key, _ in pairs], [position for _, position in pairs]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def build(cls, using: str = DEFAULT_DB_ALIAS) -> "SearchIndex":
+        """Read every location name and alias from the database (six queries)"""
+        return cls(
+            (
+                entry
+                for kind, queryset in cls._sources(using)
+                for entry in cls._entries_of(kind, queryset)
+            ),
+            cls._aliases_of(cls._alias_source(using)),
+        )
+
+    @classmethod
+    async def abuild(cls, using: str = DEFAULT_DB_ALIAS) -> "SearchIndex":
+        """Async variant of ``build``"""
+        entries = []
+        for kind, queryset in cls._sources(using):
+            entries.extend(cls._entries_of(kind, [row async for row in queryset]))
+        aliases = cls._aliases_of([row async for row in cls._alias_source(using)])
+        return cls(entries, list(aliases))
+
+    @staticmethod
+    def _sources(using: str):
+        yield "zones", Zone.objects.using(using).values_list("id", "name")
+        yield "states", State.objects.using(using).values_list("id", "name")
+        yield "lgas", LGA.objects.using(using).values_list("id", "name", "state__name")
+        for kind, model in (("cities", City), ("wards", Ward)):
+            yield kind, model.objects.using(using).values_list("id", "name", "lga__name", "lga__state__name")
+
+    @staticmethod
+    def _entries_of(kind: str, rows):
+        for pk, name, *parents in rows:
+            yield kind, pk, name, ", ".join([name, *parents])
+
+    @staticmethod
+    def _alias_source(using: str):
+        return LocationAlias.objects.using(using).values_list("kind", "object_id", "alias")
+
+    @staticmethod
+    def _aliases_of(rows):
+        for kind, pk, alias in rows:
+            yield ALIAS_KINDS[kind], pk, alias
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = 10,
+        kinds: Optional[Sequence[str]] = None,
+        max_distance: Optional[int] = None,
+        per_kind: Optional[int] = None,
+    ) -> List[SearchResult]:
+        """
+        Ranked matches for ``query``
+
+        ``kinds`` restricts the result to some of ``KINDS`` and ``per_kind``
+        keeps at most that many results of each kind. Fuzzy matching allows
+        one typo per word of 4-7 characters and two for longer ones, unless
+        ``max_distance`` says otherwise; it only kicks in when nothing
+        matches exactly or by prefix.
+        """
+        folded = fold(query)
+        if not folded:
+            return []
+        kinds = [kind for kind in KINDS if kind in kinds] if kinds else KINDS
+        # Prefix ranges can be huge for short queries; only a bounded number
+        # of candidates per kind is ranked
+        wanted = limit if per_kind is None else per_kind
+        cap = None if wanted is None else max(wanted * 5, 50)
+        best: Dict[int, Tuple[int, int]] = {}
+
+        def consider(position: int, quality: int, distance: int = 0) -> None:
+            if self._entries[position][0] in kinds:
+                score = (quality, distance)
+                if position not in best or score < best[position]:
+                    best[position] = score
+
+        for kind in kinds:
+            for position in self._prefix_range(*self._names[kind], folded, cap):
+                consider(position, EXACT if self._folded[position] == folded else PREFIX)
+            for position in self._prefix_range(*self._suffixes[kind], folded, cap):
+                consider(position, WORD_PREFIX)
+
+        if not best:
+            for position, distance in self._fuzzy(folded, max_distance, kinds):
+                consider(position, FUZZY, distance)
+
+        # A location matched through its name and its aliases is reported once
+        matches: Dict[Tuple[str, int], SearchResult] = {}
+        for position, (quality, distance) in best.items():
+            kind, pk, name, label = self._entries[position]
+            score = (quality, distance, KINDS.index(kind) if kind != "zones" else len(KINDS), len(name))
+            if (kind, pk) not in matches or score < matches[kind, pk].score:
+                matches[kind, pk] = SearchResult(kind, pk, name, label, score)
+        results = sorted(matches.values(), key=lambda r: (r.score, r.name))
+        if per_kind is not None:
+            counts = Counter()
+            kept = []
+            for result in results:
+                counts[result.kind] += 1
+                if counts[result.kind] <= per_kind:
+                    kept.append(result)
+            results = kept
+        return results if limit is None else results[:limit]
+
+    @staticmethod
+    def _prefix_range(keys: List[str], entries: List[int], prefix: str, cap: Optional[int]):
+        start = bisect_left(keys, prefix)
+        end = len(keys) if cap is None else min(len(keys), start + cap)
+        for i in range(start, end):
+            if not keys[i].startswith(prefix):
+                break
+            yield entries[i]
+
+    def _fuzzy(self, folded: str, max_distance: Optional[int], kinds: Sequence[str] = KINDS):
+        """
+        Entries of ``kinds`` matching the query within the allowed edit
+        distance, word by word; the last query word may match a prefix of a
+        name's word
+        """
+        words = folded.split(" ")
+        limits = [typo_limit(word) if max_distance is None else max_distance for word in words]
+        if not any(limits):
+            return
+
+        for token, distance in self._similar_tokens(words[0], limits[0], prefix=len(words) == 1):
+            for position in self._token_entries[bisect_left(self._tokens, token)]:
+                if self._entries[position][0] not in kinds:
+                    continue
+                tokens = self._folded[position].split(" ")
+                for start in (i for i, t in enumerate(tokens) if t == token):
+                    total = self._match_rest(words, limits, tokens, start)
+                    if total is not None:
+                        yield position, distance + total
+                        break
+
+    def _similar_tokens(self, word: str, limit: int, prefix: bool):
+        """Indexed words within ``limit`` edits of ``word`` (or of a prefix of them)"""
+        if limit == 0:
+            start = bisect_left(self._tokens, word)
+            for token in self._tokens[start:]:
+                if token != word and not (prefix and token.startswith(word)):
+                    break
+                yield token, 0
+            return
+
+        # Candidates share enough trigrams with the word; each edit destroys
+        # at most three of them
+        trigrams = _trigrams(word)
+        counts = Counter(chain.from_iterable(self._trigrams.get(t, ()) for t in trigrams))
+        needed = max(1, len(trigrams) - 3 * limit)
+        # Verifying is the expensive part; words sharing the most trigrams
+        # are the likeliest matches, so only the best candidates are checked
+        for token_id, shared in counts.most_common(FUZZY_CANDIDATES):
+            if shared < needed:
+                break
+            token = self._tokens[token_id]
+            distance = edit_distance(word, token, limit, prefix=prefix)
+            if distance <= limit:
+                yield token, distance
+
+    @staticmethod
+    def _match_rest(words: List[str], limits: List[int], tokens: List[str], start: int) -> Optional[int]:
+        """Total distance of ``words[1:]`` to the words following ``tokens[start]``"""
+        total = 0
+        for offset in range(1, len(words)):
+            if start + offset >= len(tokens):
+                return None
+            last = offset == len(words) - 1
+            distance = edit_distance(words[offset], tokens[start + offset], limits[offset], prefix=last)
+            if distance > limits[offset]:
+                return None
+            total += distance
+        return total
+
+
+_index: Optional[SearchIndex] = None
+_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """The process-wide search index, built on first use"""
+    global _index
+    index = _index
+    record_cache_access("search_index", index is not None)
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = SearchIndex.build()
+            index = _index
+    return index
+
+
+async def aget_search_index() -> SearchIndex:
+    """Async variant of ``get_search_index``"""
+    global _index
+    index = _index
+    record_cache_access("search_index", index is not None)
+    if index is None:
+        index = _index = await SearchIndex.abuild()
+    return index
+
+
+def invalidate_search_index(**kwargs) -> None:
+    """Drop the process-wide search index; also usable as a signal receiver"""
+    global _index
+    _index = None
+
+
+def autocomplete(query: str, limit: int = 10, kinds: Optional[Sequence[str]] = None) -> List[SearchResult]:
+    """Ranked location matches for a (partial) query"""
+    return get_search_index().search(query, limit=limit, kinds=kinds)
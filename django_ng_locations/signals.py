@@ -0,0 +1,77 @@
+"""
+Signal receivers keeping the denormalized hierarchy columns and the
+in-process and shared caches in step with the database
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .cache import bump_dataset_version_on_commit, on_commit_once
+from .geo import invalidate_geo_index
+from .index import invalidate_index
+from .models import Zone, State, LGA, City, Ward, PostalCode, LocationAlias
+from .postal import invalidate_postal_index
+from .search import invalidate_search_index
+
+
+# Fields whose change rewrites the denormalized columns below a row
+CASCADE_FIELDS = {State: ("name", "zone_id"), LGA: ("name", "state_id")}
+
+
+def denormalize(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        # Fixture loading; parents may not exist yet
+        return
+    if sender in CASCADE_FIELDS:
+        fields = CASCADE_FIELDS[sender]
+        previous = (
+            sender._base_manager.using(using).filter(pk=instance.pk).values_list(*fields).first()
+            if instance.pk is not None else None
+        )
+        instance._ng_locations_cascade = previous is not None and previous != tuple(
+            getattr(instance, field) for field in fields
+        )
+    if sender is not State:
+        instance.denormalize()
+
+
+def cascade_denormalized(sender, instance, raw=False, using=None, **kwargs):
+    if getattr(instance, "_ng_locations_cascade", False):
+        instance._ng_locations_cascade = False
+        instance.refresh_descendants(using)
+
+
+def hierarchy_changed(sender, **kwargs):
+    # Drop the index now for this connection, and again once the change is
+    # visible to everyone, so a rebuild inside the transaction is not kept.
+    # Commit callbacks are scheduled once per transaction, not per row.
+    invalidate_index()
+    on_commit_once(invalidate_index, kwargs.get("using"))
+
+
+def location_changed(sender, **kwargs):
+    if sender is not PostalCode:
+        invalidate_search_index()
+        on_commit_once(invalidate_search_index, kwargs.get("using"))
+    if sender is City or sender is State:
+        invalidate_geo_index()
+        on_commit_once(invalidate_geo_index, kwargs.get("using"))
+    if sender is not LocationAlias:
+        # Entries carry the ids of every level above, which cascades and
+        # SET_NULL change without sending signals for the postal codes
+        invalidate_postal_index()
+        on_commit_once(invalidate_postal_index, kwargs.get("using"))
+    bump_dataset_version_on_commit(using=kwargs.get("using"))
+
+
+for model in (State, LGA, City, Ward, PostalCode, LocationAlias):
+    pre_save.connect(denormalize, sender=model, dispatch_uid=f"ng_locations_denormalize_{model.__name__}")
+
+for model in (State, LGA):
+    post_save.connect(cascade_denormalized, sender=model, dispatch_uid=f"ng_locations_cascade_{model.__name__}")
+
+for model in (Zone, State, LGA, LocationAlias):
+    post_save.connect(hierarchy_changed, sender=model, dispatch_uid=f"ng_locations_index_{model.__name__}_save")
+    post_delete.connect(hierarchy_changed, sender=model, dispatch_uid=f"ng_locations_index_{model.__name__}_delete")
+
+for model in (Zone, State, LGA, City, Ward, PostalCode, LocationAlias):
+    post_save.connect(location_changed, sender=model, dispatch_uid=f"ng_locations_cache_{model.__name__}_save")
+    post_delete.connect(location_changed, sender=model, dispatch_uid=f"ng_locations_cache_{model.__name__}_delete")
@@ -0,0 +1,363 @@
+"""
+Compiled, memory-mappable snapshot of the location tables
+
+``compile_snapshot`` (or ``manage.py compile_ng_locations_snapshot``) writes
+zones, states, LGAs, cities, wards and postal codes into one binary file of
+flat arrays: UTF-8 string tables, parent row arrays, child ranges and sorted
+name and alias keys. ``Snapshot`` maps the file read-only and answers
+hierarchy and name lookups straight from the mapped pages:
+
+    snapshot = Snapshot("ng_locations.snap")
+    lagos = snapshot.by_name("state", "lagos")[0]
+    snapshot.children(lagos, "lga")
+
+No database connection is needed to read a snapshot, and processes mapping
+the same file share its pages. Like ``resolver`` this module imports the
+models lazily.
+
+File layout (little-endian): the 8-byte ``MAGIC``, the length of a JSON
+directory, the directory itself, then 8-byte aligned sections. Rows of each
+level are ordered by parent row and folded name, so the children of a row
+are a contiguous range.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+
+from .conf import get_setting
+from .text import fold
+
+MAGIC = b"NGSNAP\x00\x01"
+FORMAT_VERSION = 1
+
+LEVELS = ("zone", "state", "lga", "city", "ward", "postal_code")
+PARENTS = {"state": "zone", "lga": "state", "city": "lga", "ward": "lga", "postal_code": "lga"}
+
+# Parent row of rows without a parent
+NO_ROW = 0xFFFFFFFF
+ALIGNMENT = 8
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be compiled or read"""
+
+
+class Location(NamedTuple):
+    kind: str
+    id: int
+    parent_id: Optional[int]
+    # The area of a postal code
+    name: str
+    code: str
+
+
+# Writing
+
+
+def compile_snapshot(path: str, using: str = DEFAULT_DB_ALIAS) -> Dict[str, int]:
+    """
+    Write the location tables (and their aliases) of database ``using`` to
+    ``path``, atomically replacing any previous snapshot
+
+    Returns the number of rows written per level.
+    """
+    from .models import Zone, State, LGA, City, Ward, PostalCode, LocationAlias
+
+    sources = {
+        "zone": Zone.objects.values_list("id", "name", "code"),
+        "state": State.objects.values_list("id", "zone_id", "name", "code"),
+        "lga": LGA.objects.values_list("id", "state_id", "name", "code"),
+        "city": City.objects.values_list("id", "lga_id", "name"),
+        "ward": Ward.objects.values_list("id", "lga_id", "name", "code"),
+        "postal_code": PostalCode.objects.values_list("id", "lga_id", "area", "code"),
+    }
+    aliases: Dict[str, List[Tuple[int, str]]] = {}
+    for kind, object_id, normalized in LocationAlias.objects.using(using).values_list(
+        "kind", "object_id", "normalized_alias"
+    ):
+        aliases.setdefault(kind, []).append((object_id, normalized))
+
+    sections: Dict[str, bytes] = {}
+    counts = {}
+    rows_of: Dict[str, Dict[int, int]] = {}
+    for level in LEVELS:
+        parent = PARENTS.get(level)
+        rows = []
+        for row in sources[level].using(using):
+            if parent is None:
+                pk, name, code = row
+                parent_row = NO_ROW
+            else:
+                pk, parent_id, name, code = row if len(row) == 4 else (*row, "")
+                parent_row = rows_of[parent][parent_id]
+            rows.append((parent_row, fold(name), pk, name, code or ""))
+        rows.sort()
+        if any(pk >= NO_ROW for _, _, pk, _, _ in rows):
+            raise SnapshotError(f"{level} ids do not fit the snapshot format")
+        rows_of[level] = {pk: index for index, (_, _, pk, _, _) in enumerate(rows)}
+        counts[level] = len(rows)
+
+        sections[f"{level}.ids"] = _u32(pk for _, _, pk, _, _ in rows)
+        sections[f"{level}.names"], sections[f"{level}.names.data"] = _strings(name for *_, name, _ in rows)
+        sections[f"{level}.codes"], sections[f"{level}.codes.data"] = _strings(code for *_, code in rows)
+        if parent is not None:
+            sections[f"{level}.parents"] = _u32(parent_row for parent_row, *_ in rows)
+            # Row ranges per parent row: children of p are starts[p]:starts[p + 1]
+            starts = [0] * (counts[parent] + 1)
+            for parent_row, *_ in rows:
+                starts[parent_row + 1] += 1
+            for index in range(1, len(starts)):
+                starts[index] += starts[index - 1]
+            sections[f"{level}.starts"] = _u32(starts)
+
+        by_id = sorted((pk, index) for index, (_, _, pk, _, _) in enumerate(rows))
+        sections[f"{level}.sorted_ids"] = _u32(pk for pk, _ in by_id)
+        sections[f"{level}.sorted_id_rows"] = _u32(index for _, index in by_id)
+
+        keys = {(fold(code) if level == "postal_code" else folded, index)
+                for index, (_, folded, _, _, code) in enumerate(rows)}
+        keys.update(
+            (normalized, rows_of[level][object_id])
+            for object_id, normalized in aliases.get(level, ())
+            if object_id in rows_of[level]
+        )
+        keys = sorted(keys)
+        sections[f"{level}.keys"], sections[f"{level}.keys.data"] = _strings(key for key, _ in keys)
+        sections[f"{level}.key_rows"] = _u32(index for _, index in keys)
+
+    _write(path, sections, counts)
+    return counts
+
+
+def _u32(values) -> bytes:
+    values = array("I", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _strings(values) -> Tuple[bytes, bytes]:
+    """Offsets and data of a UTF-8 string table"""
+    offsets, data = [0], bytearray()
+    for value in values:
+        data += value.encode("utf-8")
+        offsets.append(len(data))
+    return _u32(offsets), bytes(data)
+
+
+def _write(path: str, sections: Dict[str, bytes], counts: Dict[str, int]) -> None:
+    # Section offsets depend on the directory size, which depends on them;
+    # offsets are relative to the end of the directory to break the cycle
+    directory, offset = {}, 0
+    for name, data in sections.items():
+        directory[name] = [offset, len(data)]
+        offset += -(-len(data) // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "counts": counts,
+        "sections": directory,
+    }, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % ALIGNMENT)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for data in sections.values():
+                f.write(data)
+                f.write(b"\0" * (-len(data) % ALIGNMENT))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Reading
+
+
+class _Strings:
+    """Random access to a string table, usable with ``bisect``"""
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+
+class _Level:
+    def __init__(self, snapshot: "Snapshot", level: str):
+        section = snapshot._section
+        self.ids = section(f"{level}.ids", "I")
+        self.names = _Strings(section(f"{level}.names", "I"), section(f"{level}.names.data"))
+        self.codes = _Strings(section(f"{level}.codes", "I"), section(f"{level}.codes.data"))
+        self.parents = section(f"{level}.parents", "I") if level in PARENTS else None
+        self.starts = section(f"{level}.starts", "I") if level in PARENTS else None
+        self.sorted_ids = section(f"{level}.sorted_ids", "I")
+        self.sorted_id_rows = section(f"{level}.sorted_id_rows", "I")
+        self.keys = _Strings(section(f"{level}.keys", "I"), section(f"{level}.keys.data"))
+        self.key_rows = section(f"{level}.key_rows", "I")
+
+    def row_of(self, pk: int) -> Optional[int]:
+        index = bisect_left(self.sorted_ids, pk)
+        if index < len(self.sorted_ids) and self.sorted_ids[index] == pk:
+            return self.sorted_id_rows[index]
+        return None
+
+    def rows_keyed(self, key: str) -> List[int]:
+        rows = []
+        index = bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            rows.append(self.key_rows[index])
+            index += 1
+        return rows
+
+
+class Snapshot:
+    """
+    Read-only view of a compiled snapshot
+
+    Lookups return ``Location`` tuples; names match case-, accent- and
+    punctuation-insensitively, and so do the aliases compiled in.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._views: List[memoryview] = []
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError(f"{path} is empty") from None
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise SnapshotError(f"{path} is not a location snapshot")
+            (length,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+            self._start = len(MAGIC) + 4 + length
+            self.meta = json.loads(self._mmap[len(MAGIC) + 4:self._start])
+            if self.meta["format"] != FORMAT_VERSION:
+                raise SnapshotError(f"{path} has unsupported format {self.meta['format']}")
+            self._buffer = self._view(memoryview(self._mmap))
+            self._levels = {level: _Level(self, level) for level in LEVELS}
+        except BaseException:
+            self.close()
+            raise
+
+    def _view(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def _section(self, name: str, format: Optional[str] = None):
+        offset, length = self.meta["sections"][name]
+        start = self._start + offset
+        view = self._view(self._buffer[start:start + length])
+        if format is None:
+            return view
+        if sys.byteorder == "big":
+            values = array(format, bytes(view))
+            values.byteswap()
+            return values
+        return self._view(view.cast(format))
+
+    def close(self) -> None:
+        """Unmap the file; locations already returned stay valid"""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def count(self, kind: str) -> int:
+        return len(self._levels[kind].ids)
+
+    def _location(self, kind: str, row: int) -> Location:
+        level = self._levels[kind]
+        parent_id = None
+        if level.parents is not None:
+            parent_id = self._levels[PARENTS[kind]].ids[level.parents[row]]
+        return Location(kind, level.ids[row], parent_id, level.names[row], level.codes[row])
+
+    def all(self, kind: str) -> Iterator[Location]:
+        """Every location of a level, grouped by parent and ordered by name"""
+        for row in range(self.count(kind)):
+            yield self._location(kind, row)
+
+    def get(self, kind: str, pk: int) -> Optional[Location]:
+        row = self._levels[kind].row_of(pk)
+        return self._location(kind, row) if row is not None else None
+
+    def parent(self, location: Location) -> Optional[Location]:
+        if location.parent_id is None:
+            return None
+        return self.get(PARENTS[location.kind], location.parent_id)
+
+    def children(self, location: Location, kind: str) -> List[Location]:
+        """The ``kind`` rows directly below ``location``, ordered by name"""
+        if PARENTS.get(kind) != location.kind:
+            raise ValueError(f"{kind} is not a child level of {location.kind}")
+        row = self._levels[location.kind].row_of(location.id)
+        if row is None:
+            return []
+        starts = self._levels[kind].starts
+        return [self._location(kind, child) for child in range(starts[row], starts[row + 1])]
+
+    def by_name(self, kind: str, name: str, parent: Optional[Location] = None) -> Tuple[Location, ...]:
+        """Locations of a level named (or aliased) ``name``, optionally below ``parent``"""
+        level = self._levels[kind]
+        rows = sorted(set(level.rows_keyed(fold(name))))
+        locations = (self._location(kind, row) for row in rows)
+        if parent is not None:
+            return tuple(location for location in locations if location.parent_id == parent.id)
+        return tuple(locations)
+
+    def postal_code(self, code: str) -> Optional[Location]:
+        rows = self._levels["postal_code"].rows_keyed(fold(code))
+        return self._location("postal_code", rows[0]) if rows else None
+
+
+_snapshot: Optional[Snapshot] = None
+_lock = threading.Lock()
+
+
+def get_snapshot() -> Snapshot:
+    """The process-wide snapshot at ``NG_LOCATIONS_SNAPSHOT_PATH``, mapped on first use"""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                path = get_setting("SNAPSHOT_PATH")
+                if not path:
+                    raise ImproperlyConfigured("NG_LOCATIONS_SNAPSHOT_PATH is not set")
+                _snapshot = Snapshot(path)
+            snapshot = _snapshot
+    return snapshot
+
+
+def invalidate_snapshot(**kwargs) -> None:
+    """Drop the process-wide snapshot, e.g. after compiling a new one"""
+    global _snapshot
+    _snapshot = None
@@ -0,0 +1,86 @@
+"""
+Tests for django_ng_locations
+
+Run them with ``python manage.py test django_ng_locations``.
+"""
+from django.core.cache import caches
+from django.test import TestCase
+
+from ..conf import get_setting
+from ..geo import invalidate_geo_index
+from ..index import invalidate_index
+from ..loader import BulkLoader
+from ..postal import invalidate_postal_index
+from ..search import invalidate_search_index
+from .. import tree
+
+# A small dataset covering every level, in loader record form
+RECORDS = [
+    {"type": "zone", "name": "South West", "code": "south_west"},
+    {"type": "zone", "name": "North Central", "code": "north_central"},
+    {
+        "type": "state", "zone": "South West", "name": "Lagos", "code": "LA", "capital": "Ikeja",
+        "latitude": 6.5244, "longitude": 3.3792, "aliases": ["Lasgidi"],
+    },
+    {
+        "type": "state", "zone": "South West", "name": "Oyo", "code": "OY", "capital": "Ibadan",
+        "latitude": 7.3775, "longitude": 3.947,
+    },
+    {
+        "type": "state", "zone": "North Central", "name": "Kwara", "code": "KW", "capital": "Ilorin",
+        "latitude": 8.4966, "longitude": 4.5426,
+    },
+    {"type": "lga", "state": "Lagos", "name": "Ikeja"},
+    {"type": "lga", "state": "Lagos", "name": "Eti-Osa"},
+    {"type": "lga", "state": "Lagos", "name": "Alimosho"},
+    {"type": "lga", "state": "Oyo", "name": "Ibadan North"},
+    {"type": "lga", "state": "Oyo", "name": "Ibadan South-West"},
+    {"type": "lga", "state": "Kwara", "name": "Ilorin West"},
+    {
+        "type": "city", "state": "Lagos", "lga": "Ikeja", "name": "Ikeja", "is_capital": True,
+        "latitude": 6.6018, "longitude": 3.3515,
+    },
+    {
+        "type": "city", "state": "Lagos", "lga": "Eti-Osa", "name": "Lekki",
+        "latitude": 6.4698, "longitude": 3.5852,
+    },
+    {
+        "type": "city", "state": "Oyo", "lga": "Ibadan North", "name": "Ibadan", "is_capital": True,
+        "latitude": 7.3964, "longitude": 3.9167,
+    },
+    {
+        "type": "city", "state": "Kwara", "lga": "Ilorin West", "name": "Ilorin", "is_capital": True,
+        "latitude": 8.4799, "longitude": 4.5418,
+    },
+    {"type": "ward", "state": "Lagos", "lga": "Ikeja", "name": "Alausa", "code": "LA/IKJ/01"},
+    {"type": "ward", "state": "Lagos", "lga": "Ikeja", "name": "Ward 1", "code": "LA/IKJ/02"},
+    {"type": "ward", "state": "Oyo", "lga": "Ibadan North", "name": "Ward 1", "code": "OY/IBN/01"},
+    {"type": "ward", "state": "Oyo", "lga": "Ibadan North", "name": "Ward 2", "code": "OY/IBN/02"},
+    {"type": "postal_code", "state": "Lagos", "lga": "Ikeja", "code": "100001", "area": "Ikeja GRA", "city": "Ikeja"},
+    {"type": "postal_code", "state": "Lagos", "lga": "Ikeja", "code": "100271", "area": "Alausa"},
+    {"type": "postal_code", "state": "Lagos", "lga": "Eti-Osa", "code": "106104", "area": "Lekki Phase 1"},
+    {"type": "postal_code", "state": "Oyo", "lga": "Ibadan North", "code": "200001", "area": "Agodi"},
+    {"type": "postal_code", "state": "Kwara", "lga": "Ilorin West", "code": "240001"},
+]
+
+
+def reset_caches() -> None:
+    """Drop every process-wide index and the shared cache"""
+    invalidate_index()
+    invalidate_search_index()
+    invalidate_geo_index()
+    invalidate_postal_index()
+    tree._payloads.clear()
+    caches[get_setting("CACHE_ALIAS")].clear()
+
+
+class LocationsTestCase(TestCase):
+    """TestCase with ``RECORDS`` loaded and no cached state from other tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        BulkLoader().load(RECORDS)
+
+    def setUp(self):
+        reset_caches()
+        self.addCleanup(reset_caches)
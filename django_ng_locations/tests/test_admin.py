@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import EstimatedCountPaginator
+from ..models import City, LGA, LocationAlias, PostalCode, State, Ward, Zone
+from . import LocationsTestCase
+
+MODELS = (Zone, State, LGA, City, Ward, PostalCode, LocationAlias)
+
+
+class AdminTestCase(LocationsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+
+class ChangelistTests(AdminTestCase):
+    def changelist_queries(self, model, per_page, params=None):
+        url = reverse(f"admin:django_ng_locations_{model._meta.model_name}_changelist")
+        with mock.patch.object(admin.site._registry[model], "list_per_page", per_page):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_the_page_size(self):
+        for model in MODELS:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self.changelist_queries(model, 1), self.changelist_queries(model, 100))
+
+    def test_filtered_query_count_does_not_depend_on_the_page_size(self):
+        lagos = State.objects.get(name="Lagos")
+        for model in (City, Ward, PostalCode):
+            with self.subTest(model=model.__name__):
+                params = {"state": lagos.pk}
+                self.assertEqual(
+                    self.changelist_queries(model, 1, params), self.changelist_queries(model, 100, params)
+                )
+
+    def test_lga_counts(self):
+        url = reverse("admin:django_ng_locations_lga_changelist")
+        response = self.client.get(url)
+        counts = {lga.name: (lga.city_count, lga.ward_count) for lga in response.context["cl"].result_list}
+        self.assertEqual(counts["Ikeja"], (1, 2))
+        self.assertEqual(counts["Ibadan North"], (1, 2))
+        self.assertEqual(counts["Alimosho"], (0, 0))
+
+
+class LargeTableTests(AdminTestCase):
+    def changelist(self, model, params=None):
+        response = self.client.get(reverse(f"admin:django_ng_locations_{model._meta.model_name}_changelist"), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def filter_choices(self, changelist, title):
+        # Filters without options are left out of the sidebar
+        for spec in changelist.filter_specs:
+            if spec.title == title:
+                return [choice["display"] for choice in spec.choices(changelist)][1:]
+        return []
+
+    def test_count_is_capped(self):
+        with mock.patch.object(EstimatedCountPaginator, "count_limit", 2):
+            self.assertEqual(self.changelist(PostalCode).paginator.count, 2)
+        self.assertEqual(self.changelist(PostalCode).paginator.count, 5)
+
+    def test_lga_filter_needs_a_state(self):
+        self.assertEqual(self.filter_choices(self.changelist(Ward), "LGA"), [])
+        lagos = State.objects.get(name="Lagos")
+        changelist = self.changelist(Ward, {"state": lagos.pk})
+        self.assertEqual(self.filter_choices(changelist, "LGA"), ["Alimosho", "Eti-Osa", "Ikeja"])
+        self.assertEqual(sorted(ward.name for ward in changelist.result_list), ["Alausa", "Ward 1"])
+
+    def test_wards_are_ordered_by_lga_name(self):
+        wards = [(ward.lga.name, ward.name) for ward in self.changelist(Ward).result_list]
+        self.assertEqual(wards, [
+            ("Ibadan North", "Ward 1"), ("Ibadan North", "Ward 2"), ("Ikeja", "Alausa"), ("Ikeja", "Ward 1"),
+        ])
+
+    def test_state_filter_follows_the_zone(self):
+        zone = Zone.objects.get(name="North Central")
+        self.assertEqual(self.filter_choices(self.changelist(City, {"zone": zone.pk}), "state"), ["Kwara"])
+
+    def test_choosing_a_level_resets_the_levels_below(self):
+        lagos = State.objects.get(name="Lagos")
+        ikeja = LGA.objects.get(name="Ikeja")
+        changelist = self.changelist(Ward, {"state": lagos.pk, "lga": ikeja.pk})
+        spec = next(spec for spec in changelist.filter_specs if spec.title == "zone")
+        query_string = list(spec.choices(changelist))[1]["query_string"]
+        self.assertNotIn("state=", query_string)
+        self.assertNotIn("lga=", query_string)
+
+    def test_invalid_filter_value(self):
+        url = reverse("admin:django_ng_locations_ward_changelist")
+        self.assertRedirects(self.client.get(url, {"state": "x"}), f"{url}?e=1", fetch_redirect_response=False)
+
+    def test_prefix_search(self):
+        self.assertEqual([city.name for city in self.changelist(City, {"q": "iba"}).result_list], ["Ibadan"])
+        self.assertFalse(self.changelist(City, {"q": "badan"}).result_list)
+
+    def test_autocomplete(self):
+        response = self.client.get(reverse("admin:autocomplete"), {
+            "app_label": "django_ng_locations", "model_name": "ward", "field_name": "lga", "term": "ike",
+        })
+        self.assertEqual([result["text"] for result in response.json()["results"]], ["Ikeja, Lagos"])
@@ -0,0 +1,60 @@
+from django.db import IntegrityError, transaction
+
+from .. import utils
+from ..loader import BulkLoader, prune_aliases
+from ..models import City, LGA, LocationAlias, State, Ward
+from . import RECORDS, LocationsTestCase
+
+
+class LocationAliasTests(LocationsTestCase):
+    def test_normalization(self):
+        alias = LocationAlias.objects.create(kind="state", object_id=1, alias="Ìbàdàn-Land!")
+        self.assertEqual(alias.normalized_alias, "ibadan land")
+        with transaction.atomic(), self.assertRaises(IntegrityError):
+            LocationAlias.objects.create(kind="state", object_id=1, alias="IBADAN LAND")
+
+    def test_object_ids_fit_big_primary_keys(self):
+        # The aliased models have BigAutoField primary keys
+        big_id = 2 ** 40
+        LocationAlias.objects.create(kind="ward", object_id=big_id, alias="Far Away")
+        self.assertEqual(LocationAlias.objects.get(alias="Far Away").object_id, big_id)
+
+    def test_loaded_aliases(self):
+        lagos = State.objects.get(name="Lagos")
+        self.assertEqual(list(LocationAlias.objects.filter(kind="state").values_list("object_id", "alias")), [
+            (lagos.pk, "Lasgidi"),
+        ])
+
+    def test_lookups_accept_aliases_in_one_query(self):
+        ikeja = LGA.objects.get(name="Ikeja")
+        LocationAlias.objects.create(kind="lga", object_id=ikeja.pk, alias="Ikeja Municipal")
+        LocationAlias.objects.create(kind="city", object_id=City.objects.get(name="Lekki").pk, alias="Lekki Peninsula")
+        with self.assertNumQueries(1):
+            self.assertEqual(utils.get_state_by_name("lasgidi").name, "Lagos")
+        with self.assertNumQueries(1):
+            self.assertEqual(utils.get_lga_by_name("ikeja municipal", "Lasgidi"), ikeja)
+        self.assertEqual(utils.get_city_by_name("Lekki peninsula").name, "Lekki")
+        self.assertEqual([ward.name for ward in utils.get_wards_by_lga("Ikeja Municipal")], ["Alausa", "Ward 1"])
+
+    def test_aliases_of_other_kinds_do_not_match(self):
+        LocationAlias.objects.create(kind="city", object_id=State.objects.get(name="Oyo").pk, alias="Pacesetter")
+        self.assertIsNone(utils.get_state_by_name("Pacesetter"))
+
+    def test_reload_adds_aliases(self):
+        records = [dict(r, aliases=["Eko"]) if r.get("name") == "Lagos" else r for r in RECORDS]
+        BulkLoader().load(records)
+        aliases = LocationAlias.objects.filter(kind="state").values_list("alias", flat=True)
+        self.assertEqual(list(aliases), ["Eko", "Lasgidi"])
+
+    def test_folded_names_are_stored_as_aliases(self):
+        BulkLoader().load([{"type": "lga", "state": "Oyo", "name": "Ogbomosho-North"}])
+        lga = LGA.objects.get(name="Ogbomosho-North")
+        self.assertEqual(utils.get_lga_by_name("ogbomosho north"), lga)
+
+    def test_prune_aliases(self):
+        ward = Ward.objects.get(name="Alausa")
+        LocationAlias.objects.create(kind="ward", object_id=ward.pk, alias="Alausa Secretariat")
+        ward.delete()
+        self.assertEqual(prune_aliases(), 1)
+        self.assertFalse(LocationAlias.objects.filter(kind="ward").exists())
+        self.assertTrue(LocationAlias.objects.filter(kind="state").exists())
@@ -0,0 +1,68 @@
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+
+from .. import utils
+from ..index import get_index
+from . import LocationsTestCase
+
+
+@override_settings(NG_LOCATIONS_USE_INDEX=True)
+class IndexedAsyncTests(LocationsTestCase):
+    def test_warm_index_answers_without_queries(self):
+        get_index()
+        with self.assertNumQueries(0):
+            states = async_to_sync(utils.aget_states_by_zone)("South West")
+            lgas = async_to_sync(utils.aget_lgas_by_state)("Lagos")
+            zone_lgas = async_to_sync(utils.aget_lgas_by_zone)("South West")
+            self.assertEqual([str(lga) for lga in lgas], ["Alimosho, Lagos", "Eti-Osa, Lagos", "Ikeja, Lagos"])
+        self.assertEqual([state.name for state in states], ["Lagos", "Oyo"])
+        self.assertEqual([lga.name for lga in zone_lgas], [lga.name for lga in utils.get_lgas_by_zone("South West")])
+        self.assertEqual(async_to_sync(utils.aget_lgas_by_zone)("Atlantis"), [])
+
+    def test_matches_the_database(self):
+        with override_settings(NG_LOCATIONS_USE_INDEX=False):
+            expected = [lga.pk for lga in async_to_sync(utils.aget_lgas_by_zone)("South West")]
+        self.assertEqual([lga.pk for lga in async_to_sync(utils.aget_lgas_by_zone)("South West")], expected)
+
+
+class AsyncLookupTests(LocationsTestCase):
+    def test_variants_match_the_sync_functions(self):
+        calls = [
+            ("get_all_zones", ()),
+            ("get_zone_by_name", ("South West",)),
+            ("get_zone_by_code", ("north_central",)),
+            ("get_states_by_zone", ("South West",)),
+            ("get_state_by_name", ("Lasgidi",)),
+            ("get_state_by_code", ("OY",)),
+            ("get_lgas_by_state", ("Lagos",)),
+            ("get_lgas_by_zone", ("South West",)),
+            ("get_lga_by_name", ("Ikeja", "Lagos")),
+            ("get_cities_by_lga", ("Ikeja", "Lagos")),
+            ("get_cities_by_state", ("Lagos",)),
+            ("get_city_by_name", ("Ibadan", "Oyo")),
+            ("get_wards_by_lga", ("Ibadan North", "Oyo")),
+            ("get_wards_by_state", ("Lagos",)),
+            ("get_postal_code", ("100001",)),
+            ("get_postal_codes_by_prefix", ("10",)),
+            ("get_postal_codes_in_range", ("100000", "199999")),
+            ("get_postal_codes_by_lga", ("Ikeja", "Lagos")),
+            ("get_postal_codes_by_state", ("Lagos",)),
+            ("get_states_by_names", (["Lagos", "Atlantis"],)),
+            ("get_lgas_by_pairs", ([("Ikeja", "Lagos")],)),
+        ]
+        for name, args in calls:
+            with self.subTest(name=name):
+                expected = getattr(utils, name)(*args)
+                result = async_to_sync(getattr(utils, f"a{name}"))(*args)
+                if hasattr(expected, "model"):
+                    expected = list(expected)
+                self.assertEqual(result, expected)
+
+    def test_missing_objects(self):
+        self.assertIsNone(async_to_sync(utils.aget_state_by_name)("Atlantis"))
+        self.assertIsNone(async_to_sync(utils.aget_lga_by_name)("Ikeja", "Oyo"))
+        self.assertEqual(async_to_sync(utils.aget_lgas_by_state)("Atlantis"), [])
+
+    def test_search(self):
+        results = async_to_sync(utils.asearch_locations)("ibadan")
+        self.assertEqual([city.name for city in results["cities"]], ["Ibadan"])
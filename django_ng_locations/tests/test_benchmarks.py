@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from collections import Counter
+from contextlib import nullcontext
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+
+from .. import benchmarks
+from ..benchmarks import format_results, run_benchmarks, synthetic_records
+from ..cache import get_dataset_version
+from ..models import City, LGA, PostalCode
+from . import LocationsTestCase
+
+SIZES = {"cities": 20, "wards": 20, "postal_codes": 40}
+
+
+class BenchmarkTests(LocationsTestCase):
+    def test_synthetic_records_are_reproducible(self):
+        records = list(synthetic_records(seed=3, **SIZES))
+        self.assertEqual(records, list(synthetic_records(seed=3, **SIZES)))
+        self.assertNotEqual(records, list(synthetic_records(seed=4, **SIZES)))
+        counts = Counter(record["type"] for record in records)
+        self.assertEqual((counts["city"], counts["ward"], counts["postal_code"]), (20, 20, 40))
+
+    def test_run_rolls_back(self):
+        before = [model.objects.count() for model in (LGA, City, PostalCode)]
+        version = get_dataset_version()
+        results = run_benchmarks(iterations=1, sizes=SIZES, in_place=True)
+        self.assertEqual([model.objects.count() for model in (LGA, City, PostalCode)], before)
+        self.assertEqual(get_dataset_version(), version)
+
+        self.assertEqual(set(results), {"environment", "import", "load", "lookups", "search", "admin"})
+        self.assertEqual(results["environment"]["rows"]["postalcode"], 40)
+        self.assertEqual(results["lookups"]["get_state_by_name"]["cached"]["queries"], 0)
+        self.assertGreater(results["lookups"]["get_state_by_name"]["cold"]["queries"], 0)
+        self.assertEqual(set(results["search"]), {"index_build_us", "scan", "index"})
+        self.assertIn("lga", results["admin"])
+        self.assertTrue(format_results(results))
+
+    def test_import_phase(self):
+        results = run_benchmarks(phases=["import"], sizes=SIZES)
+        self.assertEqual(set(results), {"environment", "import"})
+        self.assertTrue(results["import"]["lazy"])
+        self.assertEqual(results["import"]["records"], sum(1 for _ in synthetic_records(**SIZES)))
+        self.assertEqual(set(results["import"]["build_data"]), {"ms", "peak_rss_mib"})
+        self.assertIn("Fixture module", "\n".join(format_results(results)))
+
+    def test_test_database_by_default(self):
+        # The tests already run in a test database, which must not be replaced
+        with mock.patch.object(benchmarks, "_test_database", return_value=nullcontext()) as test_database:
+            run_benchmarks(phases=["lookups"], iterations=1, sizes=SIZES)
+        test_database.assert_called_once_with()
+        with mock.patch.object(benchmarks, "_test_database") as test_database:
+            run_benchmarks(phases=["lookups"], iterations=1, sizes=SIZES, in_place=True)
+        test_database.assert_not_called()
+
+    def test_command(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+        call_command(
+            "benchmark_ng_locations", phase=["lookups"], iterations=1, cities=5, wards=5, postal_codes=5,
+            in_place=True, output=path, stdout=out, stderr=StringIO(),
+        )
+        self.assertIn("Lookups", out.getvalue())
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(set(json.load(f)), {"environment", "lookups"})
+        with self.assertRaisesMessage(CommandError, "--iterations"):
+            call_command("benchmark_ng_locations", iterations=0, stdout=StringIO())
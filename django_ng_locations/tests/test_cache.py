@@ -0,0 +1,61 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .. import cache
+from ..cache import bump_dataset_version, get_children, get_dataset_version
+from ..models import State, Zone
+from . import LocationsTestCase
+
+DUMMY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class DatasetVersionTests(LocationsTestCase):
+    def test_missing_version_is_seeded(self):
+        version = get_dataset_version()
+        self.assertIsInstance(version, int)
+        self.assertEqual(get_dataset_version(), version)
+
+    def test_bump_moves_to_a_newer_version(self):
+        version = get_dataset_version()
+        self.assertGreater(bump_dataset_version(), version)
+        self.assertGreater(get_dataset_version(), version)
+
+    def test_slices_follow_the_version(self):
+        lagos = State.objects.get(name="Lagos")
+        self.assertEqual([lga["name"] for lga in get_children("lgas", lagos.id)], ["Alimosho", "Eti-Osa", "Ikeja"])
+
+        lagos.lgas.filter(name="Alimosho").update(name="Agege")
+        with self.assertNumQueries(0):
+            self.assertIn("Alimosho", [lga["name"] for lga in get_children("lgas", lagos.id)])
+        bump_dataset_version()
+        self.assertIn("Agege", [lga["name"] for lga in get_children("lgas", lagos.id)])
+
+    def test_save_bumps_the_version_once_on_commit(self):
+        version = get_dataset_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for zone in Zone.objects.all():
+                zone.save()
+        self.assertEqual([callback for callback in callbacks if callback is bump_dataset_version], [bump_dataset_version])
+        self.assertGreater(get_dataset_version(), version)
+
+
+@override_settings(CACHES=DUMMY_CACHES)
+class DummyCacheTests(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, cache, "_local_version", cache._local_version)
+        cache._local_version = 0
+
+    def test_version_without_a_backend(self):
+        version = get_dataset_version()
+        self.assertIsInstance(version, int)
+        self.assertEqual(get_dataset_version(), version)
+        self.assertGreater(bump_dataset_version(), version)
+        self.assertGreater(get_dataset_version(), version)
+
+    def test_save_and_load(self):
+        call_command("load_ng_locations", stdout=StringIO())
+        with self.captureOnCommitCallbacks(execute=True):
+            Zone.objects.first().save()
+        self.assertEqual(Zone.objects.count(), 6)
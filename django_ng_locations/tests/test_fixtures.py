@@ -0,0 +1,54 @@
+import importlib
+import os
+import sys
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .. import fixtures
+from ..fixtures import nigeria_data
+from ..records import build_data, iter_records
+from . import RECORDS
+
+
+class FixtureTests(SimpleTestCase):
+    def test_import_reads_nothing(self):
+        sys.modules.pop(nigeria_data.__name__)
+        self.addCleanup(sys.modules.__setitem__, nigeria_data.__name__, nigeria_data)
+        self.addCleanup(setattr, fixtures, "nigeria_data", nigeria_data)
+        module = importlib.import_module(nigeria_data.__name__)
+        self.assertNotIn("NIGERIA_DATA", vars(module))
+        self.assertEqual(len(module.NIGERIA_DATA), 6)
+        self.assertIs(module.NIGERIA_DATA, vars(module)["NIGERIA_DATA"])
+
+    def test_import_does_not_decompress_the_data_file(self):
+        sys.modules.pop(nigeria_data.__name__)
+        self.addCleanup(sys.modules.__setitem__, nigeria_data.__name__, nigeria_data)
+        self.addCleanup(setattr, fixtures, "nigeria_data", nigeria_data)
+        with mock.patch("gzip.open", side_effect=AssertionError("the data file was read")) as gzip_open:
+            importlib.import_module(nigeria_data.__name__)
+        gzip_open.assert_not_called()
+
+    def test_level_iterators(self):
+        data = nigeria_data.load_data()
+        states = [state for zone in data.values() for state in zone["states"]]
+        self.assertEqual(sum(1 for _ in nigeria_data.iter_zones()), len(data))
+        self.assertEqual(sum(1 for _ in nigeria_data.iter_states()), len(states))
+        lagos = list(nigeria_data.iter_lgas(state="Lagos"))
+        self.assertTrue(lagos)
+        self.assertTrue(all(lga["state"] == "Lagos" for lga in lagos))
+
+    def test_write_and_load_round_trip(self):
+        data = build_data(RECORDS)
+        fd, path = tempfile.mkstemp(suffix=".ndjson.gz")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        self.assertEqual(nigeria_data.write_data(data, path), len(list(iter_records(data))))
+        with open(path, "rb") as f:
+            written = f.read()
+        self.assertEqual(nigeria_data.load_data(path), data)
+        # Identical data gives an identical file
+        nigeria_data.write_data(data, path)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), written)
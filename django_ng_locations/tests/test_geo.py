@@ -0,0 +1,140 @@
+import random
+from unittest import mock, skipUnless
+
+from django.test import SimpleTestCase
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .. import geo
+from ..geo import (
+    CityPoint, GeoIndex, cities_within, get_geo_index, haversine, nearest_cities, nearest_cities_batch,
+    state_for_point, states_for_points,
+)
+from ..index import StateEntry
+from ..models import City
+from . import LocationsTestCase
+
+
+def random_cities(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        CityPoint(n, n, f"City {n}", n % 5, f"City {n}", rng.uniform(4, 14), rng.uniform(2.5, 14.5))
+        for n in range(count)
+    ]
+
+
+class GeoIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.cities = random_cities(500)
+        self.index = GeoIndex(self.cities, [])
+
+    def brute_force(self, lat, lon):
+        return sorted((haversine(lat, lon, c.latitude, c.longitude), c.id) for c in self.cities)
+
+    def test_haversine(self):
+        # Lagos to Abuja
+        self.assertAlmostEqual(haversine(6.5244, 3.3792, 9.0765, 7.3986), 524, delta=2)
+        self.assertEqual(haversine(9, 7, 9, 7), 0)
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            lat, lon = rng.uniform(0, 18), rng.uniform(0, 18)
+            expected = self.brute_force(lat, lon)[:3]
+            found = [(match.distance_km, match.city.id) for match in self.index.nearest(lat, lon, k=3)]
+            self.assertEqual([pk for _, pk in found], [pk for _, pk in expected])
+
+    def test_within_matches_brute_force(self):
+        expected = [pk for distance, pk in self.brute_force(9, 8) if distance <= 150]
+        self.assertEqual([match.city.id for match in self.index.within(9, 8, 150)], expected)
+        self.assertEqual(self.index.within(9, 8, -1), [])
+
+    def test_far_away_points(self):
+        self.assertEqual(self.index.nearest(-60, -120)[0].city.id, self.brute_force(-60, -120)[0][1])
+
+    def test_invalid_coordinates(self):
+        for lat, lon in ((91, 0), (0, 181)):
+            with self.subTest(lat=lat, lon=lon), self.assertRaises(ValueError):
+                self.index.nearest(lat, lon)
+
+    def test_empty_index(self):
+        index = GeoIndex([], [])
+        self.assertEqual(index.nearest(9, 8), [])
+        self.assertEqual(index.within(9, 8, 100), [])
+        self.assertIsNone(index.state_for_point(9, 8))
+
+    def test_state_reference_points(self):
+        states = [StateEntry(n, 1, f"State {n}", f"S{n}", "", None, None) for n in range(5)]
+        states.append(StateEntry(7, 1, "Far", "FA", "", 40.0, 40.0))
+        index = GeoIndex(self.cities, states)
+        self.assertEqual(index.state_for_point(40.1, 40.1).id, 7)
+        self.assertEqual(index.state_for_point(9, 8).id, index.nearest(9, 8)[0].city.state_id)
+
+
+class GeoLookupTests(LocationsTestCase):
+    def test_nearest_cities(self):
+        matches = nearest_cities(6.45, 3.6, k=2)
+        self.assertEqual([match.city.name for match in matches], ["Lekki", "Ikeja"])
+        self.assertLess(matches[0].distance_km, 3)
+
+    def test_cities_within(self):
+        self.assertEqual([match.city.name for match in cities_within(7.0, 3.5, 100)], ["Ikeja", "Lekki", "Ibadan"])
+
+    def test_state_for_point(self):
+        self.assertEqual(state_for_point(8.5, 4.55).name, "Kwara")
+
+    def test_saves_drop_the_index(self):
+        get_geo_index()
+        city = City.objects.get(name="Ilorin")
+        city.latitude, city.longitude = 6.45, 3.6
+        city.save()
+        self.assertEqual(nearest_cities(6.45, 3.6)[0].city.name, "Ilorin")
+
+
+@skipUnless(numpy, "NumPy is not installed")
+class BatchTests(SimpleTestCase):
+    def setUp(self):
+        states = [StateEntry(n, 1, f"State {n}", f"S{n}", "", None, None) for n in range(5)]
+        states.append(StateEntry(7, 1, "Far", "FA", "", 40.0, 40.0))
+        self.index = GeoIndex(random_cities(500), states)
+        patcher = mock.patch.object(geo, "_index", self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rng = random.Random(2)
+        self.points = [(rng.uniform(0, 18), rng.uniform(0, 18)) for _ in range(200)] + [(40.1, 40.1)]
+
+    def test_nearest_matches_the_grid(self):
+        result = nearest_cities_batch(self.points, chunk_size=7)
+        for n, (lat, lon) in enumerate(self.points):
+            match = self.index.nearest(lat, lon)[0]
+            self.assertEqual(result.city_ids[n], match.city.id)
+            self.assertEqual(result.lga_ids[n], match.city.lga_id)
+            self.assertAlmostEqual(result.distances_km[n], match.distance_km, places=6)
+
+    def test_states_match_the_grid(self):
+        expected = [self.index.state_for_point(lat, lon).id for lat, lon in self.points]
+        self.assertEqual(states_for_points(numpy.array(self.points)).tolist(), expected)
+
+    def test_empty_input(self):
+        self.assertEqual(len(nearest_cities_batch([]).city_ids), 0)
+
+    def test_no_cities(self):
+        with mock.patch.object(geo, "_index", GeoIndex([], [])):
+            result = nearest_cities_batch([(9, 8)])
+        self.assertEqual(result.city_ids.tolist(), [-1])
+        self.assertEqual(result.distances_km.tolist(), [float("inf")])
+
+    def test_invalid_points(self):
+        for points in ([(9, 8, 1)], [(95, 8)], [(float("nan"), 8)]):
+            with self.subTest(points=points), self.assertRaises(ValueError):
+                nearest_cities_batch(points)
+
+
+class BatchWithoutNumPyTests(SimpleTestCase):
+    def test_import_error(self):
+        with mock.patch.dict("sys.modules", {"numpy": None}):
+            with self.assertRaisesMessage(ImportError, "pip install django-ng-locations[numpy]"):
+                nearest_cities_batch([(9, 8)])
@@ -0,0 +1,82 @@
+from django.test import override_settings
+
+from .. import utils
+from ..geo import nearest_cities
+from .. import index
+from ..index import HierarchyIndex, get_index
+from ..models import LGA, LocationAlias, State, Zone
+from . import LocationsTestCase
+
+
+class HierarchyIndexTests(LocationsTestCase):
+    def setUp(self):
+        super().setUp()
+        LocationAlias.objects.create(kind="lga", object_id=LGA.objects.get(name="Eti-Osa").pk, alias="Victoria Island")
+        with self.assertNumQueries(4):
+            self.index = HierarchyIndex.build()
+
+    def test_lookups_fold_case(self):
+        self.assertEqual(self.index.zone_by_name("south WEST").code, "south_west")
+        self.assertEqual(self.index.zone_by_code("SOUTH_WEST").name, "South West")
+        self.assertEqual(self.index.state_by_code("la").name, "Lagos")
+        self.assertIsNone(self.index.state_by_name("Atlantis"))
+
+    def test_aliases(self):
+        self.assertEqual(self.index.state_by_name("lasgidi").name, "Lagos")
+        self.assertEqual([lga.name for lga in self.index.lgas_named("victoria island", "Lagos")], ["Eti-Osa"])
+        self.assertEqual(self.index.lgas_named("Victoria Island", "Oyo"), ())
+
+    def test_children_are_sorted_by_name(self):
+        lagos = self.index.state_by_name("Lagos")
+        self.assertEqual([lga.name for lga in self.index.lgas_in_state(lagos.id)], ["Alimosho", "Eti-Osa", "Ikeja"])
+        zone = self.index.zone_by_name("South West")
+        self.assertEqual([state.name for state in self.index.states_in_zone(zone.id)], ["Lagos", "Oyo"])
+
+    def test_entries_become_models(self):
+        state = self.index.state_by_name("Lagos").to_model()
+        self.assertEqual(state, State.objects.get(name="Lagos"))
+        self.assertEqual((state.capital, state.latitude), ("Ikeja", 6.5244))
+        self.assertFalse(state._state.adding)
+
+
+@override_settings(NG_LOCATIONS_USE_INDEX=True)
+class IndexedLookupTests(LocationsTestCase):
+    def test_warm_lookups_run_no_queries(self):
+        get_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(utils.get_zone_by_code("south_west").name, "South West")
+            self.assertEqual(utils.get_state_by_name("Lasgidi").name, "Lagos")
+            self.assertIsNone(utils.get_lga_by_name("Ikeja", "Oyo"))
+
+    def test_matches_the_database(self):
+        for func, args in (
+            (utils.get_states_by_zone, ("South West",)),
+            (utils.get_lgas_by_state, ("Lagos",)),
+            (utils.get_lgas_by_zone, ("South West",)),
+        ):
+            with self.subTest(func=func.__name__):
+                indexed = list(func(*args))
+                with override_settings(NG_LOCATIONS_USE_INDEX=False):
+                    self.assertEqual(indexed, list(func(*args)))
+
+    def test_saves_drop_the_index(self):
+        get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            Zone.objects.get(name="South West").save()
+        self.assertIsNone(index._index)
+
+
+@override_settings(NG_LOCATIONS_USE_INDEX=True)
+class IndexedModelTests(LocationsTestCase):
+    def test_indexed_lga_renders_without_queries(self):
+        get_index()
+        with self.assertNumQueries(0):
+            lga = utils.get_lga_by_name("Ikeja", "Lagos")
+            self.assertEqual(str(lga), "Ikeja, Lagos")
+
+    def test_nearest_city_renders_without_queries(self):
+        nearest_cities(6.6, 3.35)
+        with self.assertNumQueries(0):
+            city = nearest_cities(6.6, 3.35)[0].city.to_model()
+            self.assertEqual(str(city), "Ikeja, Lagos")
+        self.assertEqual((city.name, city.state_id), ("Ikeja", State.objects.get(name="Lagos").id))
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+
+from .. import instrumentation, utils
+from ..index import get_index
+from ..instrumentation import collect, lookup_finished
+from ..models import State
+from . import LocationsTestCase
+
+
+class InstrumentationTests(LocationsTestCase):
+    def test_disabled_by_default(self):
+        self.assertFalse(instrumentation.is_enabled())
+        with collect():
+            self.assertTrue(instrumentation.is_enabled())
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_lookup_calls_and_queries(self):
+        with collect() as metrics:
+            utils.get_state_by_name("Lagos")
+            utils.get_state_by_name("Atlantis")
+        self.assertEqual(metrics.count("lookup.calls", function="get_state_by_name"), 2)
+        self.assertEqual(metrics.count("lookup.queries", function="get_state_by_name"), 2)
+        self.assertEqual(len(metrics.durations("lookup.duration", function="get_state_by_name")), 2)
+
+    def test_returned_querysets_are_counted_when_evaluated(self):
+        with collect() as metrics:
+            lgas = utils.get_lgas_by_state("Lagos")
+            self.assertEqual(metrics.count("lookup.queries", function="get_lgas_by_state"), 0)
+            with self.assertNumQueries(1):
+                list(lgas)
+            self.assertEqual(metrics.count("lookup.queries", function="get_lgas_by_state"), 0)
+            async_to_sync(utils.aget_lgas_by_state)("Lagos")
+        self.assertEqual(metrics.count("lookup.queries", function="aget_lgas_by_state"), 1)
+
+    def test_nested_calls_are_part_of_the_outer_one(self):
+        with collect() as metrics:
+            utils.get_lgas_by_pairs([("Ikeja", "Lagos")])
+        functions = {dict(key[1])["function"] for key in metrics.counters if key[0] == "lookup.calls"}
+        self.assertEqual(functions, {"get_lgas_by_pairs"})
+
+    def test_errors_are_counted_and_raised(self):
+        with mock.patch.object(State.objects, "get", side_effect=RuntimeError):
+            with collect() as metrics, self.assertRaises(RuntimeError):
+                utils.get_state_by_name("Lagos")
+        self.assertEqual(metrics.count("lookup.errors", function="get_state_by_name"), 1)
+
+    @override_settings(NG_LOCATIONS_USE_INDEX=True)
+    def test_cache_hits_and_misses(self):
+        with collect() as metrics:
+            get_index()
+            get_index()
+        self.assertEqual(metrics.count("cache.misses", cache="index"), 1)
+        self.assertEqual(metrics.count("cache.hits", cache="index"), 1)
+
+    def test_signal(self):
+        received = []
+        receiver = lambda sender, **kwargs: received.append((sender, kwargs["queries"]))  # noqa: E731
+        lookup_finished.connect(receiver)
+        self.addCleanup(lookup_finished.disconnect, receiver)
+        with collect():
+            utils.get_zone_by_name("South West")
+        self.assertEqual(received, [("get_zone_by_name", 1)])
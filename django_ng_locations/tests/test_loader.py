@@ -0,0 +1,394 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import skipIf, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Address
+
+from ..loader import (
+    BulkLoader, CopyLoader, LoadError, SyncCopyLoader, SyncLoader, clear_locations, copy_rows, iter_json_records,
+    read_source,
+)
+from ..models import City, LGA, LocationAlias, PostalCode, State, SubtreeDigest, Ward, Zone
+from . import RECORDS, LocationsTestCase
+
+# Loaded through --data by the fixture format tests
+NESTED_DATA = {
+    "North West": {
+        "code": "north_west",
+        "states": {
+            "Kano": {
+                "code": "KN",
+                "capital": "Kano",
+                "lgas": {
+                    "Dala": {
+                        "cities": [{"name": "Kano", "is_capital": True}, "Dala"],
+                        "wards": ["Adakawa", {"name": "Bakin Ruwa", "code": "KN/DAL/02"}],
+                        "postal_codes": [{"code": "700001", "area": "Dala", "city": "Dala"}, "700002"],
+                    },
+                    "Fagge": {"cities": [], "wards": [], "postal_codes": []},
+                },
+            },
+        },
+    },
+}
+FLAT_DATA = {
+    "North West": {
+        "code": "north_west",
+        "states": {"Kano": {"code": "KN", "capital": "Kano", "lgas": ["Dala", "Fagge"]}},
+    },
+}
+
+
+def write_ndjson(records) -> str:
+    fd, path = tempfile.mkstemp(suffix=".ndjson")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return path
+
+
+def write_file(content: str, suffix: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+class ClearTests(LocationsTestCase):
+    def test_clear(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            deleted = clear_locations()
+        self.assertEqual(len(callbacks), len(set(callbacks)))
+        self.assertEqual(deleted, {"zone": 2, "state": 3, "lga": 6, "city": 4, "ward": 4, "postal_code": 5})
+        for model in (Zone, State, LGA, City, Ward, PostalCode, LocationAlias, SubtreeDigest):
+            self.assertFalse(model.objects.exists())
+
+    def test_foreign_keys_of_other_apps(self):
+        set_null = Address.objects.create(street="1 Obafemi Awolowo Way", lga=LGA.objects.get(name="Ikeja"))
+        cascade = Address.objects.create(street="Alausa Secretariat", ward=Ward.objects.get(name="Alausa"))
+        call_command("load_ng_locations", clear=True, data=f"{__name__}.NESTED_DATA", stdout=StringIO())
+        set_null.refresh_from_db()
+        self.assertIsNone(set_null.lga_id)
+        self.assertFalse(Address.objects.filter(pk=cascade.pk).exists())
+
+    def test_failed_load_keeps_the_cleared_data(self):
+        path = write_ndjson([{"type": "lga", "state": "Atlantis", "name": "Nowhere"}])
+        self.addCleanup(os.remove, path)
+        with self.assertRaisesMessage(CommandError, "unknown parent"):
+            call_command("load_ng_locations", clear=True, source=path, stdout=StringIO())
+        self.assertEqual(LGA.objects.count(), 6)
+        self.assertEqual(PostalCode.objects.count(), 5)
+
+    def test_signal_callbacks_are_scheduled_once_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            PostalCode.objects.all().delete()
+            Ward.objects.all().delete()
+        self.assertEqual(len(callbacks), len(set(callbacks)))
+
+
+class SyncTests(LocationsTestCase):
+    def test_unchanged_data_is_skipped(self):
+        first = SyncLoader().load(RECORDS)
+        self.assertEqual(first.unchanged_states, 0)
+        with CaptureQueriesContext(connection) as queries:
+            second = SyncLoader().load(RECORDS)
+        self.assertEqual(second.unchanged_states, 3)
+        self.assertEqual(sum(second.created.values()) + sum(second.updated.values()), 0)
+        self.assertFalse([q for q in queries if q["sql"].startswith(("INSERT", "UPDATE"))])
+
+    def test_only_changed_subtrees_are_written(self):
+        SyncLoader().load(RECORDS)
+        records = [dict(r, code="LA/IKJ/99") if r.get("name") == "Alausa" else r for r in RECORDS]
+        loader = SyncLoader().load(records)
+        self.assertEqual(loader.unchanged_states, 2)
+        self.assertEqual(loader.updated["ward"], 1)
+        self.assertEqual(loader.updated["city"] + loader.updated["postal_code"], 0)
+        self.assertEqual(Ward.objects.get(name="Alausa").code, "LA/IKJ/99")
+        self.assertEqual(SubtreeDigest.objects.filter(scope=SubtreeDigest.SCOPE_STATE).count(), 3)
+
+    def test_incomplete_data(self):
+        with self.assertRaisesMessage(LoadError, "which is not in the dataset"):
+            SyncLoader().load([{"type": "lga", "state": "Atlantis", "name": "Nowhere"}])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("load_ng_locations", sync=True, data=f"{__name__}.FLAT_DATA", stdout=out)
+        self.assertFalse(State.objects.filter(name="Lagos").exists())
+        self.assertEqual(list(LGA.objects.values_list("name", flat=True)), ["Dala", "Fagge"])
+
+
+class SyncDeleteTests(LocationsTestCase):
+    def sync(self, records):
+        return SyncLoader().load(records)
+
+    def test_sync_deletes_what_is_no_longer_in_the_data(self):
+        self.sync(RECORDS)
+        records = [
+            r for r in RECORDS
+            if r.get("state") != "Kwara" and r.get("name") != "Kwara" and r.get("name") != "Eti-Osa"
+            and r.get("lga") != "Eti-Osa" and r.get("name") != "Ikeja"
+        ]
+        records.append({"type": "lga", "state": "Lagos", "name": "Ikeja"})
+        records = [{k: v for k, v in r.items() if k != "city"} for r in records]
+        with self.captureOnCommitCallbacks() as callbacks:
+            loader = self.sync(records)
+        self.assertEqual(len(callbacks), len(set(callbacks)))
+
+        self.assertEqual(loader.deleted["state"], 1)
+        self.assertEqual(loader.deleted["lga"], 2)
+        self.assertEqual(loader.deleted["city"], 3)
+        self.assertEqual(loader.deleted["postal_code"], 2)
+        self.assertEqual(loader.deleted["zone"], 0)
+        self.assertFalse(State.objects.filter(name="Kwara").exists())
+        self.assertFalse(City.objects.filter(name__in=["Ilorin", "Lekki", "Ikeja"]).exists())
+        # The postal code of the deleted city Ikeja stays, without its city
+        self.assertIsNone(PostalCode.objects.get(code="100001").city_id)
+
+    def test_sync_deletes_zones(self):
+        self.sync(RECORDS)
+        records = [
+            r for r in RECORDS
+            if r.get("name") not in ("North Central", "Kwara") and r.get("state") != "Kwara"
+        ]
+        loader = self.sync(records)
+        self.assertEqual(loader.deleted["zone"], 1)
+        self.assertEqual(list(Zone.objects.values_list("name", flat=True)), ["South West"])
+
+    def test_foreign_keys_of_other_apps(self):
+        self.sync(RECORDS)
+        set_null = Address.objects.create(street="Kwara State Secretariat", lga=LGA.objects.get(name="Ilorin West"))
+        cascade = Address.objects.create(street="Alausa Secretariat", ward=Ward.objects.get(name="Alausa"))
+        self.sync([r for r in RECORDS if r.get("name") not in ("Kwara", "Alausa") and r.get("state") != "Kwara"])
+        set_null.refresh_from_db()
+        self.assertIsNone(set_null.lga_id)
+        self.assertFalse(Address.objects.filter(pk=cascade.pk).exists())
+
+
+class BulkLoaderTests(LocationsTestCase):
+    def zone_records(self, zone, state, lgas):
+        return [
+            {"type": "zone", "name": zone, "code": "".join(word[0] for word in zone.split())},
+            {"type": "state", "zone": zone, "name": state, "code": state[:2].upper()},
+        ] + [{"type": "lga", "state": state, "name": f"LGA {n}"} for n in range(lgas)]
+
+    def test_query_count_does_not_depend_on_the_rows(self):
+        with CaptureQueriesContext(connection) as few:
+            BulkLoader().load(self.zone_records("North West", "Kano", 3))
+        with CaptureQueriesContext(connection) as many:
+            BulkLoader().load(self.zone_records("North East", "Borno", 200))
+        self.assertEqual(len(many), len(few))
+
+    def test_reload_updates_in_place(self):
+        loader = BulkLoader().load(RECORDS)
+        self.assertEqual(sum(loader.created.values()), 0)
+        self.assertEqual(LGA.objects.count(), 6)
+        records = [dict(r, capital="Alausa") if r.get("name") == "Lagos" else r for r in RECORDS]
+        loader = BulkLoader().load(records)
+        self.assertEqual(loader.updated["state"], 1)
+        self.assertEqual(State.objects.get(name="Lagos").capital, "Alausa")
+
+    def test_unknown_parent(self):
+        with self.assertRaisesMessage(LoadError, "unknown parent"):
+            BulkLoader().load([{"type": "lga", "state": "Atlantis", "name": "Nowhere"}])
+
+
+class FixtureFormatTests(LocationsTestCase):
+    def load(self, name):
+        call_command("load_ng_locations", data=f"{__name__}.{name}", stdout=StringIO())
+
+    def test_nested_format_loads_every_level(self):
+        self.load("NESTED_DATA")
+        dala = LGA.objects.get(name="Dala")
+        self.assertEqual(dala.state.zone.name, "North West")
+        self.assertEqual(sorted(dala.cities.values_list("name", "is_capital")), [("Dala", False), ("Kano", True)])
+        self.assertEqual(Ward.objects.get(name="Bakin Ruwa").code, "KN/DAL/02")
+        self.assertEqual(PostalCode.objects.get(code="700001").city.name, "Dala")
+        self.assertIsNone(PostalCode.objects.get(code="700002").city)
+        self.assertFalse(LGA.objects.get(name="Fagge").cities.exists())
+
+    def test_flat_format(self):
+        self.load("FLAT_DATA")
+        self.assertEqual(sorted(LGA.objects.filter(state__name="Kano").values_list("name", flat=True)), ["Dala", "Fagge"])
+
+    def test_reload_is_idempotent(self):
+        self.load("NESTED_DATA")
+        counts = [model.objects.count() for model in (City, Ward, PostalCode)]
+        self.load("NESTED_DATA")
+        self.assertEqual([model.objects.count() for model in (City, Ward, PostalCode)], counts)
+
+    def test_bad_data_path(self):
+        with self.assertRaisesMessage(CommandError, "Cannot import location data"):
+            self.load("MISSING_DATA")
+
+
+class SourceTests(LocationsTestCase):
+    def load(self, path, **options):
+        call_command("load_ng_locations", source=path, stdout=StringIO(), **options)
+
+    def test_missing_source(self):
+        for path in ("missing.ndjson", "missing.csv"):
+            with self.subTest(path=path), self.assertRaisesMessage(CommandError, "Source file not found"):
+                self.load(path)
+
+    def test_unsupported_source(self):
+        path = write_file("", ".csv")
+        self.addCleanup(os.remove, path)
+        with self.assertRaisesMessage(CommandError, "Unsupported source file"):
+            self.load(path)
+
+    def test_sources_load_like_the_data(self):
+        for path in (write_ndjson(RECORDS), write_file(json.dumps(RECORDS), ".json")):
+            self.addCleanup(os.remove, path)
+            with self.subTest(path=path):
+                self.load(path, clear=True)
+                self.assertEqual(LGA.objects.count(), 6)
+                self.assertEqual(PostalCode.objects.get(code="100001").city.name, "Ikeja")
+
+    def test_invalid_line_is_reported_with_its_number(self):
+        path = write_file(json.dumps(RECORDS[0]) + "\n\n{oops\n", ".ndjson")
+        self.addCleanup(os.remove, path)
+        with self.assertRaisesMessage(CommandError, f"{path}:3: invalid JSON"):
+            self.load(path)
+
+
+class StreamingJSONTests(SimpleTestCase):
+    def read(self, content, chunk_size=7):
+        path = write_file(content, ".json")
+        self.addCleanup(os.remove, path)
+        return list(iter_json_records(path, chunk_size=chunk_size))
+
+    def test_array_split_across_chunks(self):
+        self.assertEqual(self.read(json.dumps(RECORDS, indent=2)), RECORDS)
+        self.assertEqual(self.read(" [ ] "), [])
+
+    def test_dataset_object(self):
+        self.assertEqual(self.read(json.dumps(NESTED_DATA))[:2], [
+            {"type": "zone", "name": "North West", "code": "north_west"},
+            {"type": "state", "zone": "North West", "name": "Kano", "code": "KN", "capital": "Kano"},
+        ])
+
+    def test_errors(self):
+        for content, message in (
+            ('"records"', "expected a JSON array"),
+            ('[{"type": "zone"}, {oops}]', "invalid JSON"),
+            ('[{"type": "zone"}', "unexpected end of file"),
+        ):
+            with self.subTest(content=content), self.assertRaisesMessage(LoadError, message):
+                self.read(content)
+
+    def test_read_source_is_lazy(self):
+        records = read_source("missing.ndjson")
+        with self.assertRaises(FileNotFoundError):
+            next(records)
+
+
+@skipIf(connection.vendor == "postgresql", "COPY is supported")
+class CopyEngineTests(LocationsTestCase):
+    def test_falls_back_to_bulk_inserts(self):
+        self.assertFalse(CopyLoader.supports())
+        with self.assertRaisesMessage(LoadError, "COPY loading needs PostgreSQL"):
+            CopyLoader().load(RECORDS)
+
+        out = StringIO()
+        call_command("load_ng_locations", engine="copy", data=f"{__name__}.NESTED_DATA", stdout=out)
+        self.assertIn("The copy engine needs PostgreSQL; using batched inserts on sqlite.", out.getvalue())
+        self.assertEqual(Ward.objects.filter(lga__name="Dala").count(), 2)
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY needs PostgreSQL")
+class PostgreSQLCopyTests(LocationsTestCase):
+    def table(self, model, *fields):
+        return sorted(model.objects.values_list(*fields))
+
+    def test_loads_like_the_bulk_loader(self):
+        fields = {
+            City: ("lga__name", "name", "state__name", "zone__name", "full_name", "is_capital", "latitude"),
+            Ward: ("lga__name", "name", "state__name", "zone__name", "full_name", "code"),
+            PostalCode: ("code", "lga__name", "city__name", "state__name", "full_name", "area"),
+        }
+        expected = {model: self.table(model, *names) for model, names in fields.items()}
+        clear_locations()
+        loader = CopyLoader().load(RECORDS)
+        self.assertEqual((loader.created["city"], loader.created["ward"], loader.created["postal_code"]), (4, 4, 5))
+        for model, names in fields.items():
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self.table(model, *names), expected[model])
+
+    def test_merge_counts_created_and_updated_rows(self):
+        records = [dict(r, code="LA/IKJ/99") if r.get("name") == "Alausa" else r for r in RECORDS]
+        records.append({"type": "ward", "state": "Oyo", "lga": "Ibadan North", "name": "Ward 3"})
+        loader = CopyLoader().load(records)
+        self.assertEqual((loader.created["ward"], loader.updated["ward"]), (1, 1))
+        # Unchanged rows are neither rewritten nor counted
+        self.assertEqual(loader.updated["city"] + loader.updated["postal_code"], 0)
+        self.assertEqual(Ward.objects.get(name="Alausa").code, "LA/IKJ/99")
+
+    def test_fields_missing_from_records_keep_their_value(self):
+        records = [
+            {k: v for k, v in r.items() if k != "code"} if r["type"] == "ward" else r for r in RECORDS
+        ]
+        CopyLoader().load(records)
+        self.assertEqual(Ward.objects.get(name="Alausa").code, "LA/IKJ/01")
+
+    def test_text_is_escaped(self):
+        name = "Tab\tLine\nBack\\slash"
+        CopyLoader().load([{"type": "ward", "state": "Lagos", "lga": "Ikeja", "name": name, "code": "\\N"}])
+        self.assertEqual(Ward.objects.get(name=name).code, "\\N")
+
+    def test_sync(self):
+        SyncCopyLoader().load(RECORDS)
+        records = [
+            {k: v for k, v in r.items() if k != "city"} for r in RECORDS
+            if not (r["type"] == "city" and r["name"] == "Ikeja")
+        ]
+        loader = SyncCopyLoader().load(records)
+        self.assertEqual(loader.deleted["city"], 1)
+        self.assertIsNone(PostalCode.objects.get(code="100001").city_id)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("load_ng_locations", engine="copy", data=f"{__name__}.NESTED_DATA", stdout=out)
+        self.assertNotIn("needs PostgreSQL", out.getvalue())
+        self.assertEqual(PostalCode.objects.get(code="700001").city.name, "Dala")
+
+    def test_copy_rows_with_the_installed_driver(self):
+        rows = [[1, "Ward\t1", None], [2, "Line\nbreak\\", ""]]
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE ng_copy_rows (id integer, name text, code text)")
+            copy_rows(cursor, "COPY ng_copy_rows (id, name, code) FROM STDIN", rows)
+            cursor.execute("SELECT id, name, code FROM ng_copy_rows ORDER BY id")
+            self.assertEqual([list(row) for row in cursor.fetchall()], rows)
+
+
+class CopyRowsTests(SimpleTestCase):
+    rows = [[1, "Ward\t1", None, True], [2, "Line\nbreak\\", "", False]]
+
+    def test_psycopg2(self):
+        copied = []
+        raw = SimpleNamespace(copy_expert=lambda sql, buffer: copied.append((sql, buffer.read())))
+        copy_rows(SimpleNamespace(cursor=raw), "COPY t FROM STDIN", self.rows)
+        self.assertEqual(copied, [(
+            "COPY t FROM STDIN",
+            "1\tWard\\t1\t\\N\tt\n2\tLine\\nbreak\\\\\t\tf\n",
+        )])
+
+    def test_psycopg(self):
+        written = []
+
+        class Copy:
+            def __enter__(self):
+                return SimpleNamespace(write_row=written.append)
+
+            def __exit__(self, *exc_info):
+                return False
+
+        copy_rows(SimpleNamespace(cursor=SimpleNamespace(copy=lambda sql: Copy())), "COPY t FROM STDIN", self.rows)
+        self.assertEqual(written, self.rows)
@@ -0,0 +1,55 @@
+from ..models import City, LGA, PostalCode, State, Ward, Zone
+from . import LocationsTestCase
+
+
+class DenormalizationTests(LocationsTestCase):
+    def test_loaded_rows(self):
+        ward = Ward.objects.get(name="Alausa")
+        self.assertEqual(ward.full_name, "Alausa (Ikeja, Lagos)")
+        self.assertEqual((ward.state.name, ward.zone.name), ("Lagos", "South West"))
+        self.assertEqual(LGA.objects.get(name="Ikeja").full_name, "Ikeja, Lagos")
+        self.assertEqual(PostalCode.objects.get(code="240001").full_name, "240001 - Ilorin West")
+
+    def test_str_needs_no_query(self):
+        ward = Ward.objects.get(name="Alausa")
+        with self.assertNumQueries(0):
+            self.assertEqual(str(ward), "Alausa (Ikeja, Lagos)")
+
+    def test_new_rows(self):
+        ward = Ward.objects.create(lga=LGA.objects.get(name="Eti-Osa"), name="Lekki I")
+        self.assertEqual(ward.full_name, "Lekki I (Eti-Osa, Lagos)")
+        self.assertEqual(ward.state, State.objects.get(name="Lagos"))
+
+    def test_renames_cascade(self):
+        state = State.objects.get(name="Lagos")
+        state.name = "Eko"
+        state.save()
+        self.assertEqual(LGA.objects.get(name="Ikeja").full_name, "Ikeja, Eko")
+        self.assertEqual(City.objects.get(name="Lekki").full_name, "Lekki, Eko")
+        self.assertEqual(Ward.objects.get(name="Alausa").full_name, "Alausa (Ikeja, Eko)")
+
+        lga = LGA.objects.get(name="Ikeja")
+        lga.name = "Ikeja Central"
+        lga.save()
+        self.assertEqual(Ward.objects.get(name="Alausa").full_name, "Alausa (Ikeja Central, Eko)")
+        self.assertEqual(PostalCode.objects.get(code="100001").full_name, "100001 - Ikeja GRA")
+        self.assertEqual(PostalCode.objects.get(code="100271").full_name, "100271 - Alausa")
+
+    def test_moves_cascade(self):
+        lga = LGA.objects.get(name="Ilorin West")
+        lga.state = State.objects.get(name="Oyo")
+        lga.save()
+        city = City.objects.get(name="Ilorin")
+        self.assertEqual((city.state.name, city.zone.name), ("Oyo", "South West"))
+        self.assertEqual(city.full_name, "Ilorin, Oyo")
+
+        state = State.objects.get(name="Oyo")
+        state.zone = Zone.objects.get(name="North Central")
+        state.save()
+        self.assertEqual(PostalCode.objects.get(code="240001").zone.name, "North Central")
+
+    def test_unrelated_saves_do_not_cascade(self):
+        state = State.objects.get(name="Lagos")
+        state.capital = "Alausa"
+        with self.assertNumQueries(2):
+            state.save()
@@ -0,0 +1,86 @@
+from django.test import SimpleTestCase, override_settings
+
+from .. import utils
+from ..models import PostalCode
+from ..postal import (
+    PostalCodeEntry, PostalCodeIndex, get_postal_index, normalize_code, prefix_bounds, validate_postal_code,
+    validate_postal_codes,
+)
+from . import LocationsTestCase
+
+
+def entry(code):
+    return PostalCodeEntry(int(code), code, 1, None, "", None, None, code)
+
+
+class PostalCodeIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = PostalCodeIndex(entry(code) for code in ("200001", "100001", "100211", "100242", "101001"))
+
+    def codes(self, entries):
+        return [e.code for e in entries]
+
+    def test_helpers(self):
+        self.assertEqual(normalize_code(" 100 001\t"), "100001")
+        self.assertEqual(prefix_bounds("1002"), ("1002", "1003"))
+        self.assertEqual(prefix_bounds("1009"), ("1009", "100:"))
+        self.assertEqual(prefix_bounds(""), ("", None))
+
+    def test_get(self):
+        self.assertEqual(self.index.get("100 211").code, "100211")
+        self.assertIsNone(self.index.get("100212"))
+        self.assertIn("200001", self.index)
+        self.assertEqual(len(self.index), 5)
+
+    def test_prefix(self):
+        self.assertEqual(self.codes(self.index.with_prefix("1002")), ["100211", "100242"])
+        self.assertEqual(self.codes(self.index.with_prefix("10", limit=2)), ["100001", "100211"])
+        self.assertEqual(len(self.index.with_prefix("")), 5)
+        self.assertEqual(self.index.with_prefix("3"), [])
+
+    def test_range(self):
+        self.assertEqual(self.codes(self.index.in_range("100211", "101001")), ["100211", "100242", "101001"])
+        self.assertEqual(self.index.in_range("200002", "100000"), [])
+
+    def test_validate_many(self):
+        found, missing = self.index.validate_many(["100 001", "999999", "200001", "000000"])
+        self.assertEqual({code: e.code for code, e in found.items()}, {"100 001": "100001", "200001": "200001"})
+        self.assertEqual(missing, ["999999", "000000"])
+
+
+class PostalLookupTests(LocationsTestCase):
+    def test_index_matches_the_database(self):
+        index = get_postal_index()
+        for prefix in ("", "1", "10", "100", "2", "9"):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(
+                    [e.code for e in index.with_prefix(prefix)],
+                    [p.code for p in utils.get_postal_codes_by_prefix(prefix)],
+                )
+        self.assertEqual(
+            [e.code for e in index.in_range("100001", "200001")],
+            [p.code for p in utils.get_postal_codes_in_range("100001", "200001")],
+        )
+
+    def test_entries_carry_the_hierarchy(self):
+        postal_code = PostalCode.objects.get(code="100001")
+        entry = validate_postal_code("100001")
+        self.assertEqual(
+            (entry.lga_id, entry.city_id, entry.state_id, entry.zone_id),
+            (postal_code.lga_id, postal_code.city_id, postal_code.state_id, postal_code.zone_id),
+        )
+        self.assertEqual(entry.to_model(), postal_code)
+        self.assertEqual(validate_postal_codes(["240001", "1"])[1], ["1"])
+
+    @override_settings(NG_LOCATIONS_USE_POSTAL_INDEX=True)
+    def test_warm_index_answers_without_queries(self):
+        get_postal_index()
+        with self.assertNumQueries(0):
+            postal_code = utils.get_postal_code("106 104")
+            self.assertEqual(str(postal_code), "106104 - Lekki Phase 1")
+            self.assertEqual(list(utils.get_postal_codes_bulk(["100001", "000000"]).missing), ["000000"])
+
+    def test_saves_drop_the_index(self):
+        get_postal_index()
+        PostalCode.objects.create(lga=PostalCode.objects.get(code="100001").lga, code="100002")
+        self.assertIsNotNone(validate_postal_code("100002"))
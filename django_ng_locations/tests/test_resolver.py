@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase
+
+from ..models import LGA, LocationAlias
+from ..resolver import PREFETCH, AddressResolver, normalize
+from . import LocationsTestCase
+
+STATES = [(1, "Lagos", "LA"), (2, "Oyo", "OY"), (3, "Federal Capital Territory", "FC")]
+LGAS = [
+    (10, 1, "Surulere"),
+    (11, 2, "Surulere"),
+    (12, 2, "Ibadan North West"),
+    (13, 1, "Lagos Island"),
+    (14, 3, "Abuja Municipal Area Council"),
+]
+CITIES = [(100, 10, "Ojuelegba"), (101, 11, "Iresa")]
+
+
+class ResolverTests(SimpleTestCase):
+    def setUp(self):
+        self.resolver = AddressResolver(STATES, LGAS, CITIES, [("lga", 13, "Isale Eko")])
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Ibadan N/West LGA"), "ibadan north west")
+        self.assertEqual(normalize("Oyo State"), "oyo")
+
+    def test_exact_alias_and_fuzzy(self):
+        self.assertEqual(self.resolver.resolve("Lagos", "Lagos Island"), (1, 13, None, 1.0))
+        self.assertEqual(self.resolver.resolve("LA", "Isale Eko"), (1, 13, None, 0.9))
+        self.assertEqual(self.resolver.resolve("Oyo", "INW"), (2, 12, None, 0.95))
+        self.assertEqual(self.resolver.resolve("Lagoss").state_id, 1)
+
+    def test_ambiguous_lga(self):
+        self.assertEqual(self.resolver.resolve(None, "Surulere").lga_id, None)
+        self.assertEqual(self.resolver.resolve("Oyo", "Surulere").lga_id, 11)
+        self.assertEqual(self.resolver.resolve(None, "Surulere", "Ojuelegba")[:3], (1, 10, 100))
+
+    def test_unresolved(self):
+        self.assertEqual(self.resolver.resolve("Atlantis"), (None, None, None, 0.0))
+
+    def test_resolve_many_keeps_input_order(self):
+        rows = [("Lagos", "Surulere", None), ("Oyo", "Surulere", None), ("Atlantis", None, None)] * 5
+        expected = [self.resolver.resolve(*row) for row in rows]
+        self.assertEqual(list(self.resolver.resolve_many(rows, chunk_size=2)), expected)
+        self.assertEqual(list(self.resolver.resolve_many(rows, processes=2, chunk_size=2)), expected)
+
+    def test_resolve_many_reads_a_bounded_window_ahead(self):
+        consumed = 0
+
+        def rows():
+            nonlocal consumed
+            while True:
+                consumed += 1
+                yield ("Lagos", "Surulere", None)
+
+        results = self.resolver.resolve_many(rows(), processes=2, chunk_size=1)
+        self.assertEqual(next(results).lga_id, 10)
+        self.assertLessEqual(consumed, 2 * PREFETCH + 1)
+        results.close()
+
+
+class BuildTests(LocationsTestCase):
+    def test_build(self):
+        ikeja = LGA.objects.get(name="Ikeja")
+        LocationAlias.objects.create(kind="lga", object_id=ikeja.pk, alias="Ikeja Municipal")
+        with self.assertNumQueries(4):
+            resolver = AddressResolver.build()
+        result = resolver.resolve("Lagos", "Ikeja Municipal", "Ikeja")
+        self.assertEqual(result.lga_id, ikeja.pk)
+        self.assertIsNotNone(result.city_id)
+        self.assertEqual(result.confidence, round((1.0 + 0.9 + 1.0) / 3, 3))
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from .. import utils
+from ..search import EXACT, FUZZY, SearchIndex, autocomplete
+from . import LocationsTestCase
+
+ENTRIES = [
+    ("states", 1, "Lagos", "Lagos"),
+    ("lgas", 1, "Ikeja", "Ikeja, Lagos"),
+    ("lgas", 2, "Ado-Odo/Ota", "Ado-Odo/Ota, Ogun"),
+    ("lgas", 3, "Ogbomosho North", "Ogbomosho North, Oyo"),
+    ("cities", 1, "Ikeja", "Ikeja, Ikeja, Lagos"),
+    ("wards", 1, "Ward 1", "Ward 1, Ikeja, Lagos"),
+    ("wards", 2, "Ward 10", "Ward 10, Ikeja, Lagos"),
+    ("wards", 3, "Ikeja Ward", "Ikeja Ward, Ikeja, Lagos"),
+]
+
+
+class SearchIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SearchIndex(ENTRIES, [("lgas", 1, "Ikeja Municipal")])
+
+    def test_exact_and_prefix_matches_rank_first(self):
+        results = self.index.search("ikeja")
+        self.assertEqual([(r.kind, r.id) for r in results[:2]], [("lgas", 1), ("cities", 1)])
+        self.assertEqual(results[0].score[0], EXACT)
+
+    def test_folding(self):
+        self.assertEqual([r.id for r in self.index.search("ado odo", kinds=["lgas"])], [2])
+
+    def test_fuzzy_only_without_other_matches(self):
+        self.assertEqual([r.name for r in self.index.search("ogbomoso", kinds=["lgas"])], ["Ogbomosho North"])
+        self.assertEqual(self.index.search("ogbomoso")[0].score[0], FUZZY)
+        # Prefix matches exist, so fuzzy matching is skipped
+        with mock.patch.object(SearchIndex, "_fuzzy") as fuzzy:
+            self.index.search("ward 1")
+        fuzzy.assert_not_called()
+
+    def test_fuzzy_respects_kinds(self):
+        self.assertEqual([(r.kind, r.id) for r in self.index.search("ikeha", kinds=["cities"])], [("cities", 1)])
+
+    def test_per_kind(self):
+        results = self.index.search("ikeja", limit=None, per_kind=1)
+        self.assertEqual(sorted(r.kind for r in results), ["cities", "lgas", "wards"])
+
+    def test_aliases_report_their_entry(self):
+        self.assertEqual([(r.kind, r.id) for r in self.index.search("ikeja mun")], [("lgas", 1)])
+
+
+@override_settings(NG_LOCATIONS_USE_SEARCH_INDEX=True)
+class SearchLocationsTests(LocationsTestCase):
+    def test_one_index_search_per_call(self):
+        with mock.patch.object(SearchIndex, "search", autospec=True, side_effect=SearchIndex.search) as search:
+            results = utils.search_locations("ward", limit=10)
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual([w.name for w in results["wards"]], ["Ward 1", "Ward 1", "Ward 2"])
+        self.assertFalse(results["states"].exists())
+
+    def test_limit_per_kind(self):
+        results = utils.search_locations("ward", limit=1)
+        self.assertEqual(len(results["wards"]), 1)
+
+    def test_matches_the_scan(self):
+        with override_settings(NG_LOCATIONS_USE_SEARCH_INDEX=False):
+            scanned = {kind: {obj.pk for obj in qs} for kind, qs in utils.search_locations("ikeja").items()}
+        indexed = {kind: {obj.pk for obj in qs} for kind, qs in utils.search_locations("ikeja").items()}
+        self.assertEqual(indexed, scanned)
+
+    def test_autocomplete(self):
+        self.assertEqual([(r.kind, r.name) for r in autocomplete("ilorin", kinds=["cities"])], [("cities", "Ilorin")])
+        self.assertEqual(autocomplete("lasgidi")[0].name, "Lagos")
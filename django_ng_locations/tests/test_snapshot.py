@@ -0,0 +1,87 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from .. import snapshot
+from ..models import LGA, LocationAlias, PostalCode, State, Ward
+from ..snapshot import Snapshot, SnapshotError, compile_snapshot, get_snapshot
+from . import LocationsTestCase
+
+
+class SnapshotTests(LocationsTestCase):
+    def setUp(self):
+        super().setUp()
+        fd, self.path = tempfile.mkstemp(suffix=".snap")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def open(self):
+        compile_snapshot(self.path)
+        reader = Snapshot(self.path)
+        self.addCleanup(reader.close)
+        return reader
+
+    def test_counts(self):
+        counts = compile_snapshot(self.path)
+        self.assertEqual(counts, {"zone": 2, "state": 3, "lga": 6, "city": 4, "ward": 4, "postal_code": 5})
+
+    def test_lookups_need_no_database(self):
+        reader = self.open()
+        lagos_id = State.objects.get(name="Lagos").pk
+        with self.assertNumQueries(0):
+            lagos = reader.by_name("state", "LAGOS")[0]
+            self.assertEqual((lagos.id, lagos.code), (lagos_id, "LA"))
+            self.assertEqual(reader.parent(lagos).name, "South West")
+            self.assertEqual([lga.name for lga in reader.children(lagos, "lga")], ["Alimosho", "Eti-Osa", "Ikeja"])
+            self.assertEqual(reader.by_name("state", "lasgidi"), (lagos,))
+            self.assertEqual(reader.postal_code("100001").name, "Ikeja GRA")
+            self.assertIsNone(reader.postal_code("999999"))
+
+    def test_rows_match_the_database(self):
+        reader = self.open()
+        for kind, model in (("lga", LGA), ("ward", Ward), ("postal_code", PostalCode)):
+            with self.subTest(kind=kind):
+                self.assertEqual(
+                    sorted(location.id for location in reader.all(kind)),
+                    sorted(model.objects.values_list("id", flat=True)),
+                )
+        ward = Ward.objects.get(name="Alausa")
+        self.assertEqual(reader.get("ward", ward.pk), ("ward", ward.pk, ward.lga_id, "Alausa", "LA/IKJ/01"))
+
+    def test_names_under_a_parent(self):
+        LocationAlias.objects.create(kind="ward", object_id=Ward.objects.get(name="Alausa").pk, alias="Secretariat")
+        reader = self.open()
+        self.assertEqual(len(reader.by_name("ward", "ward 1")), 2)
+        ikeja = reader.by_name("lga", "ikeja")[0]
+        self.assertEqual([ward.code for ward in reader.by_name("ward", "Ward 1", parent=ikeja)], ["LA/IKJ/02"])
+        self.assertEqual(reader.by_name("ward", "secretariat")[0].name, "Alausa")
+
+    def test_children_of_the_wrong_level(self):
+        reader = self.open()
+        with self.assertRaises(ValueError):
+            reader.children(reader.by_name("zone", "south west")[0], "lga")
+
+    def test_invalid_files(self):
+        with self.assertRaisesMessage(SnapshotError, "is empty"):
+            Snapshot(self.path)
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot")
+        with self.assertRaisesMessage(SnapshotError, "is not a location snapshot"):
+            Snapshot(self.path)
+
+    def test_command_and_setting(self):
+        self.addCleanup(snapshot.invalidate_snapshot)
+        with override_settings(NG_LOCATIONS_SNAPSHOT_PATH=self.path):
+            out = StringIO()
+            call_command("compile_ng_locations_snapshot", stdout=out)
+            self.assertIn("6 lga rows", out.getvalue())
+            self.assertEqual(get_snapshot().count("city"), 4)
+        snapshot.invalidate_snapshot()
+        with self.assertRaises(ImproperlyConfigured):
+            get_snapshot()
+        with self.assertRaisesMessage(CommandError, "Give an output path"):
+            call_command("compile_ng_locations_snapshot", stdout=StringIO())
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from ..cache import bump_dataset_version
+from ..tree import get_hierarchy_tree, get_tree_payload
+from . import LocationsTestCase
+
+
+class HierarchyTreeTests(LocationsTestCase):
+    def test_depths(self):
+        with self.assertNumQueries(1):
+            self.assertEqual([zone["name"] for zone in get_hierarchy_tree(1)], ["North Central", "South West"])
+        with self.assertNumQueries(5):
+            tree = get_hierarchy_tree(4)
+        lagos = tree[1]["states"][0]
+        self.assertEqual(lagos["name"], "Lagos")
+        self.assertEqual([lga["name"] for lga in lagos["lgas"]], ["Alimosho", "Eti-Osa", "Ikeja"])
+        ikeja = lagos["lgas"][2]
+        self.assertEqual([city["name"] for city in ikeja["cities"]], ["Ikeja"])
+        self.assertEqual([ward["name"] for ward in ikeja["wards"]], ["Alausa", "Ward 1"])
+        self.assertNotIn("wards", get_hierarchy_tree(3)[1]["states"][0]["lgas"][0])
+
+    def test_invalid_depth(self):
+        for depth in (0, 5):
+            with self.subTest(depth=depth), self.assertRaises(ValueError):
+                get_hierarchy_tree(depth)
+
+    def test_payload_is_built_once_per_version(self):
+        payload = get_tree_payload()
+        self.assertIs(get_tree_payload(), payload)
+        self.assertEqual(json.loads(gzip.decompress(payload.encoded["gzip"])), json.loads(payload.body))
+        bump_dataset_version()
+        rebuilt = get_tree_payload()
+        self.assertIsNot(rebuilt, payload)
+        # Same tree, same bytes and ETag
+        self.assertEqual((rebuilt.body, rebuilt.etag), (payload.body, payload.etag))
+
+
+class TreeViewTests(LocationsTestCase):
+    url = reverse("ng_locations:tree")
+
+    def test_plain_and_gzip(self):
+        response = self.client.get(self.url, {"depth": 2})
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response.json()["depth"], 2)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        compressed = self.client.get(self.url, {"depth": 2}, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), response.content)
+        self.assertNotEqual(compressed["ETag"], response["ETag"])
+
+    def test_refused_encodings(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_conditional_requests(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_bad_depth(self):
+        for depth in ("x", "0", "5"):
+            with self.subTest(depth=depth):
+                self.assertEqual(self.client.get(self.url, {"depth": depth}).status_code, 400)
+
+
+class ExportTreeTests(LocationsTestCase):
+    def test_export(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "static", "tree.json")
+        self.addCleanup(shutil.rmtree, directory)
+        call_command("export_ng_locations_tree", path, depth=1, stdout=StringIO())
+        with open(path, "rb") as f:
+            body = f.read()
+        with open(path + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), body)
+        self.assertEqual(len(json.loads(body)["zones"]), 2)
+
+    def test_bad_depth(self):
+        with self.assertRaisesMessage(CommandError, "--depth"):
+            call_command("export_ng_locations_tree", "tree.json", depth=9, stdout=StringIO())
@@ -0,0 +1,92 @@
+from unittest import mock, skipUnless
+
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .. import utils
+from ..index import get_index
+from ..models import State
+from . import LocationsTestCase
+
+
+class CaseInsensitiveLookupTests(LocationsTestCase):
+    def test_lookups_ignore_case(self):
+        self.assertEqual(utils.get_zone_by_name("SOUTH west").code, "south_west")
+        self.assertEqual(utils.get_state_by_code("la").name, "Lagos")
+        self.assertEqual(utils.get_lga_by_name("eti-osa", "LAGOS").name, "Eti-Osa")
+        self.assertEqual(utils.get_city_by_name("ibadan").name, "Ibadan")
+        self.assertEqual([ward.name for ward in utils.get_wards_by_lga("IKEJA", "lagos")], ["Alausa", "Ward 1"])
+
+    def test_lookups_compare_upper_values(self):
+        with CaptureQueriesContext(connection) as queries:
+            utils.get_state_by_name("lagos")
+        sql = queries[0]["sql"]
+        self.assertIn("UPPER(", sql)
+        self.assertNotIn(" LIKE ", sql)
+
+    def test_lookups_follow_the_connection_they_run_on(self):
+        # Built before the connection is known; compiled for the one it runs on
+        queryset = State.objects.filter(utils._iexact(name="lagos"))
+        with mock.patch.object(connections[queryset.db].features, "supports_expression_indexes", False):
+            self.assertEqual(str(queryset.query), str(State.objects.filter(name__iexact="lagos").query))
+            self.assertEqual(queryset.get().name, "Lagos")
+            self.assertEqual(utils.get_state_by_name("lagos").name, "Lagos")
+            self.assertEqual(utils.get_zone_by_code("SOUTH_WEST").name, "South West")
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite's")
+    def test_lookups_use_the_expression_indexes(self):
+        queryset = State.objects.filter(utils._iexact(name="lagos"))
+        self.assertIn("ng_state_upper_name_idx", queryset.explain())
+
+
+class BatchLookupTests(LocationsTestCase):
+    def test_states(self):
+        batch = utils.get_states_by_names(["lagos", "Lasgidi", "Atlantis", "lagos"])
+        self.assertEqual({name: state.name for name, state in batch.found.items()}, {"lagos": "Lagos", "Lasgidi": "Lagos"})
+        self.assertEqual(batch.missing, ["Atlantis"])
+
+    def test_lgas(self):
+        batch = utils.get_lgas_by_pairs([("Lagos", "ikeja"), ("Oyo", "Ikeja"), ["oyo", "Ibadan North"]])
+        self.assertEqual({pair: lga.name for pair, lga in batch.found.items()}, {
+            ("Lagos", "ikeja"): "Ikeja", ("oyo", "Ibadan North"): "Ibadan North",
+        })
+        self.assertEqual(batch.missing, [("Oyo", "Ikeja")])
+
+    def test_cities(self):
+        batch = utils.get_cities_by_pairs([("Lagos", "Lekki"), ("Oyo", "Lekki")])
+        self.assertEqual(list(batch.found), [("Lagos", "Lekki")])
+
+    def test_wards(self):
+        # "Ward 1" exists in Ikeja and Ibadan North
+        batch = utils.get_wards_by_pairs([("Ikeja", "Ward 1"), ("Oyo", "Ibadan North", "ward 1"), ("Ikeja", "Ward 2")])
+        self.assertEqual(batch.found[("Ikeja", "Ward 1")].code, "LA/IKJ/02")
+        self.assertEqual(batch.found[("Oyo", "Ibadan North", "ward 1")].code, "OY/IBN/01")
+        self.assertEqual(batch.missing, [("Ikeja", "Ward 2")])
+
+    def test_postal_codes(self):
+        batch = utils.get_postal_codes_bulk(["100 001", "999999"])
+        self.assertEqual(batch.found["100 001"].code, "100001")
+        self.assertEqual(batch.missing, ["999999"])
+
+    def test_query_count_does_not_depend_on_the_keys(self):
+        # Both include a name that is looked up among the aliases
+        few = [("Lagos", "Ikeja"), ("Lagos", "Nowhere")]
+        many = few + [("Lagos", f"LGA {n}") for n in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            utils.get_lgas_by_pairs(few)
+        with self.assertNumQueries(len(queries)):
+            batch = utils.get_lgas_by_pairs(many)
+        self.assertEqual(len(batch.missing), 301)
+
+    def test_chunks_stay_below_the_parameter_limit(self):
+        names = [f"State {n}" for n in range(utils.BATCH_CHUNK_SIZE * 2 + 1)] + ["Kwara"]
+        batch = utils.get_states_by_names(names)
+        self.assertEqual(list(batch.found), ["Kwara"])
+
+    @override_settings(NG_LOCATIONS_USE_INDEX=True)
+    def test_warm_index_answers_without_queries(self):
+        get_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(utils.get_states_by_names(["Lasgidi", "Atlantis"]).missing, ["Atlantis"])
+            self.assertEqual(list(utils.get_lgas_by_pairs([("Lagos", "Ikeja")]).found), [("Lagos", "Ikeja")])
@@ -0,0 +1,82 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from ..cache import bump_dataset_version
+from ..models import LGA, State, Zone
+from . import LocationsTestCase
+
+
+class ChildrenViewTests(LocationsTestCase):
+    def test_cascade(self):
+        zones = self.client.get(reverse("ng_locations:zones")).json()["results"]
+        self.assertEqual([zone["name"] for zone in zones], ["North Central", "South West"])
+
+        south_west = Zone.objects.get(name="South West")
+        states = self.client.get(reverse("ng_locations:zone-states", args=[south_west.pk])).json()["results"]
+        self.assertEqual([state["name"] for state in states], ["Lagos", "Oyo"])
+
+        lagos = State.objects.get(name="Lagos")
+        lgas = self.client.get(reverse("ng_locations:state-lgas", args=[lagos.pk])).json()["results"]
+        self.assertEqual([lga["name"] for lga in lgas], ["Alimosho", "Eti-Osa", "Ikeja"])
+
+        ikeja = LGA.objects.get(name="Ikeja")
+        for name, expected in (("lga-cities", ["Ikeja"]), ("lga-wards", ["Alausa", "Ward 1"])):
+            with self.subTest(name=name):
+                results = self.client.get(reverse(f"ng_locations:{name}", args=[ikeja.pk])).json()["results"]
+                self.assertEqual([result["name"] for result in results], expected)
+        results = self.client.get(reverse("ng_locations:lga-postal-codes", args=[ikeja.pk])).json()["results"]
+        self.assertEqual([result["code"] for result in results], ["100001", "100271"])
+
+    def test_unknown_parent_has_no_children(self):
+        self.assertEqual(self.client.get(reverse("ng_locations:state-lgas", args=[0])).json(), {"results": []})
+
+    def test_cached_slices_run_no_queries(self):
+        url = reverse("ng_locations:zones")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    @override_settings(NG_LOCATIONS_API_MAX_AGE=60)
+    def test_conditional_requests(self):
+        url = reverse("ng_locations:zones")
+        response = self.client.get(url)
+        self.assertIn("max-age=60", response["Cache-Control"])
+        self.assertIn("public", response["Cache-Control"])
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code, 304)
+
+        bump_dataset_version()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_get_only(self):
+        self.assertEqual(self.client.post(reverse("ng_locations:zones")).status_code, 405)
+
+
+class SearchViewTests(LocationsTestCase):
+    url = reverse("ng_locations:search")
+
+    def test_search(self):
+        results = self.client.get(self.url, {"q": "ibadan", "kinds": "cities,lgas"}).json()["results"]
+        self.assertEqual({(result["kind"], result["name"]) for result in results}, {
+            ("cities", "Ibadan"), ("lgas", "Ibadan North"), ("lgas", "Ibadan South-West"),
+        })
+        self.assertEqual(set(results[0]), {"kind", "id", "name", "label"})
+
+    def test_limit(self):
+        self.assertEqual(len(self.client.get(self.url, {"q": "i", "limit": 2}).json()["results"]), 2)
+
+    def test_empty_query(self):
+        self.assertEqual(self.client.get(self.url, {"q": " "}).json(), {"results": []})
+
+    def test_bad_parameters(self):
+        for params in (
+            {"q": "ikeja", "limit": "ten"},
+            {"q": "ikeja", "limit": 0},
+            {"q": "ikeja", "limit": -3},
+            {"q": "ikeja", "kinds": "planets"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
@@ -0,0 +1,58 @@
+"""
+Name normalization and approximate string matching shared by the search
+index and the address resolver
+
+Kept free of model imports so worker processes can use it before Django is
+set up.
+"""
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text: str) -> str:
+    """
+    Fold a name for matching: strip accents, lowercase and turn punctuation
+    into single spaces, e.g. "Ado-Odo/Ota" -> "ado odo ota"
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", text.casefold()).strip()
+
+
+def typo_limit(word: str) -> int:
+    """Edits tolerated in a word: none below 4 characters, two from 8"""
+    return 0 if len(word) < 4 else 1 if len(word) < 8 else 2
+
+
+def edit_distance(a: str, b: str, limit: int, prefix: bool = False) -> int:
+    """
+    Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` if it exceeds
+    ``limit``. With ``prefix`` the distance to the closest prefix of ``b`` is
+    returned, so partially typed words match.
+    """
+    if prefix:
+        b = b[:len(a) + limit]
+    elif abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(b) < len(a) - limit:
+        return limit + 1
+
+    # Only cells within ``limit`` of the diagonal can stay under the limit
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i
+        for j in range(lo, hi + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != b[j - 1]),
+            )
+        if min(current[max(0, lo - 1):hi + 1]) > limit:
+            return over
+        previous = current
+    return min(min(previous) if prefix else previous[-1], over)
@@ -0,0 +1,123 @@
+"""
+The whole zone -> state -> LGA tree in one payload
+
+``get_hierarchy_tree(depth)`` builds the nested structure with one query per
+level. ``get_tree_payload(depth)`` serializes it once per dataset version
+(see ``cache.py``) to compact JSON plus gzip and, with the optional
+``brotli`` package (``pip install django-ng-locations[brotli]``), brotli
+variants. The strong ETag is a hash of the JSON, so every worker and every
+export of the same tree agree on it. The ``tree/`` view and the
+``export_ng_locations_tree`` command serve and write these bytes as they are,
+so requests do no serialization work.
+
+Depth 1 is the zones, 2 adds their states, 3 (the default) their LGAs and 4
+the cities and wards of each LGA.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import SLICES, get_dataset_version
+from .instrumentation import record_cache_access
+
+# Children of each level, by depth
+TREE_LEVELS = (("zones",), ("states",), ("lgas",), ("cities", "wards"))
+
+MAX_DEPTH = len(TREE_LEVELS)
+DEFAULT_DEPTH = 3
+
+# Content codings of a payload, in order of preference
+ENCODINGS = ("br", "gzip")
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def get_hierarchy_tree(depth: int = DEFAULT_DEPTH, using: str = DEFAULT_DB_ALIAS) -> List[dict]:
+    """
+    Zones with their states, LGAs, ... down to ``depth``, as nested dicts
+    (one query per level)
+
+    Nodes carry the fields of the JSON endpoints (see ``cache.SLICES``); the
+    children of a node are listed under the child level's name.
+    """
+    if not 1 <= depth <= MAX_DEPTH:
+        raise ValueError(f"depth must be between 1 and {MAX_DEPTH}")
+
+    roots: List[dict] = []
+    parents: Dict[int, dict] = {}
+    for levels in TREE_LEVELS[:depth]:
+        nodes: Dict[int, dict] = {}
+        for kind in levels:
+            model, parent_field, fields = SLICES[kind]
+            for parent in parents.values():
+                parent[kind] = []
+            values = fields + ((parent_field,) if parent_field else ())
+            for row in model.objects.using(using).order_by("name").values(*values):
+                parent_id = row.pop(parent_field) if parent_field else None
+                if parent_field is None:
+                    roots.append(row)
+                elif parent_id in parents:
+                    parents[parent_id][kind].append(row)
+                nodes[row["id"]] = row
+        parents = nodes
+    return roots
+
+
+class TreePayload(NamedTuple):
+    # Dataset version the payload was built from
+    version: int
+    depth: int
+    # Compact UTF-8 JSON and its compressed variants, keyed by content coding
+    body: bytes
+    encoded: Dict[str, bytes]
+    # Strong ETag of the JSON body; encoded variants append their coding
+    etag: str
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+
+def build_tree_payload(depth: int = DEFAULT_DEPTH, using: str = DEFAULT_DB_ALIAS) -> TreePayload:
+    """Serialize and compress the tree of the current dataset version"""
+    version = get_dataset_version()
+    body = json.dumps(
+        {"depth": depth, "zones": get_hierarchy_tree(depth, using)},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    # No timestamp in the header: the same tree always gives the same bytes
+    encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    brotli = _brotli()
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body)
+    return TreePayload(version, depth, body, encoded, hashlib.sha256(body).hexdigest()[:32])
+
+
+_payloads: Dict[int, TreePayload] = {}
+_lock = threading.Lock()
+
+
+def get_tree_payload(depth: int = DEFAULT_DEPTH) -> TreePayload:
+    """
+    The process-wide payload of ``depth``, rebuilt once whenever the dataset
+    version changes
+    """
+    version = get_dataset_version()
+    payload = _payloads.get(depth)
+    record_cache_access("tree", payload is not None and payload.version == version)
+    if payload is None or payload.version != version:
+        with _lock:
+            payload = _payloads.get(depth)
+            if payload is None or payload.version != version:
+                payload = _payloads[depth] = build_tree_payload(depth)
+    return payload
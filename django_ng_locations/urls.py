@@ -0,0 +1,23 @@
+"""
+URL configuration for the django_ng_locations JSON endpoints
+
+Include it in a project with::
+
+    path("api/locations/", include("django_ng_locations.urls")),
+"""
+from django.urls import path
+
+from . import views
+
+app_name = "ng_locations"
+
+urlpatterns = [
+    path("zones/", views.zones, name="zones"),
+    path("zones/<int:parent_id>/states/", views.states_for_zone, name="zone-states"),
+    path("states/<int:parent_id>/lgas/", views.lgas_for_state, name="state-lgas"),
+    path("lgas/<int:parent_id>/cities/", views.cities_for_lga, name="lga-cities"),
+    path("lgas/<int:parent_id>/wards/", views.wards_for_lga, name="lga-wards"),
+    path("lgas/<int:parent_id>/postal-codes/", views.postal_codes_for_lga, name="lga-postal-codes"),
+    path("search/", views.search, name="search"),
+    path("tree/", views.hierarchy_tree, name="tree"),
+]
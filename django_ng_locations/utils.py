@@ -1,139 +1,724 @@
 """
 Utility functions for django_ng_locations
 """
-from typing import Optional, List
-from django.db.models import QuerySet
-from .models import Zone, State, LGA, City, Ward, PostalCode
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, List, Sequence, Set
+from asgiref.sync import sync_to_async
+from django.db.models import Case, F, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Upper
+from django.db.models.lookups import Exact, IExact
+from .conf import get_setting
+from .index import HierarchyIndex, aget_index, get_index
+from .instrumentation import instrumented
+from .models import Zone, State, LGA, City, Ward, PostalCode, LocationAlias
+from .postal import aget_postal_index, get_postal_index, normalize_code, prefix_bounds
+from .search import SearchIndex, aget_search_index, get_search_index
+
+# Index pinned by the async variants, so the sync helpers they reuse never
+# have to (re)build it from the database
+_pinned_index: ContextVar[Optional[HierarchyIndex]] = ContextVar("ng_locations_index", default=None)
+_pinned_search_index: ContextVar[Optional[SearchIndex]] = ContextVar("ng_locations_search_index", default=None)
+
+
+def _index() -> Optional[HierarchyIndex]:
+    """The in-process hierarchy index, or None when NG_LOCATIONS_USE_INDEX is off"""
+    if not get_setting("USE_INDEX"):
+        return None
+    return _pinned_index.get() or get_index()
+
+
+def _search_index() -> SearchIndex:
+    return _pinned_search_index.get() or get_search_index()
+
+
+class _UpperExact(Exact):
+    """
+    ``UPPER(column) = UPPER(value)``, or ``iexact`` on backends without
+    expression indexes
+
+    The choice is made when the query is compiled, for the connection of the
+    database it runs on.
+    """
+
+    def as_sql(self, compiler, connection):
+        # The value was wrapped in Value() as the lhs had no field yet
+        value = self.rhs.value if isinstance(self.rhs, Value) else self.rhs
+        if connection.features.supports_expression_indexes:
+            return Exact(Upper(self.lhs), Upper(Value(value))).as_sql(compiler, connection)
+        return IExact(self.lhs, value).as_sql(compiler, connection)
+
+
+def _iexact(**lookups) -> Q:
+    """
+    Case-insensitive equality that can use the Upper(name)/Upper(code) indexes
+
+    ``name__iexact`` compiles to UPPER()/LIKE comparisons no index matches on
+    most backends; comparing UPPER(column) to UPPER(value) does. Backends
+    without expression indexes keep ``iexact``.
+    """
+    return Q(*(_UpperExact(F(field), value) for field, value in lookups.items()))
+
+
+def _named(kind: str, path: str, value: str) -> Q:
+    """
+    Rows whose ``path`` (a ``name`` field) equals ``value``
+    case-insensitively, or whose object at that level has ``value`` as an
+    alias (see ``LocationAlias``)
+
+    Both conditions go into the same query, so names only known as aliases
+    cost no extra round trip.
+    """
+    relation = path[:-len("name")]
+    aliases = LocationAlias.objects.filter(kind=kind, normalized_alias=LocationAlias.normalize(value))
+    return _iexact(**{path: value}) | Q(**{f"{relation}pk__in": aliases.values("object_id")})
+
+
+def _entry_model(entry):
+    return entry.to_model() if entry is not None else None
 
 
+@instrumented
 def get_all_zones() -> QuerySet:
     """Get all geopolitical zones"""
     return Zone.objects.all()
 
 
+@instrumented
 def get_zone_by_name(name: str) -> Optional[Zone]:
     """Get a zone by name"""
+    index = _index()
+    if index is not None:
+        return _entry_model(index.zone_by_name(name))
     try:
-        return Zone.objects.get(name__iexact=name)
+        return Zone.objects.get(_named("zone", "name", name))
     except Zone.DoesNotExist:
         return None
 
 
+@instrumented
 def get_zone_by_code(code: str) -> Optional[Zone]:
     """Get a zone by code"""
+    index = _index()
+    if index is not None:
+        return _entry_model(index.zone_by_code(code))
     try:
-        return Zone.objects.get(code__iexact=code)
+        return Zone.objects.get(_iexact(code=code))
     except Zone.DoesNotExist:
         return None
 
 
+@instrumented
 def get_states_by_zone(zone_name: str) -> QuerySet:
     """Get all states in a specific zone"""
-    return State.objects.filter(zone__name__iexact=zone_name)
+    index = _index()
+    if index is not None:
+        zone = index.zone_by_name(zone_name)
+        return State.objects.filter(zone_id=zone.id) if zone else State.objects.none()
+    return State.objects.filter(_named("zone", "zone__name", zone_name))
 
 
+@instrumented
 def get_state_by_name(name: str) -> Optional[State]:
     """Get a state by name"""
+    index = _index()
+    if index is not None:
+        return _entry_model(index.state_by_name(name))
     try:
-        return State.objects.get(name__iexact=name)
+        return State.objects.get(_named("state", "name", name))
     except State.DoesNotExist:
         return None
 
 
+@instrumented
 def get_state_by_code(code: str) -> Optional[State]:
     """Get a state by code"""
+    index = _index()
+    if index is not None:
+        return _entry_model(index.state_by_code(code))
     try:
-        return State.objects.get(code__iexact=code)
+        return State.objects.get(_iexact(code=code))
     except State.DoesNotExist:
         return None
 
 
+@instrumented
 def get_lgas_by_state(state_name: str) -> QuerySet:
     """Get all LGAs in a specific state"""
-    return LGA.objects.filter(state__name__iexact=state_name)
+    index = _index()
+    if index is not None:
+        state = index.state_by_name(state_name)
+        return LGA.objects.filter(state_id=state.id) if state else LGA.objects.none()
+    return LGA.objects.filter(_named("state", "state__name", state_name))
 
 
+@instrumented
 def get_lgas_by_zone(zone_name: str) -> QuerySet:
     """Get all LGAs in a specific zone"""
-    return LGA.objects.filter(state__zone__name__iexact=zone_name)
+    index = _index()
+    if index is not None:
+        zone = index.zone_by_name(zone_name)
+        return LGA.objects.filter(state__zone_id=zone.id) if zone else LGA.objects.none()
+    return LGA.objects.filter(_named("zone", "state__zone__name", zone_name))
 
 
+@instrumented
 def get_lga_by_name(lga_name: str, state_name: Optional[str] = None) -> Optional[LGA]:
     """
     Get an LGA by name, optionally filtered by state
     """
+    index = _index()
+    if index is not None:
+        lgas = index.lgas_named(lga_name, state_name)
+        return lgas[0].to_model() if len(lgas) == 1 else None
     try:
         if state_name:
-            return LGA.objects.get(name__iexact=lga_name, state__name__iexact=state_name)
-        return LGA.objects.get(name__iexact=lga_name)
+            return LGA.objects.get(_named("lga", "name", lga_name), _named("state", "state__name", state_name))
+        return LGA.objects.get(_named("lga", "name", lga_name))
     except (LGA.DoesNotExist, LGA.MultipleObjectsReturned):
         return None
 
 
+@instrumented
 def get_cities_by_lga(lga_name: str, state_name: Optional[str] = None) -> QuerySet:
     """Get all cities in a specific LGA"""
+    index = _index()
+    if index is not None:
+        return City.objects.filter(lga_id__in=[lga.id for lga in index.lgas_named(lga_name, state_name)])
     if state_name:
-        return City.objects.filter(lga__name__iexact=lga_name, lga__state__name__iexact=state_name)
-    return City.objects.filter(lga__name__iexact=lga_name)
+        return City.objects.filter(_named("lga", "lga__name", lga_name), _named("state", "state__name", state_name))
+    return City.objects.filter(_named("lga", "lga__name", lga_name))
 
 
+@instrumented
 def get_cities_by_state(state_name: str) -> QuerySet:
     """Get all cities in a specific state"""
-    return City.objects.filter(lga__state__name__iexact=state_name)
+    index = _index()
+    if index is not None:
+        state = index.state_by_name(state_name)
+        return City.objects.filter(state_id=state.id) if state else City.objects.none()
+    return City.objects.filter(_named("state", "state__name", state_name))
 
 
+@instrumented
 def get_city_by_name(city_name: str, state_name: Optional[str] = None) -> Optional[City]:
     """Get a city by name, optionally filtered by state"""
+    index = _index()
+    if index is not None and state_name:
+        state = index.state_by_name(state_name)
+        if state is None:
+            return None
+        try:
+            return City.objects.get(_named("city", "name", city_name), state_id=state.id)
+        except (City.DoesNotExist, City.MultipleObjectsReturned):
+            return None
     try:
         if state_name:
-            return City.objects.get(name__iexact=city_name, lga__state__name__iexact=state_name)
-        return City.objects.get(name__iexact=city_name)
+            return City.objects.get(_named("city", "name", city_name), _named("state", "state__name", state_name))
+        return City.objects.get(_named("city", "name", city_name))
     except (City.DoesNotExist, City.MultipleObjectsReturned):
         return None
 
 
+@instrumented
 def get_wards_by_lga(lga_name: str, state_name: Optional[str] = None) -> QuerySet:
     """Get all wards in a specific LGA"""
+    index = _index()
+    if index is not None:
+        return Ward.objects.filter(lga_id__in=[lga.id for lga in index.lgas_named(lga_name, state_name)])
     if state_name:
-        return Ward.objects.filter(lga__name__iexact=lga_name, lga__state__name__iexact=state_name)
-    return Ward.objects.filter(lga__name__iexact=lga_name)
+        return Ward.objects.filter(_named("lga", "lga__name", lga_name), _named("state", "state__name", state_name))
+    return Ward.objects.filter(_named("lga", "lga__name", lga_name))
 
 
+@instrumented
 def get_wards_by_state(state_name: str) -> QuerySet:
     """Get all wards in a specific state"""
-    return Ward.objects.filter(lga__state__name__iexact=state_name)
+    index = _index()
+    if index is not None:
+        state = index.state_by_name(state_name)
+        return Ward.objects.filter(state_id=state.id) if state else Ward.objects.none()
+    return Ward.objects.filter(_named("state", "state__name", state_name))
 
 
+@instrumented
 def get_postal_code(code: str) -> Optional[PostalCode]:
     """Get postal code information"""
+    if get_setting("USE_POSTAL_INDEX"):
+        return _entry_model(get_postal_index().get(code))
     try:
-        return PostalCode.objects.get(code=code)
+        return PostalCode.objects.get(code=normalize_code(code))
     except PostalCode.DoesNotExist:
         return None
 
 
+@instrumented
+def get_postal_codes_by_prefix(prefix: str) -> QuerySet:
+    """Get all postal codes starting with ``prefix``, e.g. "1002" """
+    # A range on the unique code column, which every backend serves from its
+    # index; LIKE 'prefix%' often cannot use it
+    low, high = prefix_bounds(normalize_code(prefix))
+    queryset = PostalCode.objects.filter(code__gte=low)
+    return queryset.filter(code__lt=high) if high is not None else queryset
+
+
+@instrumented
+def get_postal_codes_in_range(start: str, end: str) -> QuerySet:
+    """Get all postal codes from ``start`` to ``end`` inclusive"""
+    return PostalCode.objects.filter(code__range=(normalize_code(start), normalize_code(end)))
+
+
+@instrumented
 def get_postal_codes_by_lga(lga_name: str, state_name: Optional[str] = None) -> QuerySet:
     """Get all postal codes in a specific LGA"""
+    index = _index()
+    if index is not None:
+        return PostalCode.objects.filter(lga_id__in=[lga.id for lga in index.lgas_named(lga_name, state_name)])
     if state_name:
-        return PostalCode.objects.filter(lga__name__iexact=lga_name, lga__state__name__iexact=state_name)
-    return PostalCode.objects.filter(lga__name__iexact=lga_name)
+        return PostalCode.objects.filter(_named("lga", "lga__name", lga_name), _named("state", "state__name", state_name))
+    return PostalCode.objects.filter(_named("lga", "lga__name", lga_name))
 
 
+@instrumented
 def get_postal_codes_by_state(state_name: str) -> QuerySet:
     """Get all postal codes in a specific state"""
-    return PostalCode.objects.filter(lga__state__name__iexact=state_name)
+    index = _index()
+    if index is not None:
+        state = index.state_by_name(state_name)
+        return PostalCode.objects.filter(state_id=state.id) if state else PostalCode.objects.none()
+    return PostalCode.objects.filter(_named("state", "state__name", state_name))
 
 
-def search_locations(query: str) -> dict:
+@instrumented
+def search_locations(query: str, limit: Optional[int] = None) -> dict:
     """
     Search across all location types
-    Returns a dictionary with matching zones, states, LGAs, cities, and wards
+    Returns a dictionary with matching zones, states, LGAs, cities, and wards,
+    at most ``limit`` of each
+
+    With NG_LOCATIONS_USE_SEARCH_INDEX enabled the matches come from the
+    in-process search index (prefix, accent-insensitive and typo-tolerant)
+    and each queryset is ordered by relevance.
+    """
+    models = {"zones": Zone, "states": State, "lgas": LGA, "cities": City, "wards": Ward}
+    if get_setting("USE_SEARCH_INDEX"):
+        ranked = {kind: [] for kind in models}
+        for result in _search_index().search(query, limit=None, per_kind=limit):
+            ranked[result.kind].append(result.id)
+        results = {}
+        for kind, model in models.items():
+            ids = ranked[kind]
+            results[kind] = model.objects.filter(pk__in=ids).order_by(
+                Case(*[When(pk=pk, then=rank) for rank, pk in enumerate(ids)], output_field=IntegerField())
+            ) if ids else model.objects.none()
+        return results
+
+    return {
+        kind: model.objects.filter(name__icontains=query)[:limit]
+        for kind, model in models.items()
+    }
+
+
+# Batch lookups
+#
+# Each takes an iterable of names, pairs or codes and resolves all of them in
+# a few set-based IN queries (chunked to stay below SQLite's 999 parameters),
+# whatever their number.
+
+# Values per IN list; a query holds at most two lists plus a few parameters
+BATCH_CHUNK_SIZE = 450
+
+
+class Batch(NamedTuple):
+    # Matched objects keyed by the input (name, pair or code) as given
+    found: dict
+    # Inputs matching no object, or several, in input order
+    missing: list
+
+
+def _chunks(values: Iterable) -> Iterator[list]:
+    values = sorted(values)
+    for start in range(0, len(values), BATCH_CHUNK_SIZE):
+        yield values[start:start + BATCH_CHUNK_SIZE]
+
+
+def _batch(keys: Sequence, match: Callable[..., list]) -> Batch:
+    found, missing = {}, []
+    for key in keys:
+        matches = match(key)
+        if len(matches) == 1:
+            found[key] = matches[0]
+        else:
+            missing.append(key)
+    return Batch(found, missing)
+
+
+def _named_rows(model, kind: str, names: Iterable[str], parent: Optional[str] = None, parent_ids=()) -> Callable:
     """
+    Read the rows of ``model`` named like any of ``names``
+    case-insensitively, or through an alias of ``kind``, optionally limited
+    to ``parent`` ids
+
+    Returns a function giving the rows matching one name; as in the index,
+    canonical names win over aliases.
+    """
+    names = set(names)
+    parent_chunks = list(_chunks(parent_ids)) if parent else [None]
+
+    def rows(queryset):
+        for parents in parent_chunks:
+            yield from queryset.filter(**{f"{parent}__in": parents}) if parents is not None else queryset
+
+    by_name = defaultdict(list)
+    for chunk in _chunks({name.upper() for name in names}):
+        # Served by the Upper(name) indexes, like _iexact
+        for obj in rows(model.objects.alias(upper_name=Upper("name")).filter(upper_name__in=chunk)):
+            by_name[obj.name.upper()].append(obj)
+
+    unresolved = {LocationAlias.normalize(name) for name in names if name.upper() not in by_name}
+    alias_ids = defaultdict(list)
+    for chunk in _chunks(unresolved):
+        for object_id, alias in LocationAlias.objects.filter(kind=kind, normalized_alias__in=chunk).values_list(
+            "object_id", "normalized_alias"
+        ):
+            alias_ids[object_id].append(alias)
+    by_alias = defaultdict(list)
+    for chunk in _chunks(alias_ids):
+        for obj in rows(model.objects.filter(pk__in=chunk)):
+            for alias in alias_ids[obj.pk]:
+                by_alias[alias].append(obj)
+
+    return lambda name: by_name.get(name.upper()) or by_alias.get(LocationAlias.normalize(name), [])
+
+
+def _state_ids(names: Iterable[str]) -> Dict[str, Set[int]]:
+    names = set(names)
+    index = _index()
+    if index is not None:
+        return {name: {state.id} if (state := index.state_by_name(name)) else set() for name in names}
+    states = _named_rows(State, "state", names)
+    return {name: {state.pk for state in states(name)} for name in names}
+
+
+def _lga_ids(keys: Iterable[tuple]) -> Dict[tuple, Set[int]]:
+    """Ids of the LGAs matching each ``(state name or None, LGA name)`` key"""
+    keys = set(keys)
+    index = _index()
+    if index is not None:
+        return {key: {lga.id for lga in index.lgas_named(key[1], key[0])} for key in keys}
+    state_ids = _state_ids(state for state, _ in keys if state)
+    lgas = _named_rows(LGA, "lga", (lga for _, lga in keys))
     return {
-        "zones": Zone.objects.filter(name__icontains=query),
-        "states": State.objects.filter(name__icontains=query),
-        "lgas": LGA.objects.filter(name__icontains=query),
-        "cities": City.objects.filter(name__icontains=query),
-        "wards": Ward.objects.filter(name__icontains=query),
+        key: {lga.pk for lga in lgas(key[1]) if not key[0] or lga.state_id in state_ids[key[0]]}
+        for key in keys
     }
 
+
+@instrumented
+def get_states_by_names(names: Iterable[str]) -> Batch:
+    """Get the state named (or aliased) like each of ``names``"""
+    names = list(dict.fromkeys(names))
+    index = _index()
+    if index is not None:
+        return _batch(names, lambda name: [entry.to_model() for entry in [index.state_by_name(name)] if entry])
+    return _batch(names, _named_rows(State, "state", names))
+
+
+@instrumented
+def get_lgas_by_pairs(pairs: Iterable[Sequence[str]]) -> Batch:
+    """Get the LGA of each ``(state_name, lga_name)`` pair"""
+    pairs = list(dict.fromkeys(map(tuple, pairs)))
+    index = _index()
+    if index is not None:
+        return _batch(pairs, lambda pair: [lga.to_model() for lga in index.lgas_named(pair[1], pair[0])])
+    state_ids = _state_ids(state for state, _ in pairs)
+    lgas = _named_rows(LGA, "lga", (lga for _, lga in pairs), "state_id", set().union(*state_ids.values()))
+    return _batch(pairs, lambda pair: [lga for lga in lgas(pair[1]) if lga.state_id in state_ids[pair[0]]])
+
+
+@instrumented
+def get_cities_by_pairs(pairs: Iterable[Sequence[str]]) -> Batch:
+    """Get the city of each ``(state_name, city_name)`` pair"""
+    pairs = list(dict.fromkeys(map(tuple, pairs)))
+    state_ids = _state_ids(state for state, _ in pairs)
+    cities = _named_rows(City, "city", (city for _, city in pairs), "state_id", set().union(*state_ids.values()))
+    return _batch(pairs, lambda pair: [city for city in cities(pair[1]) if city.state_id in state_ids[pair[0]]])
+
+
+def _ward_lga_key(key: tuple) -> tuple:
+    return (key[0], key[1]) if len(key) == 3 else (None, key[0])
+
+
+@instrumented
+def get_wards_by_pairs(pairs: Iterable[Sequence[str]]) -> Batch:
+    """
+    Get the ward of each ``(lga_name, ward_name)`` pair
+
+    LGA names repeat across states (Surulere, Irepodun, ...); pass
+    ``(state_name, lga_name, ward_name)`` triples to tell them apart.
+    """
+    keys = list(dict.fromkeys(map(tuple, pairs)))
+    lga_ids = _lga_ids(map(_ward_lga_key, keys))
+    wards = _named_rows(Ward, "ward", (key[-1] for key in keys), "lga_id", set().union(*lga_ids.values()))
+    return _batch(keys, lambda key: [
+        ward for ward in wards(key[-1]) if ward.lga_id in lga_ids[_ward_lga_key(key)]
+    ])
+
+
+@instrumented
+def get_postal_codes_bulk(codes: Iterable[str]) -> Batch:
+    """Get the postal code object of each of ``codes``"""
+    codes = list(dict.fromkeys(codes))
+    if get_setting("USE_POSTAL_INDEX"):
+        index = get_postal_index()
+        return _batch(codes, lambda code: [entry.to_model() for entry in [index.get(code)] if entry])
+    by_code = {}
+    for chunk in _chunks({normalize_code(code) for code in codes}):
+        by_code.update((postal_code.code, postal_code) for postal_code in PostalCode.objects.filter(code__in=chunk))
+    return _batch(codes, lambda code: [by_code[normalize_code(code)]] if normalize_code(code) in by_code else [])
+
+
+# Async variants
+#
+# These use Django's async ORM. Lookups answered by a warm in-process index
+# return without touching the database; helpers returning querysets in the
+# sync API return lists here.
+
+
+async def _aindex() -> Optional[HierarchyIndex]:
+    return await aget_index() if get_setting("USE_INDEX") else None
+
+
+async def _alist(func, *args) -> list:
+    """Evaluate the queryset built by a sync helper, with the index pinned"""
+    token = _pinned_index.set(await _aindex())
+    try:
+        queryset = func(*args)
+    finally:
+        _pinned_index.reset(token)
+    return [obj async for obj in queryset]
+
+
+async def _aget(model, *conditions, **filters):
+    try:
+        return await model.objects.aget(*conditions, **filters)
+    except (model.DoesNotExist, model.MultipleObjectsReturned):
+        return None
+
+
+@instrumented
+async def aget_all_zones() -> List[Zone]:
+    """Get all geopolitical zones"""
+    return await _alist(get_all_zones)
+
+
+@instrumented
+async def aget_zone_by_name(name: str) -> Optional[Zone]:
+    """Get a zone by name"""
+    index = await _aindex()
+    if index is not None:
+        return _entry_model(index.zone_by_name(name))
+    return await _aget(Zone, _named("zone", "name", name))
+
+
+@instrumented
+async def aget_zone_by_code(code: str) -> Optional[Zone]:
+    """Get a zone by code"""
+    index = await _aindex()
+    if index is not None:
+        return _entry_model(index.zone_by_code(code))
+    return await _aget(Zone, _iexact(code=code))
+
+
+@instrumented
+async def aget_states_by_zone(zone_name: str) -> List[State]:
+    """Get all states in a specific zone"""
+    index = await _aindex()
+    if index is not None:
+        zone = index.zone_by_name(zone_name)
+        return [state.to_model() for state in index.states_in_zone(zone.id)] if zone else []
+    return await _alist(get_states_by_zone, zone_name)
+
+
+@instrumented
+async def aget_state_by_name(name: str) -> Optional[State]:
+    """Get a state by name"""
+    index = await _aindex()
+    if index is not None:
+        return _entry_model(index.state_by_name(name))
+    return await _aget(State, _named("state", "name", name))
+
+
+@instrumented
+async def aget_state_by_code(code: str) -> Optional[State]:
+    """Get a state by code"""
+    index = await _aindex()
+    if index is not None:
+        return _entry_model(index.state_by_code(code))
+    return await _aget(State, _iexact(code=code))
+
+
+@instrumented
+async def aget_lgas_by_state(state_name: str) -> List[LGA]:
+    """Get all LGAs in a specific state"""
+    index = await _aindex()
+    if index is not None:
+        state = index.state_by_name(state_name)
+        return [lga.to_model() for lga in index.lgas_in_state(state.id)] if state else []
+    return await _alist(get_lgas_by_state, state_name)
+
+
+@instrumented
+async def aget_lgas_by_zone(zone_name: str) -> List[LGA]:
+    """Get all LGAs in a specific zone"""
+    index = await _aindex()
+    if index is not None:
+        zone = index.zone_by_name(zone_name)
+        if zone is None:
+            return []
+        lgas = [lga for state in index.states_in_zone(zone.id) for lga in index.lgas_in_state(state.id)]
+        return [lga.to_model() for lga in sorted(lgas, key=lambda lga: lga.name)]
+    return await _alist(get_lgas_by_zone, zone_name)
+
+
+@instrumented
+async def aget_lga_by_name(lga_name: str, state_name: Optional[str] = None) -> Optional[LGA]:
+    """
+    Get an LGA by name, optionally filtered by state
+    """
+    index = await _aindex()
+    if index is not None:
+        lgas = index.lgas_named(lga_name, state_name)
+        return lgas[0].to_model() if len(lgas) == 1 else None
+    if state_name:
+        return await _aget(LGA, _named("lga", "name", lga_name), _named("state", "state__name", state_name))
+    return await _aget(LGA, _named("lga", "name", lga_name))
+
+
+@instrumented
+async def aget_cities_by_lga(lga_name: str, state_name: Optional[str] = None) -> List[City]:
+    """Get all cities in a specific LGA"""
+    return await _alist(get_cities_by_lga, lga_name, state_name)
+
+
+@instrumented
+async def aget_cities_by_state(state_name: str) -> List[City]:
+    """Get all cities in a specific state"""
+    return await _alist(get_cities_by_state, state_name)
+
+
+@instrumented
+async def aget_city_by_name(city_name: str, state_name: Optional[str] = None) -> Optional[City]:
+    """Get a city by name, optionally filtered by state"""
+    index = await _aindex()
+    if index is not None and state_name:
+        state = index.state_by_name(state_name)
+        if state is None:
+            return None
+        return await _aget(City, _named("city", "name", city_name), state_id=state.id)
+    if state_name:
+        return await _aget(City, _named("city", "name", city_name), _named("state", "state__name", state_name))
+    return await _aget(City, _named("city", "name", city_name))
+
+
+@instrumented
+async def aget_wards_by_lga(lga_name: str, state_name: Optional[str] = None) -> List[Ward]:
+    """Get all wards in a specific LGA"""
+    return await _alist(get_wards_by_lga, lga_name, state_name)
+
+
+@instrumented
+async def aget_wards_by_state(state_name: str) -> List[Ward]:
+    """Get all wards in a specific state"""
+    return await _alist(get_wards_by_state, state_name)
+
+
+@instrumented
+async def aget_postal_code(code: str) -> Optional[PostalCode]:
+    """Get postal code information"""
+    if get_setting("USE_POSTAL_INDEX"):
+        return _entry_model((await aget_postal_index()).get(code))
+    return await _aget(PostalCode, code=normalize_code(code))
+
+
+@instrumented
+async def aget_postal_codes_by_prefix(prefix: str) -> List[PostalCode]:
+    """Get all postal codes starting with ``prefix``"""
+    return await _alist(get_postal_codes_by_prefix, prefix)
+
+
+@instrumented
+async def aget_postal_codes_in_range(start: str, end: str) -> List[PostalCode]:
+    """Get all postal codes from ``start`` to ``end`` inclusive"""
+    return await _alist(get_postal_codes_in_range, start, end)
+
+
+@instrumented
+async def aget_postal_codes_by_lga(lga_name: str, state_name: Optional[str] = None) -> List[PostalCode]:
+    """Get all postal codes in a specific LGA"""
+    return await _alist(get_postal_codes_by_lga, lga_name, state_name)
+
+
+@instrumented
+async def aget_postal_codes_by_state(state_name: str) -> List[PostalCode]:
+    """Get all postal codes in a specific state"""
+    return await _alist(get_postal_codes_by_state, state_name)
+
+
+@instrumented
+async def asearch_locations(query: str, limit: Optional[int] = None) -> dict:
+    """
+    Search across all location types
+    Returns a dictionary with lists of matching zones, states, LGAs, cities,
+    and wards, at most ``limit`` of each
+    """
+    search_index = await aget_search_index() if get_setting("USE_SEARCH_INDEX") else None
+    token = _pinned_search_index.set(search_index)
+    try:
+        results = search_locations(query, limit)
+    finally:
+        _pinned_search_index.reset(token)
+    return {kind: [obj async for obj in queryset] for kind, queryset in results.items()}
+
+
+async def _abatch(func, *args) -> Batch:
+    """Run a sync batch lookup in a worker thread, with the index pinned"""
+    token = _pinned_index.set(await _aindex())
+    try:
+        # The batch is a handful of queries; running them in one thread
+        # spares a thread switch per query
+        return await sync_to_async(func)(*args)
+    finally:
+        _pinned_index.reset(token)
+
+
+@instrumented
+async def aget_states_by_names(names: Iterable[str]) -> Batch:
+    """Get the state named (or aliased) like each of ``names``"""
+    return await _abatch(get_states_by_names, list(names))
+
+
+@instrumented
+async def aget_lgas_by_pairs(pairs: Iterable[Sequence[str]]) -> Batch:
+    """Get the LGA of each ``(state_name, lga_name)`` pair"""
+    return await _abatch(get_lgas_by_pairs, list(pairs))
+
+
+@instrumented
+async def aget_cities_by_pairs(pairs: Iterable[Sequence[str]]) -> Batch:
+    """Get the city of each ``(state_name, city_name)`` pair"""
+    return await _abatch(get_cities_by_pairs, list(pairs))
+
+
+@instrumented
+async def aget_wards_by_pairs(pairs: Iterable[Sequence[str]]) -> Batch:
+    """Get the ward of each ``(lga_name, ward_name)`` pair or ``(state, lga, ward)`` triple"""
+    return await _abatch(get_wards_by_pairs, list(pairs))
+
+
+@instrumented
+async def aget_postal_codes_bulk(codes: Iterable[str]) -> Batch:
+    """Get the postal code object of each of ``codes``"""
+    if get_setting("USE_POSTAL_INDEX"):
+        await aget_postal_index()
+    return await _abatch(get_postal_codes_bulk, list(codes))
@@ -0,0 +1,135 @@
+"""
+JSON endpoints for cascading location dropdowns and autocomplete
+
+Responses only depend on the dataset version (see ``cache.py``), which is
+used as the ETag and Last-Modified value, so browsers and CDNs can cache and
+revalidate them cheaply.
+"""
+from datetime import datetime, timezone
+
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition, require_GET
+
+from .cache import get_children, get_dataset_version
+from .conf import get_setting
+from .search import KINDS, autocomplete
+from .tree import DEFAULT_DEPTH, ENCODINGS, MAX_DEPTH, get_tree_payload
+
+MAX_SEARCH_LIMIT = 50
+
+
+def _version(request) -> int:
+    # Read once per request; both conditional headers are derived from it
+    if not hasattr(request, "_ng_locations_version"):
+        request._ng_locations_version = get_dataset_version()
+    return request._ng_locations_version
+
+
+def dataset_etag(request, *args, **kwargs):
+    return f'"{_version(request)}"'
+
+
+def dataset_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(_version(request) / 1000, tz=timezone.utc)
+
+
+def _cached_json(data) -> JsonResponse:
+    response = JsonResponse(data)
+    patch_cache_control(response, public=True, max_age=get_setting("API_MAX_AGE"))
+    return response
+
+
+def _children_view(kind: str):
+    @require_GET
+    @condition(etag_func=dataset_etag, last_modified_func=dataset_last_modified)
+    def view(request, parent_id=None):
+        return _cached_json({"results": get_children(kind, parent_id)})
+
+    view.__name__ = f"{kind}_view"
+    return view
+
+
+zones = _children_view("zones")
+states_for_zone = _children_view("states")
+lgas_for_state = _children_view("lgas")
+cities_for_lga = _children_view("cities")
+wards_for_lga = _children_view("wards")
+postal_codes_for_lga = _children_view("postal_codes")
+
+
+@require_GET
+@condition(etag_func=dataset_etag, last_modified_func=dataset_last_modified)
+def search(request):
+    """
+    Autocomplete across location types
+
+    Query parameters: ``q`` (required), ``limit`` (a positive integer, default
+    10, at most 50) and ``kinds``, a comma-separated subset of zones, states,
+    lgas, cities, wards.
+    """
+    query = request.GET.get("q", "").strip()
+    try:
+        limit = int(request.GET.get("limit", 10))
+    except ValueError:
+        return HttpResponseBadRequest("limit must be an integer")
+    if limit < 1:
+        return HttpResponseBadRequest("limit must be a positive integer")
+    limit = min(limit, MAX_SEARCH_LIMIT)
+    kinds = [kind for kind in request.GET.get("kinds", "").split(",") if kind]
+    if any(kind not in KINDS for kind in kinds):
+        return HttpResponseBadRequest(f"kinds must be a subset of {', '.join(KINDS)}")
+
+    results = autocomplete(query, limit=limit, kinds=kinds or None) if query else []
+    return _cached_json({
+        "results": [
+            {"kind": r.kind, "id": r.id, "name": r.name, "label": r.label}
+            for r in results
+        ]
+    })
+
+
+def _accepted_encoding(request, available) -> str:
+    """The preferred coding of ``available`` the client accepts, or "" """
+    accepted = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                pass
+        accepted[coding.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return ""
+
+
+@require_GET
+def hierarchy_tree(request):
+    """
+    The whole zone -> state -> LGA tree, down to ``depth`` (1-4, default 3)
+
+    The payload is serialized and compressed once per dataset version; the
+    response body is those bytes, brotli or gzip encoded when the client
+    accepts it, with a strong ETag per encoding. Unlike the other endpoints
+    it sends no Last-Modified, which would differ between workers.
+    """
+    try:
+        depth = int(request.GET.get("depth", DEFAULT_DEPTH))
+    except ValueError:
+        return HttpResponseBadRequest("depth must be an integer")
+    if not 1 <= depth <= MAX_DEPTH:
+        return HttpResponseBadRequest(f"depth must be between 1 and {MAX_DEPTH}")
+
+    payload = get_tree_payload(depth)
+    encoding = _accepted_encoding(request, payload.encoded)
+    response = HttpResponse(payload.encoded[encoding] if encoding else payload.body, content_type="application/json")
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["ETag"] = payload.etag_for(encoding)
+    patch_vary_headers(response, ["Accept-Encoding"])
+    patch_cache_control(response, public=True, max_age=get_setting("API_MAX_AGE"))
+    return get_conditional_response(request, etag=response["ETag"], response=response)
@@ -25,7 +25,6 @@ setup(
         "Programming Language :: Python :: 3.11",
         "Programming Language :: Python :: 3.12",
         "Framework :: Django",
-        "Framework :: Django :: 4.0",
         "Framework :: Django :: 4.1",
         "Framework :: Django :: 4.2",
         "Framework :: Django :: 5.0",
@@ -33,12 +32,17 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[
-        "Django>=4.0",
+        "Django>=4.1",
     ],
+    extras_require={
+        "numpy": ["numpy>=1.21"],
+        "brotli": ["brotli>=1.0"],
+    },
     include_package_data=True,
     package_data={
         "django_ng_locations": [
             "fixtures/*.json",
+            "fixtures/*.ndjson.gz",
             "management/commands/*.py",
         ],
     },